@@ -2,7 +2,9 @@ import os
 from flask import Flask
 from app.config import DevelopmentConfig, ProductionConfig
 from flask_restx import Api
+from app.json_provider import json_provider_class, output_json
 from app.middleware.error_handling_middleware import ErrorHandlingMiddleware
+from app.middleware.response_encoding_middleware import ResponseEncodingMiddleware
 from app.routes.seo_routes import register_routes
 from dotenv import load_dotenv
 
@@ -23,12 +25,18 @@ def create_app(config_class=None):
         )
     app.config.from_object(config_class)
 
+    # Serialize responses with the fastest available JSON encoder
+    app.json = json_provider_class()(app)
+
     # Initialize logging and error handling
     config_class.init_app(app)
 
     # Add middleware for error handling
     app.wsgi_app = ErrorHandlingMiddleware(app.wsgi_app)
 
+    # ETags, 304s and gzip/brotli compression for buffered responses
+    app.wsgi_app = ResponseEncodingMiddleware(app.wsgi_app)
+
     # Initialize API using Flask-RESTX
     api = Api(
         app,
@@ -36,6 +44,7 @@ def create_app(config_class=None):
         title="SEO Analysis API",
         description="A RESTful API for SEO Analysis and Optimizations",
     )
+    api.representations["application/json"] = output_json
 
     # Register routes
     register_routes(app, api)
@@ -0,0 +1,234 @@
+import json
+import logging
+from urllib.parse import parse_qs
+
+import aiohttp
+from werkzeug.datastructures import Headers
+
+from app.json_provider import json_bytes
+from app.middleware.response_encoding_middleware import ResponseEncoder
+from app.routes.seo_routes import with_local_data
+from app.services.analysis_pipeline import AnalysisPipeline
+from app.services.async_fetch_engine import AsyncFetchEngine
+from app.services.composite_analysis import ANALYSIS_ROUTES, route_extract_kwargs
+from app.services.perplexity_service import PerplexityService
+
+logger = logging.getLogger(__name__)
+
+ANALYZE_PREFIX = "/seo/analyze/"
+
+
+def seo_data_headers(age):
+    """
+    The ``Age`` and ``X-SEO-Data-Cache`` headers the WSGI routes send too.
+    """
+    return {
+        "Age": str(int(age or 0)),
+        "X-SEO-Data-Cache": "MISS" if age is None else "HIT",
+    }
+
+
+class AsyncAnalysisApp:
+    """
+    ASGI application serving the single-URL analysis routes on asyncio.
+
+    Each ``POST /seo/analyze/<route>`` awaits the page download
+    (``AsyncFetchEngine``) and the Perplexity call (aiohttp) instead of holding a
+    thread, so one process can keep hundreds of analyses in flight. Responses
+    match the Flask routes. Every other request, including Server-Sent Events
+    (``Accept: text/event-stream``) and background jobs (``Prefer:
+    respond-async``), is passed to ``fallback``, normally the Flask app behind
+    asgiref's ``WsgiToAsgi``; without one it gets a 404. Responses get the same
+    ETags and compression (``encoder``) as the WSGI middleware applies.
+    """
+
+    def __init__(
+        self,
+        fallback=None,
+        pipeline=None,
+        perplexity_service=None,
+        engine=None,
+        encoder=None,
+    ):
+        self.fallback = fallback
+        self.pipeline = pipeline or AnalysisPipeline()
+        self.perplexity_service = perplexity_service or PerplexityService()
+        self.engine = engine or AsyncFetchEngine()
+        self.encoder = encoder or ResponseEncoder()
+        self.session = None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            return await self._lifespan(receive, send)
+        route = self._route(scope)
+        if route is not None:
+            return await self._analyze(route, scope, receive, send)
+        if self.fallback is not None:
+            return await self.fallback(scope, receive, send)
+        await self._send_json(send, scope, 404, {"error": "Not found"})
+
+    async def startup(self):
+        """
+        Open the pooled page fetcher and the Perplexity client session.
+        """
+        await self.engine.start()
+        if self.session is None:
+            self.session = aiohttp.ClientSession()
+
+    async def shutdown(self):
+        """
+        Close the page fetcher and the Perplexity client session.
+        """
+        await self.engine.close()
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    # Internals
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await self.startup()
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.shutdown()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    def _route(self, scope):
+        """
+        The analysis route a request is for, or ``None`` to pass it on.
+        """
+        if scope["type"] != "http" or scope["method"] != "POST":
+            return None
+        path = scope["path"].rstrip("/")
+        if not path.startswith(ANALYZE_PREFIX):
+            return None
+        route = path[len(ANALYZE_PREFIX) :]
+        if route not in ANALYSIS_ROUTES:
+            return None
+        # Streams and background jobs are left to the Flask routes.
+        headers = _headers(scope)
+        query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        stream = query.get("stream", [""])[0].lower() in ("1", "true")
+        run_async = query.get("async", [""])[0].lower() in ("1", "true")
+        if (
+            stream
+            or run_async
+            or "text/event-stream" in headers.get("accept", "")
+            or "respond-async" in headers.get("prefer", "").lower()
+        ):
+            return None
+        return route
+
+    async def _analyze(self, route, scope, receive, send):
+        try:
+            data = json.loads(await _read_body(receive) or b"null")
+        except ValueError:
+            data = None
+        if not isinstance(data, dict):
+            return await self._send_json(
+                send, scope, 400, {"error": "Invalid JSON body"}
+            )
+
+        url = data.get("url")
+        try:
+            status, body, headers = await self._run(route, data, _headers(scope))
+        except Exception as e:
+            logger.error(
+                f"Error running {route} analysis for URL: {url} - {str(e)}",
+                exc_info=True,
+            )
+            status, headers = 500, {}
+            body = {"error": "Internal server error", "message": str(e)}
+        await self._send_json(send, scope, status, body, headers)
+
+    async def _run(self, route, data, request_headers):
+        """
+        Extract, prompt and query for one analysis, returning
+        ``(status, body, headers)``.
+        """
+        url = data.get("url")
+        bypass_cache = "no-cache" in request_headers.get("cache-control", "").lower()
+        seo_data, age = await self.pipeline.extract_async(
+            url,
+            **route_extract_kwargs(route, data),
+            engine=self.engine,
+            bypass_cache=bypass_cache,
+        )
+        headers = seo_data_headers(age)
+        if "error" in seo_data:
+            logger.error(f"SEO Analysis failed for URL: {url}: {seo_data['error']}")
+            return 400, seo_data, headers
+
+        analysis = ANALYSIS_ROUTES[route]
+        params = {name: data.get(name) for name in analysis.params}
+        prompt = analysis.build_prompt(self.perplexity_service, url, seo_data, params)
+        if self.session is None:
+            await self.startup()
+        perplexity_result = await self.perplexity_service.query_perplexity_async(
+            self.session,
+            prompt,
+            prompt_type=analysis.prompt_type,
+            bypass_cache=bypass_cache,
+            route=ANALYZE_PREFIX + route,
+        )
+
+        logger.info(f"{route} analysis completed for URL: {url}")
+        if route == "perplexity":
+            body = {"seo_data": seo_data, "perplexity_analysis": perplexity_result}
+        else:
+            body = with_local_data(perplexity_result, seo_data)
+        return 200, body, headers
+
+    async def _send_json(self, send, scope, status, body, headers=None):
+        response_headers = Headers({"Content-Type": "application/json"})
+        response_headers.extend(headers or {})
+        status, content = self.encoder.encode(
+            status,
+            scope["method"],
+            response_headers,
+            json_bytes(body),
+            Headers(list(_headers(scope).items())),
+        )
+        raw_headers = [
+            (name.lower().encode("latin-1"), value.encode("latin-1"))
+            for name, value in response_headers.items()
+        ]
+        await send(
+            {"type": "http.response.start", "status": status, "headers": raw_headers}
+        )
+        await send({"type": "http.response.body", "body": content})
+
+
+def _headers(scope):
+    return {
+        name.decode("latin-1").lower(): value.decode("latin-1")
+        for name, value in scope.get("headers", [])
+    }
+
+
+async def _read_body(receive):
+    body = b""
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return body
+        body += message.get("body", b"")
+        if not message.get("more_body"):
+            return body
+
+
+def create_asgi_app(config_class=None):
+    """
+    The async serving mode: the analysis routes on asyncio in front of the Flask
+    app for everything else. Needs asgiref (``pip install asgiref``) and an ASGI
+    server such as uvicorn.
+    """
+    from asgiref.wsgi import WsgiToAsgi
+
+    from app import create_app
+
+    return AsyncAnalysisApp(fallback=WsgiToAsgi(create_app(config_class)))
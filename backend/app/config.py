@@ -1,4 +1,5 @@
 import os
+import tempfile
 from logging.config import dictConfig
 from logstash_formatter import LogstashFormatterV1
 
@@ -19,6 +20,142 @@ class Config:
     # Perplexity API Configuration
     PERPLEXITY_API_KEY = os.getenv("PERPLEXITY_API_KEY")
 
+    # Outbound HTTP Configuration (page, sitemap and robots.txt fetches)
+    HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", 3.05))
+    HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", 10))
+    HTTP_POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", 32))
+    HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", 8))  # per host
+    # Seconds a request waits for a free pooled connection before failing.
+    HTTP_POOL_TIMEOUT = float(os.getenv("HTTP_POOL_TIMEOUT", 10))
+    HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", 2))
+    HTTP_BACKOFF_FACTOR = float(os.getenv("HTTP_BACKOFF_FACTOR", 0.3))
+    HTTP_MAX_PAGE_BYTES = int(os.getenv("HTTP_MAX_PAGE_BYTES", 5 * 1024 * 1024))
+    HTTP_USER_AGENT = os.getenv(
+        "HTTP_USER_AGENT", "mg-seo-api/1.0 (+https://github.com/tarcsb/mg-seo-api)"
+    )
+    ORIGIN_CHECK_WORKERS = int(os.getenv("ORIGIN_CHECK_WORKERS", 16))
+
+    # HTML parser used for analyses: "html.parser", "lxml" or "selectolax"
+    HTML_PARSER_BACKEND = os.getenv("HTML_PARSER_BACKEND", "html.parser")
+
+    # asyncio fetch engine used for bulk analyses
+    ASYNC_FETCH_MAX_CONCURRENCY = int(os.getenv("ASYNC_FETCH_MAX_CONCURRENCY", 100))
+    ASYNC_FETCH_PER_HOST_CONCURRENCY = int(
+        os.getenv("ASYNC_FETCH_PER_HOST_CONCURRENCY", 8)
+    )
+    # Upper bound on a whole request, body included (seconds)
+    ASYNC_FETCH_TOTAL_TIMEOUT = float(os.getenv("ASYNC_FETCH_TOTAL_TIMEOUT", 30))
+
+    # robots.txt / sitemap.xml cache, keyed on the page's origin (seconds)
+    ORIGIN_CACHE_TTL = float(os.getenv("ORIGIN_CACHE_TTL", 3600))
+    ORIGIN_CACHE_NEGATIVE_TTL = float(os.getenv("ORIGIN_CACHE_NEGATIVE_TTL", 600))
+    ORIGIN_CACHE_MAX_ENTRIES = int(os.getenv("ORIGIN_CACHE_MAX_ENTRIES", 10000))
+
+    # Analyzed page cache (memory LRU in front of a size-bounded disk store)
+    RESPONSE_CACHE_ENABLED = (
+        os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+    )
+    RESPONSE_CACHE_DIR = os.getenv(
+        "RESPONSE_CACHE_DIR",
+        os.path.join(tempfile.gettempdir(), "mg-seo-api", "responses"),
+    )
+    RESPONSE_CACHE_MEMORY_ENTRIES = int(os.getenv("RESPONSE_CACHE_MEMORY_ENTRIES", 256))
+    RESPONSE_CACHE_MAX_DISK_BYTES = int(
+        os.getenv("RESPONSE_CACHE_MAX_DISK_BYTES", 512 * 1024 * 1024)
+    )
+
+    # Extracted SEO data shared between analyses of the same URL (seconds)
+    SEO_DATA_CACHE_ENABLED = (
+        os.getenv("SEO_DATA_CACHE_ENABLED", "true").lower() == "true"
+    )
+    SEO_DATA_CACHE_TTL = float(os.getenv("SEO_DATA_CACHE_TTL", 120))
+    SEO_DATA_CACHE_MAX_URLS = int(os.getenv("SEO_DATA_CACHE_MAX_URLS", 1000))
+
+    # Perplexity completion cache (memory LRU in front of SQLite). LLM_CACHE_TTLS
+    # overrides the TTL per prompt type, e.g. "technical_seo_audit=3600".
+    LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+    LLM_CACHE_PATH = os.getenv(
+        "LLM_CACHE_PATH",
+        os.path.join(tempfile.gettempdir(), "mg-seo-api", "llm_cache.sqlite3"),
+    )
+    LLM_CACHE_MEMORY_ENTRIES = int(os.getenv("LLM_CACHE_MEMORY_ENTRIES", 512))
+    LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+    LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", 24 * 3600))
+    LLM_CACHE_TTLS = os.getenv("LLM_CACHE_TTLS", "")
+
+    # Chat completions endpoint; point it at benchmarks.stub_perplexity to load
+    # test without spending API quota.
+    PERPLEXITY_API_URL = os.getenv(
+        "PERPLEXITY_API_URL", "https://api.perplexity.ai/chat/completions"
+    )
+
+    # Perplexity client-side limits, shared by every thread in the process. The
+    # concurrency limit adapts (AIMD) between 1 and PERPLEXITY_MAX_CONCURRENCY.
+    PERPLEXITY_REQUESTS_PER_MINUTE = float(
+        os.getenv("PERPLEXITY_REQUESTS_PER_MINUTE", 50)
+    )
+    PERPLEXITY_BURST = int(os.getenv("PERPLEXITY_BURST", 10))
+    PERPLEXITY_INITIAL_CONCURRENCY = int(os.getenv("PERPLEXITY_INITIAL_CONCURRENCY", 4))
+    PERPLEXITY_MAX_CONCURRENCY = int(os.getenv("PERPLEXITY_MAX_CONCURRENCY", 16))
+    PERPLEXITY_LATENCY_TARGET = float(os.getenv("PERPLEXITY_LATENCY_TARGET", 20))
+    PERPLEXITY_QUEUE_TIMEOUT = float(os.getenv("PERPLEXITY_QUEUE_TIMEOUT", 30))
+    PERPLEXITY_MAX_RETRIES = int(os.getenv("PERPLEXITY_MAX_RETRIES", 3))
+    PERPLEXITY_BACKOFF_FACTOR = float(os.getenv("PERPLEXITY_BACKOFF_FACTOR", 0.5))
+    # USD per million tokens, for the cost estimates reported at /seo/metrics.
+    PERPLEXITY_PROMPT_TOKEN_COST = float(os.getenv("PERPLEXITY_PROMPT_TOKEN_COST", 0.2))
+    PERPLEXITY_COMPLETION_TOKEN_COST = float(
+        os.getenv("PERPLEXITY_COMPLETION_TOKEN_COST", 0.2)
+    )
+
+    # Prompt size and completion length. Extracted signals are trimmed to fit
+    # PROMPT_TOKEN_BUDGET; completions are capped at PERPLEXITY_MAX_TOKENS.
+    PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", 400))
+    PROMPT_MAX_INSIGHTS = int(os.getenv("PROMPT_MAX_INSIGHTS", 5))
+    PERPLEXITY_MAX_TOKENS = int(os.getenv("PERPLEXITY_MAX_TOKENS", 600))
+
+    # Perplexity timeouts and circuit breaker. After
+    # PERPLEXITY_CIRCUIT_FAILURE_THRESHOLD consecutive failures, calls are refused
+    # for PERPLEXITY_CIRCUIT_RECOVERY_TIMEOUT seconds and the last cached
+    # completion (marked stale) is served instead.
+    PERPLEXITY_CONNECT_TIMEOUT = float(os.getenv("PERPLEXITY_CONNECT_TIMEOUT", 5))
+    PERPLEXITY_READ_TIMEOUT = float(os.getenv("PERPLEXITY_READ_TIMEOUT", 30))
+    PERPLEXITY_CIRCUIT_FAILURE_THRESHOLD = int(
+        os.getenv("PERPLEXITY_CIRCUIT_FAILURE_THRESHOLD", 5)
+    )
+    PERPLEXITY_CIRCUIT_RECOVERY_TIMEOUT = float(
+        os.getenv("PERPLEXITY_CIRCUIT_RECOVERY_TIMEOUT", 30)
+    )
+
+    # Background analysis jobs (Prefer: respond-async or ?async=true). Jobs run
+    # in the worker that accepted them; their state is kept in a SQLite store
+    # (JOB_STORE_PATH) shared by every worker on the host.
+    JOB_WORKERS = int(os.getenv("JOB_WORKERS", 8))
+    JOB_QUEUE_SIZE = int(os.getenv("JOB_QUEUE_SIZE", 100))
+    JOB_RESULT_TTL = float(os.getenv("JOB_RESULT_TTL", 600))
+    JOB_MAX_WAIT = float(os.getenv("JOB_MAX_WAIT", 30))
+    JOB_STORE_PATH = os.getenv(
+        "JOB_STORE_PATH",
+        os.path.join(tempfile.gettempdir(), "mg-seo-api", "jobs.sqlite3"),
+    )
+
+    # Largest URL list accepted by /seo/analyze/batch
+    BATCH_MAX_URLS = int(os.getenv("BATCH_MAX_URLS", 1000))
+
+    # Threads shared by parallel /seo/analyze/composite requests for their
+    # per-section Perplexity calls
+    COMPOSITE_ANALYSIS_WORKERS = int(os.getenv("COMPOSITE_ANALYSIS_WORKERS", 16))
+
+    # Response encoding. JSON_PROVIDER is "auto" (orjson when installed),
+    # "orjson" or "stdlib". Buffered JSON/text responses of at least
+    # COMPRESSION_MIN_SIZE bytes are gzip (or brotli, if installed) compressed
+    # per Accept-Encoding, and GET 200s carry a strong ETag for If-None-Match.
+    JSON_PROVIDER = os.getenv("JSON_PROVIDER", "auto")
+    COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+    COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", 1024))
+    COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", 6))
+    COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", 5))
+    ETAGS_ENABLED = os.getenv("ETAGS_ENABLED", "true").lower() == "true"
+
     # Stripe API Configuration
     STRIPE_PUBLISHABLE_KEY = os.getenv("STRIPE_PUBLISHABLE_KEY")
     STRIPE_SECRET_KEY = os.getenv("STRIPE_SECRET_KEY")
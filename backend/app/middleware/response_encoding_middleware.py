@@ -0,0 +1,202 @@
+import gzip
+import hashlib
+
+from werkzeug.datastructures import EnvironHeaders, Headers
+from werkzeug.http import parse_accept_header, parse_etags, quote_etag
+
+from app.config import Config
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+    "text/",
+)
+
+# Methods whose 200 responses get an ETag (e.g. /seo/jobs/<id>, /seo/metrics).
+# A matching If-None-Match on any other method must be answered with 412, not
+# 304 (RFC 9110 section 13.1.2), and would only be checked after the analysis
+# ran, so the POST analysis routes get no validator.
+ETAG_METHODS = ("GET", "HEAD")
+
+
+def available_encodings():
+    """
+    Content codings this process can produce, most preferred first.
+    """
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate_encoding(accept_encoding):
+    """
+    The best coding the client accepts (honouring q-values), or ``None`` to
+    send the body as is.
+    """
+    if not accept_encoding:
+        return None
+    return parse_accept_header(accept_encoding).best_match(available_encodings())
+
+
+def strong_etag(body, encoding=None):
+    """
+    Strong validator for ``body``; each content coding gets its own.
+    """
+    digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+    return f"{digest}-{encoding}" if encoding else digest
+
+
+class ResponseEncoder:
+    """
+    Strong ETags, ``304 Not Modified`` and gzip/brotli compression for
+    buffered responses.
+
+    Bodies of compressible types (JSON, text) of at least ``min_size`` bytes are
+    compressed with the best coding the client's Accept-Encoding allows; brotli
+    is only offered when the ``brotli`` package is installed. ETags are computed
+    on the uncompressed body, so a matching If-None-Match skips the compression
+    as well as the transfer.
+    """
+
+    def __init__(
+        self,
+        enabled=None,
+        min_size=None,
+        gzip_level=None,
+        brotli_quality=None,
+        etags=None,
+    ):
+        self.enabled = enabled if enabled is not None else Config.COMPRESSION_ENABLED
+        self.min_size = (
+            min_size if min_size is not None else Config.COMPRESSION_MIN_SIZE
+        )
+        self.gzip_level = (
+            gzip_level if gzip_level is not None else Config.COMPRESSION_GZIP_LEVEL
+        )
+        self.brotli_quality = (
+            brotli_quality
+            if brotli_quality is not None
+            else Config.COMPRESSION_BROTLI_QUALITY
+        )
+        self.etags = etags if etags is not None else Config.ETAGS_ENABLED
+
+    def encode(self, status_code, method, headers, body, request_headers):
+        """
+        Apply ETags and compression to a buffered response, returning the new
+        ``(status_code, body)``. ``headers`` (a werkzeug ``Headers``) is updated
+        in place; ``request_headers`` is any mapping of request header names.
+        """
+        if "Content-Encoding" in headers:
+            return status_code, body
+
+        encoding = None
+        content_type = headers.get("Content-Type", "").split(";")[0].strip().lower()
+        if self.enabled and content_type.startswith(COMPRESSIBLE_TYPES):
+            headers.add("Vary", "Accept-Encoding")
+            if len(body) >= self.min_size:
+                encoding = negotiate_encoding(request_headers.get("Accept-Encoding"))
+
+        if (
+            self.etags
+            and status_code == 200
+            and method in ETAG_METHODS
+            and "ETag" not in headers
+        ):
+            etag = strong_etag(body, encoding)
+            headers["ETag"] = quote_etag(etag)
+            if parse_etags(request_headers.get("If-None-Match")).contains_weak(etag):
+                for name in ("Content-Type", "Content-Length"):
+                    headers.remove(name)
+                return 304, b""
+
+        if encoding is not None:
+            body = self.compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+        headers["Content-Length"] = str(len(body))
+        return status_code, body
+
+    def compress(self, body, encoding):
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        # mtime=0 keeps the output, and so the ETag's variant, deterministic.
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+
+class ResponseEncodingMiddleware:
+    """
+    WSGI middleware applying a ``ResponseEncoder`` to buffered responses.
+    Streamed responses (no Content-Length, e.g. Server-Sent Events and NDJSON
+    batches) pass through untouched.
+    """
+
+    def __init__(self, app, encoder=None):
+        self.app = app
+        self.encoder = encoder or ResponseEncoder()
+
+    def __call__(self, environ, start_response):
+        captured = []
+        written = []
+
+        def capture(status, headers, exc_info=None):
+            captured[:] = [status, headers, exc_info]
+            return written.append
+
+        app_iter = self.app(environ, capture)
+        if not captured:
+            # The body starts the response (rare outside werkzeug): stream it as is.
+            return self._start_lazily(app_iter, captured, written, start_response)
+        status, headers, exc_info = captured
+        headers = Headers(headers)
+        if "Content-Length" not in headers or environ["REQUEST_METHOD"] == "HEAD":
+            write = start_response(status, headers.to_wsgi_list(), exc_info)
+            for data in written:
+                write(data)
+            return app_iter
+
+        try:
+            body = b"".join(written) + b"".join(app_iter)
+        finally:
+            if hasattr(app_iter, "close"):
+                app_iter.close()
+        status_code, body = self.encoder.encode(
+            int(status.split()[0]),
+            environ["REQUEST_METHOD"],
+            headers,
+            body,
+            EnvironHeaders(environ),
+        )
+        if status_code == 304:
+            status = "304 Not Modified"
+        start_response(status, headers.to_wsgi_list(), exc_info)
+        return [body]
+
+    def _start_lazily(self, app_iter, captured, written, start_response):
+        """
+        Pass ``app_iter`` through, calling the real ``start_response`` once the
+        app has called ``capture`` while producing its first item. Data the app
+        wrote through ``write()`` is yielded in order ahead of that item.
+        """
+        try:
+            started = False
+            for data in app_iter:
+                if not started:
+                    status, headers, exc_info = captured
+                    start_response(status, headers, exc_info)
+                    started = True
+                if written:
+                    yield b"".join(written)
+                    written.clear()
+                yield data
+            if not started:
+                status, headers, exc_info = captured
+                start_response(status, headers, exc_info)
+            if written:
+                yield b"".join(written)
+        finally:
+            if hasattr(app_iter, "close"):
+                app_iter.close()
@@ -1,7 +1,31 @@
 from flask_restx import Namespace, Resource, fields
-from flask import request, jsonify
+import functools
+import json
+from flask import (
+    Response,
+    after_this_request,
+    request,
+    url_for,
+)
+from app.config import Config
 from app.services.perplexity_service import PerplexityService
 from app.services.seo_analysis_service import SEOAnalysisService
+from app.services.analysis_pipeline import AnalysisPipeline, get_seo_data_cache
+from app.services.batch_analysis import resolve_batch, stream_batch
+from app.services.composite_analysis import (
+    ANALYSIS_ROUTES,
+    ANALYSIS_TYPES,
+    COMPOSITE_MODES,
+    CompositeAnalysisService,
+    route_extract_kwargs,
+)
+from app.services.response_cache import get_response_cache
+from app.services.llm_cache import get_llm_cache
+from app.services.rate_limiter import get_perplexity_limiter
+from app.services.circuit_breaker import get_perplexity_circuit_breaker
+from app.services.job_queue import QueueFull, get_job_queue
+from app.services.usage_metrics import get_usage_metrics
+from app.services.seo_fields import ROUTE_FIELDS, SEO_FIELDS
 import logging
 
 # Set up logging
@@ -15,6 +39,13 @@ seo_routes = Blueprint("seo_routes", __name__)
 
 # Define routes here
 
+# Optional projection shared by every analysis model
+seo_fields_field = fields.List(
+    fields.String(enum=list(SEO_FIELDS)),
+    required=False,
+    description="SEO signals to compute; defaults to the ones the route uses",
+)
+
 # Input models for Swagger documentation
 seo_analysis_model = seo_ns.model(
     "SEOAnalysis",
@@ -23,6 +54,7 @@ seo_analysis_model = seo_ns.model(
         "keyword": fields.String(
             required=True, description="Target keyword for analysis"
         ),
+        "fields": seo_fields_field,
     },
 )
 
@@ -33,6 +65,7 @@ competitor_comparison_model = seo_ns.model(
         "competitor_url": fields.String(
             required=True, description="The URL of your competitor's site"
         ),
+        "fields": seo_fields_field,
     },
 )
 
@@ -43,6 +76,7 @@ local_seo_model = seo_ns.model(
         "location": fields.String(
             required=True, description="Location to enhance local SEO"
         ),
+        "fields": seo_fields_field,
     },
 )
 
@@ -53,6 +87,7 @@ ecommerce_seo_model = seo_ns.model(
         "product_name": fields.String(
             required=True, description="The name of the product"
         ),
+        "fields": seo_fields_field,
     },
 )
 
@@ -63,6 +98,7 @@ content_gap_model = seo_ns.model(
         "related_keywords": fields.List(
             fields.String, required=True, description="Related keywords"
         ),
+        "fields": seo_fields_field,
     },
 )
 
@@ -71,13 +107,270 @@ backlink_strategy_model = seo_ns.model(
     {
         "url": fields.String(
             required=True, description="The URL to analyze for backlink strategy"
-        )
+        ),
+        "fields": seo_fields_field,
+    },
+)
+
+composite_analysis_model = seo_ns.model(
+    "CompositeAnalysis",
+    {
+        "url": fields.String(required=True, description="The URL to analyze"),
+        "analyses": fields.List(
+            fields.String(enum=list(ANALYSIS_TYPES)),
+            required=True,
+            description="Analysis types to run against a single page fetch",
+        ),
+        "mode": fields.String(
+            enum=list(COMPOSITE_MODES),
+            default="parallel",
+            description="One call per analysis, or one combined multi-section prompt",
+        ),
+        "keyword": fields.String(description="Needed by content-optimization"),
+        "location": fields.String(description="Needed by local-seo"),
+        "competitor_url": fields.String(description="Needed by competitor-comparison"),
+        "product_name": fields.String(description="Needed by ecommerce-seo"),
+        "related_keywords": fields.List(
+            fields.String, description="Needed by content-gap"
+        ),
+        "fields": seo_fields_field,
+    },
+)
+
+batch_analysis_model = seo_ns.model(
+    "BatchAnalysis",
+    {
+        "urls": fields.List(
+            fields.String, required=True, description="The URLs to analyze"
+        ),
+        "analyses": fields.List(
+            fields.String(enum=list(ANALYSIS_TYPES)),
+            description="Analysis types whose SEO signals to compute "
+            "(default technical-seo)",
+        ),
+        "keyword": fields.String(description="Target keyword for keyword signals"),
+        "related_keywords": fields.List(
+            fields.String, description="Related keywords for keyword signals"
+        ),
+        "fields": seo_fields_field,
     },
 )
 
 # Initialize services
 seo_service = SEOAnalysisService()
 perplexity_service = PerplexityService()
+analysis_pipeline = AnalysisPipeline(seo_service)
+composite_service = CompositeAnalysisService(analysis_pipeline, perplexity_service)
+
+
+def bypass_llm_cache():
+    """
+    Whether the client asked for a fresh analysis with
+    ``Cache-Control: no-cache``: a new extraction and LLM completion.
+    """
+    return "no-cache" in request.headers.get("Cache-Control", "").lower()
+
+
+def wants_event_stream():
+    """
+    Whether the client asked for a Server-Sent Events response, either with
+    ``Accept: text/event-stream`` or ``?stream=true``.
+    """
+    accept = request.headers.get("Accept", "")
+    stream = request.args.get("stream", "").lower()
+    return "text/event-stream" in accept or stream in ("1", "true")
+
+
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def stream_analysis(seo_data, prompt, prompt_type):
+    """
+    Stream an analysis as Server-Sent Events: the SEO data first, then each
+    actionable insight as soon as Perplexity completes its paragraph, then a
+    final ``done`` event.
+    """
+    bypass_cache = bypass_llm_cache()
+    route = request.path
+
+    def events():
+        yield sse_event("seo_data", seo_data)
+        try:
+            for item in perplexity_service.stream_perplexity(
+                prompt, prompt_type=prompt_type, bypass_cache=bypass_cache, route=route
+            ):
+                yield sse_event("error" if "error" in item else "insight", item)
+        except Exception as e:
+            logger.error(f"Error streaming {prompt_type} analysis: {e}", exc_info=True)
+            yield sse_event(
+                "error", {"error": "Internal server error", "message": str(e)}
+            )
+        yield sse_event("done", {})
+
+    return Response(
+        events(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def with_local_data(perplexity_result, seo_data):
+    """
+    While the Perplexity circuit is open, answer with the locally extracted SEO
+    data alongside the error instead of nothing.
+    """
+    if perplexity_result.get("circuit_open"):
+        return {**perplexity_result, "seo_data": seo_data}
+    return perplexity_result
+
+
+def wants_job():
+    """
+    Whether the client asked for the analysis to run as a background job, with
+    ``Prefer: respond-async`` or ``?async=true``.
+    """
+    prefer = request.headers.get("Prefer", "").lower()
+    run_async = request.args.get("async", "").lower()
+    return "respond-async" in prefer or run_async in ("1", "true")
+
+
+def run_analysis(route, data, bypass_cache=False, path=None):
+    """
+    Run a single-analysis ``route`` (e.g. "technical-seo") for the request body
+    ``data`` outside of a request, returning ``(body, status_code)`` as the route
+    would. LLM usage is accounted to ``path``.
+    """
+    url = data.get("url")
+    try:
+        seo_data, _ = analysis_pipeline.extract(
+            url, **route_extract_kwargs(route, data), bypass_cache=bypass_cache
+        )
+        if "error" in seo_data:
+            logger.error(f"SEO Analysis failed for URL: {url}: {seo_data['error']}")
+            return seo_data, 400
+
+        analysis = ANALYSIS_ROUTES[route]
+        params = {name: data.get(name) for name in analysis.params}
+        prompt = analysis.build_prompt(perplexity_service, url, seo_data, params)
+        perplexity_result = perplexity_service.query_perplexity(
+            prompt,
+            prompt_type=analysis.prompt_type,
+            bypass_cache=bypass_cache,
+            route=path,
+        )
+    except Exception as e:
+        logger.error(
+            f"Error running {route} analysis for URL: {url} - {str(e)}", exc_info=True
+        )
+        return {"error": "Internal server error", "message": str(e)}, 500
+
+    logger.info(f"{route} analysis completed for URL: {url}")
+    if route == "perplexity":
+        return {"seo_data": seo_data, "perplexity_analysis": perplexity_result}, 200
+    return with_local_data(perplexity_result, seo_data), 200
+
+
+def run_composite(data, bypass_cache=False, path=None):
+    """
+    ``run_analysis`` for composite analyses.
+    """
+    url = data.get("url")
+    try:
+        result = composite_service.analyze(
+            url,
+            data.get("analyses"),
+            params=data,
+            mode=data.get("mode") or "parallel",
+            fields=data.get("fields"),
+            bypass_cache=bypass_cache,
+            route=path,
+        )
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    except Exception as e:
+        logger.error(
+            f"Error running composite analysis for URL: {url} - {str(e)}",
+            exc_info=True,
+        )
+        return {"error": "Internal server error", "message": str(e)}, 500
+    if "error" in result:
+        logger.error(f"Composite analysis failed for URL: {url}")
+        return result, 400
+    return result, 200
+
+
+def supports_jobs(run_job):
+    """
+    Let an analysis route run as a background job: the request is answered with
+    ``202`` and a job id at once, and ``run_job(data, bypass_cache, path)`` runs
+    later on the job queue with the parsed request body, returning
+    ``(body, status_code)``. Poll ``/seo/jobs/<job_id>`` for the result.
+    """
+
+    def decorator(post):
+        @functools.wraps(post)
+        def wrapper(resource, *args, **kwargs):
+            data = request.get_json(silent=True)
+            if not wants_job() or not isinstance(data, dict):
+                return post(resource, *args, **kwargs)
+
+            bypass_cache = bypass_llm_cache()
+            path = request.path
+
+            def run():
+                body, status = run_job(data, bypass_cache, path)
+                return {"status_code": status, "body": body}, status < 400
+
+            try:
+                job = get_job_queue().submit(run, kind=path)
+            except QueueFull as e:
+                return {"error": str(e)}, 503, {"Retry-After": "5"}
+            status_url = url_for("seo_job_status", job_id=job.id)
+            return (
+                {"job_id": job.id, "status": job.status, "status_url": status_url},
+                202,
+                {"Location": status_url},
+            )
+
+        return wrapper
+
+    return decorator
+
+
+def analysis_job(route):
+    """
+    The background job runner for a single-analysis ``route``.
+    """
+    return functools.partial(run_analysis, route)
+
+
+def extract_seo_data(url, keyword=None, fields=None, keywords=None):
+    """
+    Extract the page's SEO data through the shared analysis pipeline, reporting
+    in the ``Age`` and ``X-SEO-Data-Cache`` response headers whether it was
+    reused from an earlier analysis of the same URL and how old it is.
+    ``Cache-Control: no-cache`` extracts afresh.
+    """
+    seo_data, age = analysis_pipeline.extract(
+        url, keyword, fields=fields, keywords=keywords, bypass_cache=bypass_llm_cache()
+    )
+
+    @after_this_request
+    def report_age(response):
+        response.headers["Age"] = str(int(age or 0))
+        response.headers["X-SEO-Data-Cache"] = "MISS" if age is None else "HIT"
+        return response
+
+    return seo_data
+
+
+def requested_fields(data, route):
+    """
+    The SEO fields to compute for a request: the client's ``fields`` or the
+    route's defaults.
+    """
+    return data.get("fields") or ROUTE_FIELDS[route]
 
 
 # Perplexity Analysis Route
@@ -87,6 +380,7 @@ class PerplexityAnalysis(Resource):
     @seo_ns.response(200, "Success")
     @seo_ns.response(400, "Validation Error")
     @seo_ns.response(500, "Internal Server Error")
+    @supports_jobs(analysis_job("perplexity"))
     def post(self):
         """
         Analyze SEO data using the Perplexity API.
@@ -97,31 +391,39 @@ class PerplexityAnalysis(Resource):
             keyword = data.get("keyword")
 
             # Perform local SEO analysis
-            seo_data = seo_service.perform_local_seo_analysis(url, keyword)
+            seo_data = extract_seo_data(
+                url, keyword, fields=requested_fields(data, "perplexity")
+            )
             if "error" in seo_data:
                 logger.error(
                     f"SEO Analysis failed for URL: {url} with error: {seo_data['error']}"
                 )
-                return jsonify(seo_data), 400
+                return seo_data, 400
 
             # Create the prompt and query Perplexity API
             prompt = perplexity_service.create_content_optimization_prompt(
                 url, seo_data, keyword
             )
-            perplexity_result = perplexity_service.query_perplexity(prompt)
+            if wants_event_stream():
+                return stream_analysis(seo_data, prompt, "content_optimization")
+
+            perplexity_result = perplexity_service.query_perplexity(
+                prompt,
+                prompt_type="content_optimization",
+                bypass_cache=bypass_llm_cache(),
+                route=request.path,
+            )
 
             logger.info(
                 f"Perplexity analysis completed for URL: {url} with keyword: {keyword}"
             )
-            return jsonify(
-                {"seo_data": seo_data, "perplexity_analysis": perplexity_result}
-            )
+            return {"seo_data": seo_data, "perplexity_analysis": perplexity_result}
         except Exception as e:
             logger.error(
                 f"Error processing Perplexity analysis for URL: {url} - {str(e)}",
                 exc_info=True,
             )
-            return jsonify({"error": "Internal server error", "message": str(e)}), 500
+            return {"error": "Internal server error", "message": str(e)}, 500
 
 
 # Content Optimization Route
@@ -131,6 +433,7 @@ class ContentOptimizationAnalysis(Resource):
     @seo_ns.response(200, "Success")
     @seo_ns.response(400, "Validation Error")
     @seo_ns.response(500, "Internal Server Error")
+    @supports_jobs(analysis_job("content-optimization"))
     def post(self):
         """
         Optimize content for SEO using Perplexity API.
@@ -141,26 +444,36 @@ class ContentOptimizationAnalysis(Resource):
             keyword = data.get("keyword")
 
             # Perform local SEO analysis
-            seo_data = seo_service.perform_local_seo_analysis(url, keyword)
+            seo_data = extract_seo_data(
+                url, keyword, fields=requested_fields(data, "content-optimization")
+            )
             if "error" in seo_data:
                 logger.error(
                     f"SEO Analysis failed for content optimization on URL: {url}"
                 )
-                return jsonify(seo_data), 400
+                return seo_data, 400
 
             # Create the content optimization prompt
             prompt = perplexity_service.create_content_optimization_prompt(
                 url, seo_data, keyword
             )
-            perplexity_result = perplexity_service.query_perplexity(prompt)
+            if wants_event_stream():
+                return stream_analysis(seo_data, prompt, "content_optimization")
+
+            perplexity_result = perplexity_service.query_perplexity(
+                prompt,
+                prompt_type="content_optimization",
+                bypass_cache=bypass_llm_cache(),
+                route=request.path,
+            )
 
             logger.info(f"Content optimization analysis completed for URL: {url}")
-            return jsonify(perplexity_result)
+            return with_local_data(perplexity_result, seo_data)
         except Exception as e:
             logger.error(
                 f"Error optimizing content for URL: {url} - {str(e)}", exc_info=True
             )
-            return jsonify({"error": "Internal server error", "message": str(e)}), 500
+            return {"error": "Internal server error", "message": str(e)}, 500
 
 
 # Technical SEO Audit Route
@@ -169,12 +482,16 @@ class TechnicalSEOAudit(Resource):
     @seo_ns.expect(
         seo_ns.model(
             "SEOAudit",
-            {"url": fields.String(required=True, description="The URL to audit")},
+            {
+                "url": fields.String(required=True, description="The URL to audit"),
+                "fields": seo_fields_field,
+            },
         )
     )
     @seo_ns.response(200, "Success")
     @seo_ns.response(400, "Validation Error")
     @seo_ns.response(500, "Internal Server Error")
+    @supports_jobs(analysis_job("technical-seo"))
     def post(self):
         """
         Perform a technical SEO audit.
@@ -184,23 +501,33 @@ class TechnicalSEOAudit(Resource):
             url = data.get("url")
 
             # Perform local SEO analysis
-            seo_data = seo_service.perform_local_seo_analysis(url)
+            seo_data = extract_seo_data(
+                url, fields=requested_fields(data, "technical-seo")
+            )
             if "error" in seo_data:
                 logger.error(f"Technical SEO audit failed for URL: {url}")
-                return jsonify(seo_data), 400
+                return seo_data, 400
 
             # Create the technical SEO audit prompt
             prompt = perplexity_service.create_technical_seo_audit_prompt(url, seo_data)
-            perplexity_result = perplexity_service.query_perplexity(prompt)
+            if wants_event_stream():
+                return stream_analysis(seo_data, prompt, "technical_seo_audit")
+
+            perplexity_result = perplexity_service.query_perplexity(
+                prompt,
+                prompt_type="technical_seo_audit",
+                bypass_cache=bypass_llm_cache(),
+                route=request.path,
+            )
 
             logger.info(f"Technical SEO audit completed for URL: {url}")
-            return jsonify(perplexity_result)
+            return with_local_data(perplexity_result, seo_data)
         except Exception as e:
             logger.error(
                 f"Error performing technical SEO audit for URL: {url} - {str(e)}",
                 exc_info=True,
             )
-            return jsonify({"error": "Internal server error", "message": str(e)}), 500
+            return {"error": "Internal server error", "message": str(e)}, 500
 
 
 # Local SEO Enhancement Route
@@ -210,6 +537,7 @@ class LocalSEOEnhancement(Resource):
     @seo_ns.response(200, "Success")
     @seo_ns.response(400, "Validation Error")
     @seo_ns.response(500, "Internal Server Error")
+    @supports_jobs(analysis_job("local-seo"))
     def post(self):
         """
         Enhance local SEO for a given location.
@@ -220,26 +548,34 @@ class LocalSEOEnhancement(Resource):
             location = data.get("location")
 
             # Perform local SEO analysis
-            seo_data = seo_service.perform_local_seo_analysis(url)
+            seo_data = extract_seo_data(url, fields=requested_fields(data, "local-seo"))
             if "error" in seo_data:
                 logger.error(f"Local SEO enhancement failed for URL: {url}")
-                return jsonify(seo_data), 400
+                return seo_data, 400
 
             # Create the local SEO enhancement prompt
             prompt = perplexity_service.create_local_seo_enhancement_prompt(
                 url, seo_data, location
             )
-            perplexity_result = perplexity_service.query_perplexity(prompt)
+            if wants_event_stream():
+                return stream_analysis(seo_data, prompt, "local_seo_enhancement")
+
+            perplexity_result = perplexity_service.query_perplexity(
+                prompt,
+                prompt_type="local_seo_enhancement",
+                bypass_cache=bypass_llm_cache(),
+                route=request.path,
+            )
 
             logger.info(
                 f"Local SEO enhancement completed for URL: {url} in location: {location}"
             )
-            return jsonify(perplexity_result)
+            return with_local_data(perplexity_result, seo_data)
         except Exception as e:
             logger.error(
                 f"Error enhancing local SEO for URL: {url} - {str(e)}", exc_info=True
             )
-            return jsonify({"error": "Internal server error", "message": str(e)}), 500
+            return {"error": "Internal server error", "message": str(e)}, 500
 
 
 # Competitor Comparison Route
@@ -249,6 +585,7 @@ class CompetitorComparison(Resource):
     @seo_ns.response(200, "Success")
     @seo_ns.response(400, "Validation Error")
     @seo_ns.response(500, "Internal Server Error")
+    @supports_jobs(analysis_job("competitor-comparison"))
     def post(self):
         """
         Compare your SEO with a competitor's site.
@@ -259,26 +596,36 @@ class CompetitorComparison(Resource):
             competitor_url = data.get("competitor_url")
 
             # Perform local SEO analysis
-            seo_data = seo_service.perform_local_seo_analysis(url)
+            seo_data = extract_seo_data(
+                url, fields=requested_fields(data, "competitor-comparison")
+            )
             if "error" in seo_data:
                 logger.error(f"Competitor comparison failed for URL: {url}")
-                return jsonify(seo_data), 400
+                return seo_data, 400
 
             # Create the competitor comparison prompt
             prompt = perplexity_service.create_competitor_comparison_prompt(
                 url, seo_data, competitor_url
             )
-            perplexity_result = perplexity_service.query_perplexity(prompt)
+            if wants_event_stream():
+                return stream_analysis(seo_data, prompt, "competitor_comparison")
+
+            perplexity_result = perplexity_service.query_perplexity(
+                prompt,
+                prompt_type="competitor_comparison",
+                bypass_cache=bypass_llm_cache(),
+                route=request.path,
+            )
 
             logger.info(
                 f"Competitor comparison completed for URL: {url} with competitor: {competitor_url}"
             )
-            return jsonify(perplexity_result)
+            return with_local_data(perplexity_result, seo_data)
         except Exception as e:
             logger.error(
                 f"Error comparing competitor for URL: {url} - {str(e)}", exc_info=True
             )
-            return jsonify({"error": "Internal server error", "message": str(e)}), 500
+            return {"error": "Internal server error", "message": str(e)}, 500
 
 
 # Ecommerce SEO Optimization Route
@@ -288,6 +635,7 @@ class EcommerceSEOOptimization(Resource):
     @seo_ns.response(200, "Success")
     @seo_ns.response(400, "Validation Error")
     @seo_ns.response(500, "Internal Server Error")
+    @supports_jobs(analysis_job("ecommerce-seo"))
     def post(self):
         """
         Optimize SEO for an eCommerce product page.
@@ -298,25 +646,35 @@ class EcommerceSEOOptimization(Resource):
             product_name = data.get("product_name")
 
             # Perform local SEO analysis
-            seo_data = seo_service.perform_local_seo_analysis(url)
+            seo_data = extract_seo_data(
+                url, fields=requested_fields(data, "ecommerce-seo")
+            )
             if "error" in seo_data:
                 logger.error(f"Ecommerce SEO optimization failed for URL: {url}")
-                return jsonify(seo_data), 400
+                return seo_data, 400
 
             # Create the eCommerce SEO optimization prompt
             prompt = perplexity_service.create_ecommerce_seo_optimization_prompt(
                 url, seo_data, product_name
             )
-            perplexity_result = perplexity_service.query_perplexity(prompt)
+            if wants_event_stream():
+                return stream_analysis(seo_data, prompt, "ecommerce_seo_optimization")
+
+            perplexity_result = perplexity_service.query_perplexity(
+                prompt,
+                prompt_type="ecommerce_seo_optimization",
+                bypass_cache=bypass_llm_cache(),
+                route=request.path,
+            )
 
             logger.info(f"Ecommerce SEO optimization completed for URL: {url}")
-            return jsonify(perplexity_result)
+            return with_local_data(perplexity_result, seo_data)
         except Exception as e:
             logger.error(
                 f"Error optimizing eCommerce SEO for URL: {url} - {str(e)}",
                 exc_info=True,
             )
-            return jsonify({"error": "Internal server error", "message": str(e)}), 500
+            return {"error": "Internal server error", "message": str(e)}, 500
 
 
 # Content Gap Analysis Route
@@ -326,6 +684,7 @@ class ContentGapAnalysis(Resource):
     @seo_ns.response(200, "Success")
     @seo_ns.response(400, "Validation Error")
     @seo_ns.response(500, "Internal Server Error")
+    @supports_jobs(analysis_job("content-gap"))
     def post(self):
         """
         Analyze content gaps for a website.
@@ -336,24 +695,36 @@ class ContentGapAnalysis(Resource):
             related_keywords = data.get("related_keywords")
 
             # Perform local SEO analysis
-            seo_data = seo_service.perform_local_seo_analysis(url)
+            seo_data = extract_seo_data(
+                url,
+                fields=requested_fields(data, "content-gap"),
+                keywords=related_keywords,
+            )
             if "error" in seo_data:
                 logger.error(f"Content gap analysis failed for URL: {url}")
-                return jsonify(seo_data), 400
+                return seo_data, 400
 
             # Create the content gap analysis prompt
             prompt = perplexity_service.create_content_gap_analysis_prompt(
                 url, seo_data, related_keywords
             )
-            perplexity_result = perplexity_service.query_perplexity(prompt)
+            if wants_event_stream():
+                return stream_analysis(seo_data, prompt, "content_gap_analysis")
+
+            perplexity_result = perplexity_service.query_perplexity(
+                prompt,
+                prompt_type="content_gap_analysis",
+                bypass_cache=bypass_llm_cache(),
+                route=request.path,
+            )
 
             logger.info(f"Content gap analysis completed for URL: {url}")
-            return jsonify(perplexity_result)
+            return with_local_data(perplexity_result, seo_data)
         except Exception as e:
             logger.error(
                 f"Error analyzing content gap for URL: {url} - {str(e)}", exc_info=True
             )
-            return jsonify({"error": "Internal server error", "message": str(e)}), 500
+            return {"error": "Internal server error", "message": str(e)}, 500
 
 
 # Backlink Strategy Route
@@ -363,6 +734,7 @@ class BacklinkStrategy(Resource):
     @seo_ns.response(200, "Success")
     @seo_ns.response(400, "Validation Error")
     @seo_ns.response(500, "Internal Server Error")
+    @supports_jobs(analysis_job("backlink-strategy"))
     def post(self):
         """
         Generate a backlink strategy for a website.
@@ -372,23 +744,147 @@ class BacklinkStrategy(Resource):
             url = data.get("url")
 
             # Perform local SEO analysis
-            seo_data = seo_service.perform_local_seo_analysis(url)
+            seo_data = extract_seo_data(
+                url, fields=requested_fields(data, "backlink-strategy")
+            )
             if "error" in seo_data:
                 logger.error(f"Backlink strategy generation failed for URL: {url}")
-                return jsonify(seo_data), 400
+                return seo_data, 400
 
             # Create the backlink strategy prompt
             prompt = perplexity_service.create_backlink_strategy_prompt(url, seo_data)
-            perplexity_result = perplexity_service.query_perplexity(prompt)
+            if wants_event_stream():
+                return stream_analysis(seo_data, prompt, "backlink_strategy")
+
+            perplexity_result = perplexity_service.query_perplexity(
+                prompt,
+                prompt_type="backlink_strategy",
+                bypass_cache=bypass_llm_cache(),
+                route=request.path,
+            )
 
             logger.info(f"Backlink strategy generation completed for URL: {url}")
-            return jsonify(perplexity_result)
+            return with_local_data(perplexity_result, seo_data)
         except Exception as e:
             logger.error(
                 f"Error generating backlink strategy for URL: {url} - {str(e)}",
                 exc_info=True,
             )
-            return jsonify({"error": "Internal server error", "message": str(e)}), 500
+            return {"error": "Internal server error", "message": str(e)}, 500
+
+
+# Composite Analysis Route
+@seo_ns.route("/analyze/composite")
+class CompositeAnalysis(Resource):
+    @seo_ns.expect(composite_analysis_model)
+    @seo_ns.response(200, "Success")
+    @seo_ns.response(400, "Validation Error")
+    @seo_ns.response(500, "Internal Server Error")
+    @supports_jobs(run_composite)
+    def post(self):
+        """
+        Run several analysis types for one URL with a single fetch and extraction.
+        """
+        try:
+            data = request.json
+            url = data.get("url")
+
+            result = composite_service.analyze(
+                url,
+                data.get("analyses"),
+                params=data,
+                mode=data.get("mode") or "parallel",
+                fields=data.get("fields"),
+                bypass_cache=bypass_llm_cache(),
+                route=request.path,
+            )
+            if "error" in result:
+                logger.error(f"Composite analysis failed for URL: {url}")
+                return result, 400
+
+            logger.info(
+                f"Composite analysis completed for URL: {url}: "
+                f"{', '.join(result['analyses'])}"
+            )
+            return result
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        except Exception as e:
+            logger.error(
+                f"Error running composite analysis for URL: {url} - {str(e)}",
+                exc_info=True,
+            )
+            return {"error": "Internal server error", "message": str(e)}, 500
+
+
+# Batch Analysis Route
+@seo_ns.route("/analyze/batch")
+class BatchAnalysis(Resource):
+    @seo_ns.expect(batch_analysis_model)
+    @seo_ns.response(200, "NDJSON stream, one line per URL then a summary line")
+    @seo_ns.response(400, "Validation Error")
+    def post(self):
+        """
+        Analyze many URLs, streaming one NDJSON line per URL as it completes.
+        """
+        data = request.json or {}
+        urls = data.get("urls")
+        try:
+            fields = resolve_batch(urls, data.get("analyses"))
+        except ValueError as e:
+            return {"error": str(e)}, 400
+
+        logger.info(f"Batch analysis started for {len(urls)} URLs")
+        return Response(
+            stream_batch(
+                seo_service,
+                urls,
+                data.get("fields") or fields,
+                keyword=data.get("keyword"),
+                keywords=data.get("related_keywords"),
+            ),
+            mimetype="application/x-ndjson",
+            headers={"X-Accel-Buffering": "no"},
+        )
+
+
+# Job Status Route
+@seo_ns.route("/jobs/<string:job_id>", endpoint="seo_job_status")
+class JobStatus(Resource):
+    @seo_ns.param("wait", "Seconds to wait for the job to finish (long poll)")
+    @seo_ns.response(200, "Success")
+    @seo_ns.response(404, "Unknown or expired job")
+    def get(self, job_id):
+        """
+        Report the status, and once finished the result, of an analysis job.
+        """
+        try:
+            wait = min(float(request.args.get("wait", 0)), Config.JOB_MAX_WAIT)
+        except ValueError:
+            return {"error": "wait must be a number of seconds"}, 400
+        job = get_job_queue().get(job_id, wait=wait)
+        if job is None:
+            return {"error": f"Unknown or expired job: {job_id}"}, 404
+        return job.to_dict()
+
+
+# Metrics Route
+@seo_ns.route("/metrics")
+class Metrics(Resource):
+    @seo_ns.response(200, "Success")
+    def get(self):
+        """
+        Report cache and upstream usage counters for this worker process.
+        """
+        return {
+            "response_cache": get_response_cache().stats(),
+            "llm_cache": get_llm_cache().stats(),
+            "seo_data_cache": get_seo_data_cache().stats(),
+            "perplexity_limiter": get_perplexity_limiter().stats(),
+            "perplexity_circuit": get_perplexity_circuit_breaker().stats(),
+            "jobs": get_job_queue().stats(),
+            "perplexity_usage": get_usage_metrics().stats(),
+        }
 
 
 # Register the routes
@@ -0,0 +1,269 @@
+import threading
+import time
+from collections import OrderedDict
+
+from app.config import Config
+from app.services.origin_metadata_cache import normalize_url
+from app.services.seo_analysis_service import SEOAnalysisService
+from app.services.seo_fields import SEO_FIELDS, resolve_fields
+from app.services.single_flight import AsyncSingleFlight, SingleFlight
+
+# Labels of the extracted signals; any other key (such as "Page Truncated")
+# describes the page download itself.
+_FIELD_LABELS = {field.label for field in SEO_FIELDS.values()}
+
+
+def keyword_key(fields, keyword=None, keywords=None):
+    """
+    The part of a cache key contributed by the keywords: ``None`` unless one of
+    ``fields`` actually reads them.
+    """
+    if not any(SEO_FIELDS[name].needs_text for name in fields):
+        return None
+    return keyword or None, tuple(keywords or ())
+
+
+class _Entry:
+    def __init__(self, fields, keywords, seo_data, created):
+        self.fields = fields
+        self.keywords = keywords
+        self.seo_data = seo_data
+        self.created = created
+
+    def covers(self, fields, keywords):
+        return self.fields >= fields and (keywords is None or self.keywords == keywords)
+
+
+class SEODataCache:
+    """
+    Short-lived in-memory cache of extracted ``seo_data`` dicts, shared by every
+    analysis route so that back-to-back analyses of one page extract it once.
+
+    Entries are grouped by normalized URL and remember which fields (and, for
+    the keyword fields, which keywords) they were computed for. A lookup is
+    answered by any fresh entry computed for a superset of the requested fields,
+    projected down to those fields. Entries expire ``ttl`` seconds after they
+    were extracted; at most ``max_urls`` URLs are kept, least recently used
+    first out.
+    """
+
+    ENTRIES_PER_URL = 4
+
+    def __init__(self, ttl=None, max_urls=None, enabled=None):
+        self.ttl = ttl if ttl is not None else Config.SEO_DATA_CACHE_TTL
+        self.max_urls = (
+            max_urls if max_urls is not None else Config.SEO_DATA_CACHE_MAX_URLS
+        )
+        self.enabled = enabled if enabled is not None else Config.SEO_DATA_CACHE_ENABLED
+        self._urls = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+            "bypasses": 0,
+        }
+
+    def lookup(self, url, fields, keywords=None):
+        """
+        Return ``(seo_data, age)`` for the normalized ``url`` and field names, or
+        ``None`` on a miss. ``keywords`` is the ``keyword_key`` of the request.
+        """
+        fields = frozenset(fields)
+        now = time.monotonic()
+        with self._lock:
+            entries = self._fresh_entries(url, now)
+            entry = next((e for e in entries if e.covers(fields, keywords)), None)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            self._urls.move_to_end(url)
+            self._stats["hits"] += 1
+        return self._project(entry.seo_data, fields), now - entry.created
+
+    def store(self, url, fields, keywords, seo_data):
+        """
+        Remember ``seo_data`` extracted for the normalized ``url`` and field names.
+        """
+        entry = _Entry(frozenset(fields), keywords, seo_data, time.monotonic())
+        with self._lock:
+            entries = [
+                e
+                for e in self._fresh_entries(url, entry.created)
+                if not entry.covers(e.fields, e.keywords)
+            ]
+            entries.insert(0, entry)
+            self._urls[url] = entries[: self.ENTRIES_PER_URL]
+            self._urls.move_to_end(url)
+            self._stats["stores"] += 1
+            while len(self._urls) > self.max_urls:
+                self._urls.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def count(self, name):
+        """
+        Increment one of the counters reported by ``stats``.
+        """
+        with self._lock:
+            self._stats[name] += 1
+
+    def stats(self):
+        """
+        Return hit/miss counters and the number of cached URLs.
+        """
+        with self._lock:
+            return {**self._stats, "urls": len(self._urls), "ttl": self.ttl}
+
+    def clear(self):
+        """
+        Drop every entry and reset the counters.
+        """
+        with self._lock:
+            self._urls.clear()
+            for name in self._stats:
+                self._stats[name] = 0
+
+    # Internals
+
+    def _fresh_entries(self, url, now):
+        entries = [e for e in self._urls.get(url, ()) if now - e.created < self.ttl]
+        if entries:
+            self._urls[url] = entries
+        else:
+            self._urls.pop(url, None)
+        return entries
+
+    @staticmethod
+    def _project(seo_data, fields):
+        labels = {SEO_FIELDS[name].label for name in fields}
+        needs_page = any(SEO_FIELDS[name].needs_page for name in fields)
+        return {
+            key: value
+            for key, value in seo_data.items()
+            if key in labels or (needs_page and key not in _FIELD_LABELS)
+        }
+
+
+class AnalysisPipeline:
+    """
+    The extraction step every analysis shares: fetch and extract a page's SEO
+    data through the ``SEODataCache``, so a client calling content-gap right
+    after technical-seo for the same URL does not pay for the fetch and parse
+    twice. Concurrent extractions of the same key run once. ``bypass_cache``
+    (the client's ``Cache-Control: no-cache``) skips the lookup but still stores
+    the fresh extraction.
+
+    ``perform_local_seo_analysis`` mirrors ``SEOAnalysisService`` so the
+    pipeline can stand in for it, e.g. in ``CompositeAnalysisService``.
+    """
+
+    def __init__(self, seo_service=None, cache=None):
+        self.seo_service = seo_service or SEOAnalysisService()
+        self.cache = cache or get_seo_data_cache()
+        self.flights = SingleFlight()
+        self.async_flights = AsyncSingleFlight()
+
+    def extract(
+        self, url, keyword=None, fields=None, keywords=None, bypass_cache=False
+    ):
+        """
+        Return ``(seo_data, age)``: the extracted SEO data and, when it came
+        from the cache, how many seconds ago it was extracted (``None`` when it
+        was just computed). Errors are returned as is and never cached.
+        """
+        try:
+            key = normalize_url(url)
+            names = resolve_fields(fields)
+        except (AttributeError, ValueError):
+            key = None
+        if key is None or not self.cache.enabled:
+            return self._analyze(url, keyword, fields, keywords), None
+
+        keywords_key = keyword_key(names, keyword, keywords)
+        cached = self._lookup(key, names, keywords_key, bypass_cache)
+        if cached is not None:
+            return cached
+
+        def analyze():
+            seo_data = self._analyze(url, keyword, fields, keywords)
+            if "error" not in seo_data:
+                self.cache.store(key, names, keywords_key, seo_data)
+            return seo_data
+
+        flight_key = (key, tuple(names), keywords_key)
+        return self.flights.do(flight_key, analyze), None
+
+    async def extract_async(
+        self,
+        url,
+        keyword=None,
+        fields=None,
+        keywords=None,
+        engine=None,
+        bypass_cache=False,
+    ):
+        """
+        ``extract`` for asyncio callers, downloading the page with ``engine``
+        (see ``SEOAnalysisService.perform_local_seo_analysis_async``).
+        """
+        try:
+            key = normalize_url(url)
+            names = resolve_fields(fields)
+        except (AttributeError, ValueError):
+            key = None
+        if key is None or not self.cache.enabled:
+            seo_data = await self.seo_service.perform_local_seo_analysis_async(
+                url, keyword, fields=fields, keywords=keywords, engine=engine
+            )
+            return seo_data, None
+
+        keywords_key = keyword_key(names, keyword, keywords)
+        cached = self._lookup(key, names, keywords_key, bypass_cache)
+        if cached is not None:
+            return cached
+
+        async def analyze():
+            seo_data = await self.seo_service.perform_local_seo_analysis_async(
+                url, keyword, fields=fields, keywords=keywords, engine=engine
+            )
+            if "error" not in seo_data:
+                self.cache.store(key, names, keywords_key, seo_data)
+            return seo_data
+
+        flight_key = (key, tuple(names), keywords_key)
+        return await self.async_flights.do(flight_key, analyze), None
+
+    def perform_local_seo_analysis(self, url, keyword=None, fields=None, keywords=None):
+        """
+        ``SEOAnalysisService.perform_local_seo_analysis`` through the cache.
+        """
+        seo_data, _ = self.extract(url, keyword, fields=fields, keywords=keywords)
+        return seo_data
+
+    def _lookup(self, key, names, keywords_key, bypass_cache):
+        if bypass_cache:
+            self.cache.count("bypasses")
+            return None
+        return self.cache.lookup(key, names, keywords_key)
+
+    def _analyze(self, url, keyword, fields, keywords):
+        return self.seo_service.perform_local_seo_analysis(
+            url, keyword, fields=fields, keywords=keywords
+        )
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_seo_data_cache():
+    """
+    Return the process-wide extracted SEO data cache.
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = SEODataCache()
+    return _cache
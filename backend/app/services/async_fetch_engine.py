@@ -0,0 +1,245 @@
+import asyncio
+import logging
+import random
+
+import aiohttp
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from app.config import Config
+from app.services.http_client import HTML_CONTENT_TYPES, STATUS_DRAIN_BYTES
+from app.services.origin_metadata_cache import normalize_url
+from app.services.response_cache import get_response_cache
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = (429, 502, 503, 504)
+
+
+class AsyncFetchEngine:
+    """
+    asyncio page fetcher for bulk analyses.
+
+    All requests share one aiohttp connection pool that bounds both the total
+    number of open connections and the number per host. Each fetch gets connect,
+    read and total timeouts, retries transient failures with exponential backoff
+    (honouring Retry-After), enforces the same HTML content-type check and byte cap
+    as ``HTTPClient.get_page`` and goes through the shared response cache.
+
+    Use it as an async context manager::
+
+        async with AsyncFetchEngine() as engine:
+            response = await engine.fetch_page(url)
+    """
+
+    def __init__(
+        self,
+        max_concurrency=None,
+        per_host_concurrency=None,
+        connect_timeout=None,
+        read_timeout=None,
+        total_timeout=None,
+        max_retries=None,
+        backoff_factor=None,
+        max_page_bytes=None,
+        response_cache=None,
+        user_agent=None,
+        chunk_size=64 * 1024,
+    ):
+        self.max_concurrency = (
+            max_concurrency
+            if max_concurrency is not None
+            else Config.ASYNC_FETCH_MAX_CONCURRENCY
+        )
+        self.per_host_concurrency = (
+            per_host_concurrency
+            if per_host_concurrency is not None
+            else Config.ASYNC_FETCH_PER_HOST_CONCURRENCY
+        )
+        self.connect_timeout = (
+            connect_timeout
+            if connect_timeout is not None
+            else Config.HTTP_CONNECT_TIMEOUT
+        )
+        self.read_timeout = (
+            read_timeout if read_timeout is not None else Config.HTTP_READ_TIMEOUT
+        )
+        self.total_timeout = (
+            total_timeout
+            if total_timeout is not None
+            else Config.ASYNC_FETCH_TOTAL_TIMEOUT
+        )
+        self.max_retries = (
+            max_retries if max_retries is not None else Config.HTTP_MAX_RETRIES
+        )
+        self.backoff_factor = (
+            backoff_factor if backoff_factor is not None else Config.HTTP_BACKOFF_FACTOR
+        )
+        self.max_page_bytes = (
+            max_page_bytes if max_page_bytes is not None else Config.HTTP_MAX_PAGE_BYTES
+        )
+        self.response_cache = response_cache or get_response_cache()
+        self.user_agent = user_agent or Config.HTTP_USER_AGENT
+        self.chunk_size = chunk_size
+        self.session = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def start(self):
+        """
+        Open the pooled client session.
+        """
+        if self.session is None:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_concurrency,
+                limit_per_host=self.per_host_concurrency,
+                ttl_dns_cache=300,
+            )
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(
+                    total=self.total_timeout,
+                    sock_connect=self.connect_timeout,
+                    sock_read=self.read_timeout,
+                ),
+                cookie_jar=aiohttp.DummyCookieJar(),
+                headers={"User-Agent": self.user_agent},
+            )
+
+    async def close(self):
+        """
+        Close the client session and all pooled connections.
+        """
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def fetch_page(self, url):
+        """
+        Fetch a page through the response cache, returning a ``requests.Response``
+        so results can be fed to the same extraction code as synchronous fetches.
+        Concurrent fetches of the same normalized URL share one upstream request.
+        """
+        try:
+            key = normalize_url(url)
+        except ValueError:
+            key = url
+        return await self.response_cache.async_flights.do(key, self._fetch_page, url)
+
+    async def _fetch_page(self, url):
+        cache = self.response_cache
+        entry = await asyncio.to_thread(cache.lookup, url) if cache.enabled else None
+        if entry is not None and cache.is_fresh(entry):
+            return cache.to_response(entry)
+
+        headers = cache.conditional_headers(entry) if entry is not None else {}
+        response = await self._get_with_retries(url, headers)
+
+        if entry is not None and response.status_code == 304:
+            entry = await asyncio.to_thread(cache.refresh, url, entry, response.headers)
+            cache.count("revalidations")
+            return cache.to_response(entry)
+
+        if cache.enabled:
+            cache.count("misses")
+            await asyncio.to_thread(
+                cache.store,
+                url,
+                response.status_code,
+                response.headers,
+                response.content,
+                truncated=response.truncated,
+            )
+        return response
+
+    async def fetch_status(self, url, headers=None):
+        """
+        GET ``url`` for its status and headers, returning a ``requests.Response``
+        without content. Small bodies are drained (see ``HTTPClient.get_status``)
+        so the connection is reused. Used for origin file checks such as
+        robots.txt, which share the engine's connection limits and retries.
+        """
+        return await self._get_with_retries(url, headers or {}, self._get_status)
+
+    async def _get_with_retries(self, url, headers, get=None):
+        await self.start()
+        get = get or self._get_page
+        attempt = 0
+        while True:
+            try:
+                response = await get(url, headers)
+                if response.status_code not in RETRY_STATUSES or (
+                    attempt >= self.max_retries
+                ):
+                    return response
+                delay = self._retry_delay(attempt, response.headers.get("Retry-After"))
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._retry_delay(attempt)
+                logger.debug(f"Retrying {url} after error: {e!r}")
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    def _retry_delay(self, attempt, retry_after=None):
+        """
+        Exponential backoff with full jitter; Retry-After (in seconds) wins.
+        """
+        if retry_after:
+            try:
+                return min(float(retry_after), 60.0)
+            except ValueError:
+                pass
+        return random.uniform(0, self.backoff_factor * (2**attempt))
+
+    async def _get_page(self, url, headers):
+        async with self.session.get(url, headers=headers) as response:
+            if response.status == 200:
+                mime_type = (response.content_type or "").lower()
+                if response.headers.get("Content-Type") and (
+                    mime_type not in HTML_CONTENT_TYPES
+                ):
+                    raise ValueError(f"Unsupported content type: {mime_type}")
+
+            chunks = []
+            size = 0
+            truncated = False
+            async for chunk in response.content.iter_chunked(self.chunk_size):
+                if size + len(chunk) > self.max_page_bytes:
+                    chunks.append(chunk[: self.max_page_bytes - size])
+                    truncated = True
+                    # Drop the connection rather than draining the rest of the body.
+                    response.close()
+                    break
+                chunks.append(chunk)
+                size += len(chunk)
+
+            page = self._to_response(response, b"".join(chunks))
+            page.truncated = truncated
+            return page
+
+    async def _get_status(self, url, headers):
+        async with self.session.get(url, headers=headers) as response:
+            size = 0
+            async for chunk in response.content.iter_chunked(self.chunk_size):
+                size += len(chunk)
+                if size > STATUS_DRAIN_BYTES:
+                    # Drop the connection rather than draining a large body.
+                    response.close()
+                    break
+            return self._to_response(response, b"")
+
+    def _to_response(self, response, content):
+        page = requests.Response()
+        page.status_code = response.status
+        page.reason = response.reason
+        page.url = str(response.url)
+        page.headers = CaseInsensitiveDict(response.headers)
+        page.encoding = response.charset
+        page._content = content
+        return page
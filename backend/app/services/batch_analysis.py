@@ -0,0 +1,84 @@
+import asyncio
+import json
+import logging
+import time
+
+from app.config import Config
+from app.services.composite_analysis import ANALYSIS_TYPES, composite_fields
+
+logger = logging.getLogger(__name__)
+
+
+def resolve_batch(urls, analyses, max_urls=None):
+    """
+    Validate a batch request, returning the SEO fields its analysis types need.
+    Raises ``ValueError`` on a malformed request.
+    """
+    max_urls = max_urls if max_urls is not None else Config.BATCH_MAX_URLS
+    if not urls or not isinstance(urls, list):
+        raise ValueError("urls must be a non-empty list of URLs")
+    if not all(isinstance(url, str) for url in urls):
+        raise ValueError("urls must be a list of strings")
+    if len(urls) > max_urls:
+        raise ValueError(f"A batch may contain at most {max_urls} URLs")
+    analyses = analyses or ["technical-seo"]
+    if not isinstance(analyses, list):
+        raise ValueError("analyses must be a list of analysis types")
+    unknown = [name for name in analyses if name not in ANALYSIS_TYPES]
+    if unknown:
+        raise ValueError(f"Unknown analyses: {', '.join(map(str, unknown))}")
+    return composite_fields(analyses)
+
+
+def iterate_async(async_iterable):
+    """
+    Drive an async iterable from synchronous code on a private event loop, one
+    item at a time. Closing the generator early closes the async iterable too,
+    and tasks it left behind are cancelled and awaited before the loop closes.
+    """
+    loop = asyncio.new_event_loop()
+    iterator = async_iterable.__aiter__()
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(iterator.__anext__())
+            except StopAsyncIteration:
+                return
+    finally:
+        if hasattr(iterator, "aclose"):
+            loop.run_until_complete(iterator.aclose())
+        pending = asyncio.all_tasks(loop)
+        for task in pending:
+            task.cancel()
+        if pending:
+            loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+        loop.close()
+
+
+def stream_batch(seo_service, urls, fields, keyword=None, keywords=None):
+    """
+    Analyze ``urls`` with ``SEOAnalysisService.analyze_many`` and yield one
+    NDJSON line per URL as soon as it completes, then a summary line. Per-URL
+    failures are reported on their own line and do not stop the batch.
+    """
+    started = time.monotonic()
+    counts = {"succeeded": 0, "failed": 0}
+    results = seo_service.analyze_many(urls, keyword, fields=fields, keywords=keywords)
+    try:
+        for url, result in iterate_async(results):
+            if "error" in result:
+                counts["failed"] += 1
+                line = {"url": url, "error": result["error"]}
+            else:
+                counts["succeeded"] += 1
+                line = {"url": url, "seo_data": result}
+            yield json.dumps(line) + "\n"
+    except Exception as e:
+        logger.error(f"Batch analysis aborted: {e}", exc_info=True)
+        yield json.dumps({"error": "Internal server error", "message": str(e)}) + "\n"
+    summary = {
+        "total": len(urls),
+        **counts,
+        "elapsed": round(time.monotonic() - started, 3),
+    }
+    yield json.dumps({"summary": summary}) + "\n"
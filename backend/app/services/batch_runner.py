@@ -0,0 +1,210 @@
+import csv
+import hashlib
+import json
+import os
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from app.services.perplexity_service import PerplexityService
+
+CSV_FIELDS = ["prompt_id", "prompt", "status", "latency", "completed_at", "response"]
+
+
+def prompt_id(prompt):
+    """
+    Stable identifier for a prompt, used to recognise finished work on reruns.
+    """
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:16]
+
+
+def percentile(values, fraction):
+    """
+    Nearest-rank percentile of ``values`` (0 when empty).
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class ResultWriter:
+    """
+    Append-only JSONL or CSV results file (chosen by extension) that doubles as
+    the run's checkpoint. Every record is flushed as soon as it is written, so an
+    interrupted run keeps everything that finished.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.format = "csv" if path.lower().endswith(".csv") else "jsonl"
+        self._lock = threading.Lock()
+        self._file = None
+        self._writer = None
+
+    def completed(self):
+        """
+        Return the ids of prompts that already have a successful result.
+        """
+        if not os.path.exists(self.path):
+            return set()
+        self._drop_partial_record()
+        done = set()
+        with open(self.path, newline="", encoding="utf-8") as f:
+            if self.format == "csv":
+                records = csv.DictReader(f)
+            else:
+                records = (json.loads(line) for line in f if line.strip())
+            for record in records:
+                # Older files have no status column; treat those rows as unfinished.
+                if record.get("status") == "ok":
+                    done.add(record.get("prompt_id") or prompt_id(record["prompt"]))
+        return done
+
+    def _drop_partial_record(self):
+        """
+        Truncate an unterminated last line, the half-written record a killed run
+        leaves behind, so resuming neither fails on it nor appends onto it.
+        """
+        with open(self.path, "r+b") as f:
+            data = f.read()
+            if data and not data.endswith(b"\n"):
+                f.truncate(data.rfind(b"\n") + 1)
+
+    def write(self, record):
+        with self._lock:
+            if self._file is None:
+                self._open()
+            if self.format == "csv":
+                self._writer.writerow(
+                    {**record, "response": json.dumps(record["response"])}
+                )
+            else:
+                self._file.write(json.dumps(record) + "\n")
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _open(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        is_new = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        self._file = open(self.path, "a", newline="", encoding="utf-8")
+        if self.format == "csv":
+            self._writer = csv.DictWriter(self._file, fieldnames=CSV_FIELDS)
+            if is_new:
+                self._writer.writeheader()
+
+
+class BatchPromptRunner:
+    """
+    Run a list of prompts against Perplexity with bounded concurrency.
+
+    Requests go through ``PerplexityService`` and therefore through the shared
+    rate limiter. Each result records the raw chat completion, usage included.
+    Results are streamed to ``output_path`` as they complete and
+    prompts that already succeeded in an earlier run are skipped.
+    """
+
+    def __init__(
+        self,
+        output_path,
+        service=None,
+        concurrency=4,
+        bypass_cache=True,
+        prompt_type="batch",
+    ):
+        self.writer = ResultWriter(output_path)
+        self.service = service or PerplexityService()
+        self.concurrency = concurrency
+        self.bypass_cache = bypass_cache
+        self.prompt_type = prompt_type
+
+    def run(self, prompts, progress=print):
+        """
+        Run every unfinished prompt and return a summary of the run.
+        """
+        started = time.monotonic()
+        done = self.writer.completed()
+        pending = list(
+            {
+                prompt_id(prompt): prompt
+                for prompt in prompts
+                if prompt_id(prompt) not in done
+            }.items()
+        )
+        skipped = len(prompts) - len(pending)
+        latencies = []
+        failed = 0
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+                futures = [
+                    executor.submit(self._run_one, pid, prompt)
+                    for pid, prompt in pending
+                ]
+                for finished, future in enumerate(as_completed(futures), 1):
+                    record = future.result()
+                    latencies.append(record["latency"])
+                    failed += record["status"] != "ok"
+                    progress(
+                        f"[{finished}/{len(pending)}] {record['status']} "
+                        f"{record['latency']:.2f}s {record['prompt'][:60]}"
+                    )
+        finally:
+            self.writer.close()
+
+        elapsed = time.monotonic() - started
+        return {
+            "total": len(prompts),
+            "skipped": skipped,
+            "completed": len(latencies) - failed,
+            "failed": failed,
+            "elapsed": round(elapsed, 3),
+            "throughput": round(len(latencies) / elapsed, 3) if elapsed else 0.0,
+            "latency_mean": round(statistics.fmean(latencies), 3) if latencies else 0.0,
+            "latency_p50": round(percentile(latencies, 0.5), 3),
+            "latency_p95": round(percentile(latencies, 0.95), 3),
+            "latency_max": round(max(latencies, default=0.0), 3),
+        }
+
+    def _run_one(self, pid, prompt):
+        started = time.monotonic()
+        try:
+            response = self.service.query_completion(
+                prompt, prompt_type=self.prompt_type, bypass_cache=self.bypass_cache
+            )
+        except Exception as e:
+            response = {"error": str(e)}
+        # A stale fallback is not a result of this run.
+        ok = bool(response.get("choices")) and not response.get("stale")
+        record = {
+            "prompt_id": pid,
+            "prompt": prompt,
+            "status": "ok" if ok else "error",
+            "latency": round(time.monotonic() - started, 3),
+            "completed_at": time.time(),
+            "response": response,
+        }
+        self.writer.write(record)
+        return record
+
+
+def format_summary(summary):
+    """
+    One-screen summary of a batch run.
+    """
+    return (
+        f"{summary['completed']} ok, {summary['failed']} failed, "
+        f"{summary['skipped']} skipped of {summary['total']} prompts "
+        f"in {summary['elapsed']:.1f}s ({summary['throughput']:.2f} prompts/s)\n"
+        f"latency mean {summary['latency_mean']:.2f}s, "
+        f"p50 {summary['latency_p50']:.2f}s, p95 {summary['latency_p95']:.2f}s, "
+        f"max {summary['latency_max']:.2f}s"
+    )
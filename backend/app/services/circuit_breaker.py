@@ -0,0 +1,146 @@
+import threading
+import time
+
+from app.config import Config
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised instead of calling an upstream whose circuit is open.
+    """
+
+
+class CircuitBreaker:
+    """
+    Thread-safe circuit breaker.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and calls
+    are refused for ``recovery_timeout`` seconds. It then goes half-open and lets
+    up to ``half_open_max_calls`` probe calls through: a successful probe closes
+    the circuit, a failed one opens it again.
+    """
+
+    def __init__(
+        self,
+        name,
+        failure_threshold=None,
+        recovery_timeout=None,
+        half_open_max_calls=1,
+    ):
+        self.name = name
+        self.failure_threshold = (
+            failure_threshold
+            if failure_threshold is not None
+            else Config.PERPLEXITY_CIRCUIT_FAILURE_THRESHOLD
+        )
+        self.recovery_timeout = (
+            recovery_timeout
+            if recovery_timeout is not None
+            else Config.PERPLEXITY_CIRCUIT_RECOVERY_TIMEOUT
+        )
+        self.half_open_max_calls = half_open_max_calls
+        self._lock = threading.Lock()
+        self.reset()
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._current_state(time.monotonic())
+
+    def allow_request(self):
+        """
+        Whether a call may go upstream now. In the half-open state this admits
+        a limited number of probes.
+        """
+        with self._lock:
+            state = self._current_state(time.monotonic())
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and self._probes < self.half_open_max_calls:
+                self._probes += 1
+                return True
+            self._stats["rejected"] += 1
+            return False
+
+    def check(self):
+        """
+        Raise ``CircuitOpenError`` unless a call may go upstream now.
+        """
+        if not self.allow_request():
+            raise CircuitOpenError(f"{self.name} circuit is open")
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._probes = 0
+            self._opened_at = None
+
+    def record_cancelled(self):
+        """
+        A call admitted by ``allow_request`` never reached the upstream; give its
+        half-open probe back.
+        """
+        with self._lock:
+            self._probes = max(0, self._probes - 1)
+
+    def record_failure(self):
+        with self._lock:
+            now = time.monotonic()
+            self._failures += 1
+            self._stats["failures"] += 1
+            if (
+                self._current_state(now) == HALF_OPEN
+                or self._failures >= self.failure_threshold
+            ):
+                if self._opened_at is None or self._probes:
+                    self._stats["opened"] += 1
+                self._opened_at = now
+                self._probes = 0
+
+    def stats(self):
+        """
+        Current state plus failure, open and rejection counters.
+        """
+        with self._lock:
+            return {
+                "state": self._current_state(time.monotonic()),
+                "consecutive_failures": self._failures,
+                **self._stats,
+            }
+
+    def reset(self):
+        """
+        Close the circuit and reset the counters.
+        """
+        with self._lock:
+            self._failures = 0
+            self._probes = 0
+            self._opened_at = None
+            self._stats = {"failures": 0, "opened": 0, "rejected": 0}
+
+    def _current_state(self, now):
+        if self._opened_at is None:
+            return CLOSED
+        if now - self._opened_at < self.recovery_timeout:
+            return OPEN
+        return HALF_OPEN
+
+
+_breaker = None
+_breaker_lock = threading.Lock()
+
+
+def get_perplexity_circuit_breaker():
+    """
+    Return the process-wide circuit breaker for the Perplexity API.
+    """
+    global _breaker
+    if _breaker is None:
+        with _breaker_lock:
+            if _breaker is None:
+                _breaker = CircuitBreaker("Perplexity")
+    return _breaker
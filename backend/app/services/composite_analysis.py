@@ -0,0 +1,238 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from app.config import Config
+from app.services.perplexity_service import PerplexityService
+from app.services.seo_analysis_service import SEOAnalysisService
+from app.services.seo_fields import ROUTE_FIELDS
+
+COMPOSITE_MODES = ("parallel", "combined")
+
+# Background workers for the per-section Perplexity calls of parallel composites.
+_section_executor = ThreadPoolExecutor(
+    max_workers=Config.COMPOSITE_ANALYSIS_WORKERS,
+    thread_name_prefix="composite-analysis",
+)
+
+
+class AnalysisType:
+    """
+    One analysis a composite request can include: the ``PerplexityService``
+    prompt method that builds it, the request parameters that method needs after
+    ``url`` and ``seo_data``, and the prompt type it is cached and metered under.
+    """
+
+    def __init__(self, prompt_method, prompt_type, params=()):
+        self.prompt_method = prompt_method
+        self.prompt_type = prompt_type
+        self.params = params
+
+    def build_prompt(self, perplexity_service, url, seo_data, params):
+        args = [params[name] for name in self.params]
+        return getattr(perplexity_service, self.prompt_method)(url, seo_data, *args)
+
+
+# Keyed like the single-analysis routes (and ROUTE_FIELDS).
+ANALYSIS_TYPES = {
+    "content-optimization": AnalysisType(
+        "create_content_optimization_prompt", "content_optimization", ("keyword",)
+    ),
+    "technical-seo": AnalysisType(
+        "create_technical_seo_audit_prompt", "technical_seo_audit"
+    ),
+    "local-seo": AnalysisType(
+        "create_local_seo_enhancement_prompt", "local_seo_enhancement", ("location",)
+    ),
+    "competitor-comparison": AnalysisType(
+        "create_competitor_comparison_prompt",
+        "competitor_comparison",
+        ("competitor_url",),
+    ),
+    "ecommerce-seo": AnalysisType(
+        "create_ecommerce_seo_optimization_prompt",
+        "ecommerce_seo_optimization",
+        ("product_name",),
+    ),
+    "content-gap": AnalysisType(
+        "create_content_gap_analysis_prompt",
+        "content_gap_analysis",
+        ("related_keywords",),
+    ),
+    "backlink-strategy": AnalysisType(
+        "create_backlink_strategy_prompt", "backlink_strategy"
+    ),
+}
+
+# The single-analysis routes: the basic Perplexity route asks the content
+# optimization question but answers with the SEO data and the analysis side by
+# side.
+ANALYSIS_ROUTES = {
+    "perplexity": ANALYSIS_TYPES["content-optimization"],
+    **ANALYSIS_TYPES,
+}
+
+# Routes whose keyword(s) feed the extracted keyword fields.
+KEYWORD_ROUTES = ("perplexity", "content-optimization")
+
+
+def route_extract_kwargs(route, data):
+    """
+    Keyword arguments for ``AnalysisPipeline.extract`` (or ``extract_async``)
+    for a single-analysis ``route`` and its request body ``data``.
+    """
+    return {
+        "keyword": data.get("keyword") if route in KEYWORD_ROUTES else None,
+        "fields": data.get("fields") or ROUTE_FIELDS[route],
+        "keywords": data.get("related_keywords") if route == "content-gap" else None,
+    }
+
+
+def resolve_analyses(names, params):
+    """
+    Validate the requested analysis types and their parameters, returning the
+    names in request order without duplicates. Raises ``ValueError`` on an
+    unknown type or a missing parameter.
+    """
+    if not names or not isinstance(names, (list, tuple)):
+        raise ValueError("analyses must be a non-empty list of analysis types")
+    names = list(dict.fromkeys(names))
+    unknown = [name for name in names if name not in ANALYSIS_TYPES]
+    if unknown:
+        raise ValueError(f"Unknown analyses: {', '.join(map(str, unknown))}")
+    missing = sorted(
+        {
+            param
+            for name in names
+            for param in ANALYSIS_TYPES[name].params
+            if not params.get(param)
+        }
+    )
+    if missing:
+        raise ValueError(f"Missing parameters: {', '.join(missing)}")
+    return names
+
+
+def composite_fields(names):
+    """
+    Union of the default SEO fields of every requested analysis.
+    """
+    return list(dict.fromkeys(field for name in names for field in ROUTE_FIELDS[name]))
+
+
+def create_composite_prompt(url, prompts, seo_data, prompt_builder):
+    """
+    A single prompt asking for every section, each introduced by a
+    ``## <analysis type>`` heading so the answer can be split again. ``prompts``
+    are the bare section instructions; the page signals are embedded once.
+    """
+    sections = "\n\n".join(f"## {name}\n{prompt}" for name, prompt in prompts.items())
+    instruction = (
+        f"Answer the following {len(prompts)} SEO analyses of the URL '{url}'. "
+        f"Start each answer with a line containing only '## ' followed by the "
+        f"section name, and keep the sections in the order given.\n\n{sections}"
+    )
+    return prompt_builder.build(instruction, seo_data, sections=len(prompts))
+
+
+def split_composite_response(result, names):
+    """
+    Split a combined completion back into one result per analysis type.
+    """
+    if "error" in result:
+        return {name: result for name in names}
+    sections = {}
+    current = None
+    for item in result.get("actionable_insights", []):
+        text = item["insight"]
+        first, _, rest = text.partition("\n")
+        heading = first.strip().lstrip("#").strip().lower()
+        if first.lstrip().startswith("#") and heading in names:
+            current = heading
+            sections.setdefault(current, [])
+            text = rest.strip()
+            if not text:
+                continue
+        if current is not None:
+            sections[current].append({"insight": text})
+    return {
+        name: (
+            {"actionable_insights": sections[name]}
+            if sections.get(name)
+            else {"error": f"No {name} section was provided by Perplexity."}
+        )
+        for name in names
+    }
+
+
+class CompositeAnalysisService:
+    """
+    Answer several analysis types for one URL from a single page fetch and
+    extraction, with the LLM work done either as one structured prompt
+    (``combined``) or as concurrent per-section calls (``parallel``).
+    """
+
+    def __init__(self, seo_service=None, perplexity_service=None):
+        self.seo_service = seo_service or SEOAnalysisService()
+        self.perplexity_service = perplexity_service or PerplexityService()
+
+    def analyze(
+        self,
+        url,
+        analyses,
+        params=None,
+        mode="parallel",
+        fields=None,
+        bypass_cache=False,
+        route=None,
+    ):
+        """
+        Return ``{"seo_data": ..., "analyses": {type: result}}``, or the SEO
+        analysis error. Raises ``ValueError`` for invalid requests. LLM usage is
+        accounted to ``route``.
+        """
+        params = params or {}
+        if mode not in COMPOSITE_MODES:
+            raise ValueError(f"mode must be one of: {', '.join(COMPOSITE_MODES)}")
+        names = resolve_analyses(analyses, params)
+
+        seo_data = self.seo_service.perform_local_seo_analysis(
+            url,
+            params.get("keyword"),
+            fields=fields or composite_fields(names),
+            keywords=params.get("related_keywords"),
+        )
+        if "error" in seo_data:
+            return seo_data
+
+        combined = mode == "combined"
+        prompts = {
+            name: ANALYSIS_TYPES[name].build_prompt(
+                self.perplexity_service,
+                url,
+                None if combined else seo_data,
+                params,
+            )
+            for name in names
+        }
+        if combined:
+            result = self.perplexity_service.query_perplexity(
+                create_composite_prompt(
+                    url, prompts, seo_data, self.perplexity_service.prompt_builder
+                ),
+                prompt_type="composite",
+                bypass_cache=bypass_cache,
+                route=route,
+            )
+            results = split_composite_response(result, names)
+        else:
+            futures = {
+                name: _section_executor.submit(
+                    self.perplexity_service.query_perplexity,
+                    prompt,
+                    prompt_type=ANALYSIS_TYPES[name].prompt_type,
+                    bypass_cache=bypass_cache,
+                    route=route,
+                )
+                for name, prompt in prompts.items()
+            }
+            results = {name: future.result() for name, future in futures.items()}
+        return {"seo_data": seo_data, "analyses": results}
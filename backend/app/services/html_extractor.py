@@ -0,0 +1,245 @@
+from bs4.element import CData, PreformattedString, Tag
+
+SOCIAL_MEDIA_PLATFORMS = (
+    "facebook.com",
+    "twitter.com",
+    "instagram.com",
+    "linkedin.com",
+)
+
+# Elements whose text BeautifulSoup's get_text() leaves out.
+NON_TEXT_CONTAINERS = frozenset({"script", "style", "template", "rt", "rp"})
+
+# Elements rendered on their own line; their text never runs into a neighbour's.
+BLOCK_ELEMENTS = frozenset(
+    "address article aside blockquote body br caption dd details div dl dt "
+    "fieldset figcaption figure footer form h1 h2 h3 h4 h5 h6 head header hr "
+    "html li main nav ol option p pre section summary table td th title tr ul".split()
+)
+
+
+class SEOSignalCollector:
+    """
+    Parser target that gathers every SEO signal in a single pass over a document.
+
+    It consumes a stream of ``start(tag, attrs)`` / ``end(tag)`` / ``data(text)`` /
+    ``comment(text)`` events, which is the interface of lxml's parser targets, so
+    it can be driven either by walking an already parsed BeautifulSoup tree
+    (``collect_seo_signals``) or directly by a streaming parser. Text follows
+    ``get_text()`` semantics (script, style, template and ruby annotation content
+    and comments are ignored), except that block elements are separated by a
+    newline so words from adjacent blocks never run together.
+    """
+
+    def __init__(self, collect_text=True):
+        self.collect_text = collect_text
+        self.has_title = False
+        self.title = None
+        self.meta_description = None
+        self.h1 = []
+        self.h2 = []
+        self.images = []
+        self.ld_json = []
+        self.mobile_friendly = False
+        self.social_media_links = []
+        self.blog = False
+        self.google_maps_embed = False
+
+        self._title_children = None
+        self._meta_description_seen = False
+        self._ld_json_children = None
+        self._stack = []
+        self._captures = []
+        self._hidden_depth = 0
+        self._text = []
+
+    @property
+    def text(self):
+        """
+        The visible document text.
+        """
+        return "".join(self._text)
+
+    def start(self, tag, attrs):
+        tag = tag.lower()
+        self._child_started()
+
+        if tag in ("h1", "h2"):
+            # Reserve the slot now so nested headings keep document order.
+            headings = getattr(self, tag)
+            headings.append("")
+            self._captures.append((headings, len(headings) - 1, []))
+        elif tag == "title" and not self.has_title:
+            self.has_title = True
+            self._title_children = []
+        elif tag == "meta":
+            self._meta(attrs)
+        elif tag == "img":
+            self.images.append(
+                {"alt": attrs.get("alt", ""), "src": attrs.get("src", "")}
+            )
+        elif tag == "script" and attrs.get("type") == "application/ld+json":
+            self._ld_json_children = []
+        elif tag == "a" and attrs.get("href") is not None:
+            href = attrs["href"]
+            if any(platform in href for platform in SOCIAL_MEDIA_PLATFORMS):
+                self.social_media_links.append(href)
+        elif tag == "section" and attrs.get("id") == "blog":
+            self.blog = True
+        elif tag == "div" and "blog" in _class_list(attrs.get("class")):
+            self.blog = True
+        elif tag == "iframe":
+            src = attrs.get("src")
+            if src and "google.com/maps" in src:
+                self.google_maps_embed = True
+
+        if tag in NON_TEXT_CONTAINERS:
+            self._hidden_depth += 1
+        elif tag in BLOCK_ELEMENTS:
+            self._break_text()
+        self._stack.append(tag)
+
+    def end(self, tag):
+        tag = tag.lower()
+        if tag not in self._stack:
+            return
+        # Implicitly close anything left open inside this element.
+        while self._stack:
+            open_tag = self._stack.pop()
+            self._element_closed(open_tag)
+            if open_tag == tag:
+                break
+
+    def data(self, text):
+        if self._title_children is not None and self._stack[-1:] == ["title"]:
+            self._title_children.append(text)
+        if self._ld_json_children is not None and self._stack[-1:] == ["script"]:
+            self._ld_json_children.append(text)
+        if self._hidden_depth:
+            return
+        for _, _, parts in self._captures:
+            parts.append(text)
+        if self.collect_text:
+            self._text.append(text)
+
+    def comment(self, text):
+        self._child_started()
+
+    def close(self):
+        while self._stack:
+            self._element_closed(self._stack.pop())
+        return self
+
+    def _child_started(self):
+        # Only a single text child counts as ``.string``.
+        if self._title_children is not None and self._stack[-1:] == ["title"]:
+            self._title_children.append(None)
+        if self._ld_json_children is not None and self._stack[-1:] == ["script"]:
+            self._ld_json_children.append(None)
+
+    def _break_text(self):
+        if self.collect_text and not self._hidden_depth:
+            self._text.append("\n")
+
+    def _element_closed(self, tag):
+        if tag in NON_TEXT_CONTAINERS:
+            self._hidden_depth -= 1
+        elif tag in BLOCK_ELEMENTS:
+            self._break_text()
+        if tag in ("h1", "h2"):
+            headings, index, parts = self._captures.pop()
+            headings[index] = "".join(parts)
+        elif tag == "title" and self._title_children is not None:
+            children = self._title_children
+            self.title = children[0] if len(children) == 1 else None
+            self._title_children = None
+        elif tag == "script" and self._ld_json_children is not None:
+            children = self._ld_json_children
+            self.ld_json.append(children[0] if len(children) == 1 else None)
+            self._ld_json_children = None
+
+    def _meta(self, attrs):
+        name = attrs.get("name")
+        if name == "description" and not self._meta_description_seen:
+            self._meta_description_seen = True
+            self.meta_description = attrs.get("content") or None
+        elif name == "viewport":
+            self.mobile_friendly = True
+
+
+def _class_list(value):
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return value.split()
+    return value
+
+
+def walk_soup(soup, target):
+    """
+    Replay a parsed BeautifulSoup tree as parser events on ``target``, visiting
+    every node exactly once.
+    """
+    stack = [(None, iter(soup.contents))]
+    while stack:
+        name, children = stack[-1]
+        node = next(children, None)
+        if node is None:
+            stack.pop()
+            if name is not None:
+                target.end(name)
+        elif isinstance(node, Tag):
+            target.start(node.name, node.attrs)
+            stack.append((node.name, iter(node.contents)))
+        elif isinstance(node, PreformattedString) and not isinstance(node, CData):
+            # Comments, doctypes, declarations and processing instructions
+            target.comment(str(node))
+        else:
+            target.data(str(node))
+    return target.close()
+
+
+def walk_selectolax(node, target):
+    """
+    Replay a selectolax (lexbor) tree rooted at ``node`` as parser events on
+    ``target``.
+
+    Valueless attributes come back from lexbor as ``None``; they are reported as
+    empty strings, which is how BeautifulSoup represents them.
+    """
+    stack = [(None, node.child)]
+    while stack:
+        name, node = stack[-1]
+        if node is None:
+            stack.pop()
+            if name is not None:
+                target.end(name)
+            continue
+        stack[-1] = (name, node.next)
+        tag = node.tag
+        if tag == "-text":
+            target.data(node.text_content)
+        elif tag.startswith("-") or tag.startswith("!"):
+            # Comments, doctypes and processing instructions
+            target.comment("")
+        else:
+            attrs = {
+                key: "" if value is None else value
+                for key, value in node.attributes.items()
+            }
+            target.start(tag, attrs)
+            stack.append((tag, node.child))
+    return target.close()
+
+
+def collect_seo_signals(document, collect_text=True):
+    """
+    Collect all SEO signals from a parsed document in one traversal.
+
+    ``document`` is either a BeautifulSoup object or a selectolax parser, as
+    returned by ``parse_html``.
+    """
+    target = SEOSignalCollector(collect_text=collect_text)
+    if isinstance(document, Tag):
+        return walk_soup(document, target)
+    return walk_selectolax(document.root.parent, target)
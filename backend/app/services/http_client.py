@@ -0,0 +1,240 @@
+import threading
+from http.cookiejar import DefaultCookiePolicy
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import EmptyPoolError
+from urllib3.util.retry import Retry
+
+from app.config import Config
+
+# Content types that are parsed as pages; a missing Content-Type is accepted too.
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
+
+# Status checks read and discard up to this much of a body so the connection can
+# go back to the pool; anything larger is cheaper to drop than to drain.
+STATUS_DRAIN_BYTES = 64 * 1024
+
+
+class HTTPClient:
+    """
+    Shared, connection-pooled HTTP client used by the analysis services to fetch pages.
+
+    A single ``requests.Session`` is mounted with pooled adapters so that repeated
+    fetches against the same origin reuse keep-alive TCP/TLS connections. The
+    underlying urllib3 pool manager is thread-safe; cookie persistence is disabled
+    so that concurrent requests never share session state. At most
+    ``pool_maxsize`` connections are open per host; a request waits up to
+    ``pool_timeout`` seconds for one to free up.
+
+    Defaults come from the ``HTTP_*`` settings in ``Config``.
+    """
+
+    def __init__(
+        self,
+        connect_timeout=None,
+        read_timeout=None,
+        pool_connections=None,
+        pool_maxsize=None,
+        pool_timeout=None,
+        max_retries=None,
+        backoff_factor=None,
+        user_agent=None,
+        max_page_bytes=None,
+        chunk_size=64 * 1024,
+    ):
+        self.connect_timeout = (
+            connect_timeout
+            if connect_timeout is not None
+            else Config.HTTP_CONNECT_TIMEOUT
+        )
+        self.read_timeout = (
+            read_timeout if read_timeout is not None else Config.HTTP_READ_TIMEOUT
+        )
+        self.pool_connections = (
+            pool_connections
+            if pool_connections is not None
+            else Config.HTTP_POOL_CONNECTIONS
+        )
+        self.pool_maxsize = (
+            pool_maxsize if pool_maxsize is not None else Config.HTTP_POOL_MAXSIZE
+        )
+        self.pool_timeout = (
+            pool_timeout if pool_timeout is not None else Config.HTTP_POOL_TIMEOUT
+        )
+        self.max_retries = (
+            max_retries if max_retries is not None else Config.HTTP_MAX_RETRIES
+        )
+        self.backoff_factor = (
+            backoff_factor if backoff_factor is not None else Config.HTTP_BACKOFF_FACTOR
+        )
+        self.user_agent = user_agent or Config.HTTP_USER_AGENT
+        self.max_page_bytes = (
+            max_page_bytes if max_page_bytes is not None else Config.HTTP_MAX_PAGE_BYTES
+        )
+        self.chunk_size = chunk_size
+        self.session = self._build_session()
+
+    @property
+    def timeout(self):
+        """
+        The (connect, read) timeout tuple applied to every request.
+        """
+        return (self.connect_timeout, self.read_timeout)
+
+    def get(self, url, **kwargs):
+        """
+        Issue a GET request through the pooled session with the configured timeouts.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session.get(url, **kwargs)
+
+    def get_page(self, url, headers=None, max_bytes=None):
+        """
+        Stream an HTML page, reading at most ``max_bytes`` of decoded body.
+
+        Successful responses whose Content-Type is not HTML are rejected before
+        any of the body is read. The body is decompressed incrementally and the
+        download stops as soon as the cap is reached, in which case the
+        connection is dropped and ``response.truncated`` is set.
+        """
+        max_bytes = self.max_page_bytes if max_bytes is None else max_bytes
+        response = self.get(url, headers=headers or {}, stream=True)
+        truncated = False
+        try:
+            if response.status_code == 200:
+                content_type = response.headers.get("Content-Type") or ""
+                mime_type = content_type.split(";")[0].strip().lower()
+                if mime_type and mime_type not in HTML_CONTENT_TYPES:
+                    raise ValueError(f"Unsupported content type: {mime_type}")
+
+            chunks = []
+            size = 0
+            for chunk in response.iter_content(chunk_size=self.chunk_size):
+                if size + len(chunk) > max_bytes:
+                    chunks.append(chunk[: max_bytes - size])
+                    truncated = True
+                    break
+                chunks.append(chunk)
+                size += len(chunk)
+        finally:
+            # Closes the socket if the body was not read to the end, otherwise
+            # returns the connection to the pool.
+            response.close()
+
+        page = requests.Response()
+        for name in ("status_code", "headers", "url", "reason", "encoding"):
+            setattr(page, name, getattr(response, name))
+        page._content = b"".join(chunks)
+        page.truncated = truncated
+        return page
+
+    def get_status(self, url, headers=None):
+        """
+        GET ``url`` for its status and headers only.
+
+        Up to ``STATUS_DRAIN_BYTES`` of the body is read and discarded so that
+        the keep-alive connection returns to the pool; a longer body is dropped
+        along with its connection. The returned response has no content.
+        """
+        response = self.get(url, headers=headers or {}, stream=True)
+        try:
+            size = 0
+            for chunk in response.iter_content(chunk_size=self.chunk_size):
+                size += len(chunk)
+                if size > STATUS_DRAIN_BYTES:
+                    break
+        finally:
+            response.close()
+        return response
+
+    def close(self):
+        """
+        Close all pooled connections.
+        """
+        self.session.close()
+
+    def _build_session(self):
+        """
+        Create a session whose adapters bound connections per host and retry
+        idempotent requests on connection errors and transient upstream statuses.
+        """
+        retry = Retry(
+            total=self.max_retries,
+            connect=self.max_retries,
+            read=self.max_retries,
+            status=self.max_retries,
+            backoff_factor=self.backoff_factor,
+            status_forcelist=(429, 502, 503, 504),
+            allowed_methods=frozenset({"GET", "HEAD"}),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = PoolTimeoutAdapter(
+            pool_timeout=self.pool_timeout,
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            max_retries=retry,
+            pool_block=True,
+        )
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers["User-Agent"] = self.user_agent
+        session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        return session
+
+
+class PoolTimeoutAdapter(HTTPAdapter):
+    """
+    ``HTTPAdapter`` whose blocking pools wait at most ``pool_timeout`` seconds
+    for a free connection (requests never passes urllib3 a pool timeout, so a
+    blocking pool would otherwise wait forever). Running out of time raises
+    ``requests.ConnectTimeout``.
+    """
+
+    __attrs__ = HTTPAdapter.__attrs__ + ["pool_timeout"]
+
+    def __init__(self, pool_timeout=None, **kwargs):
+        self.pool_timeout = pool_timeout
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            scheme: _with_pool_timeout(pool_class, self.pool_timeout)
+            for scheme, pool_class in self.poolmanager.pool_classes_by_scheme.items()
+        }
+
+    def send(self, request, **kwargs):
+        try:
+            return super().send(request, **kwargs)
+        except EmptyPoolError as e:
+            raise requests.ConnectTimeout(e, request=request)
+
+
+def _with_pool_timeout(pool_class, pool_timeout):
+    class Pool(pool_class):
+        def urlopen(self, method, url, *args, **kwargs):
+            if kwargs.get("pool_timeout") is None:
+                kwargs["pool_timeout"] = pool_timeout
+            return super().urlopen(method, url, *args, **kwargs)
+
+    Pool.__name__ = Pool.__qualname__ = f"PoolTimeout{pool_class.__name__}"
+    return Pool
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_http_client():
+    """
+    Return the process-wide HTTP client, creating it on first use.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = HTTPClient()
+    return _client
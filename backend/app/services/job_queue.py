@@ -0,0 +1,332 @@
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+class QueueFull(Exception):
+    """
+    Raised when a job is submitted while ``max_pending`` jobs are already queued.
+    """
+
+
+class Job:
+    def __init__(self, fn, args, kind=None):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.status = QUEUED
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.done = threading.Event()
+        self._fn = fn
+        self._args = args
+
+    def to_dict(self):
+        job = {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+        if self.done.is_set():
+            job["result"] = self.result
+            if self.error is not None:
+                job["error"] = self.error
+        return job
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Rebuild a job from ``to_dict`` output, e.g. one run by another process.
+        """
+        job = cls(None, (), data.get("kind"))
+        job.id = data["job_id"]
+        job.status = data["status"]
+        job.created_at = data["created_at"]
+        job.started_at = data.get("started_at")
+        job.finished_at = data.get("finished_at")
+        job.result = data.get("result")
+        job.error = data.get("error")
+        if job.status in (SUCCEEDED, FAILED):
+            job.done.set()
+        return job
+
+
+class JobStore:
+    """
+    SQLite record of job states, shared by every worker process on the host so
+    that any of them can report a job another one accepted. Failures are logged
+    rather than raised: the process running a job still knows its state.
+    """
+
+    def __init__(self, db_path=None):
+        self.db_path = db_path or Config.JOB_STORE_PATH
+        self._db = None
+        self._lock = threading.Lock()
+
+    def save(self, job):
+        """
+        Record the job's current state.
+        """
+        try:
+            with self._lock:
+                # Snapshot under the lock so a later save never loses to an
+                # earlier one.
+                payload = json.dumps(job.to_dict())
+                db = self._connection()
+                db.execute(
+                    "INSERT OR REPLACE INTO jobs (job_id, job, updated_at)"
+                    " VALUES (?, ?, ?)",
+                    (job.id, payload, job.finished_at or job.created_at),
+                )
+                db.commit()
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            logger.warning(f"Could not store job {job.id}: {e}")
+
+    def load(self, job_id, since=0):
+        """
+        Return the job last updated at or after ``since``, or ``None``.
+        """
+        try:
+            with self._lock:
+                row = (
+                    self._connection()
+                    .execute(
+                        "SELECT job FROM jobs WHERE job_id = ? AND updated_at >= ?",
+                        (job_id, since),
+                    )
+                    .fetchone()
+                )
+            return Job.from_dict(json.loads(row[0])) if row is not None else None
+        except (sqlite3.Error, KeyError, ValueError) as e:
+            logger.warning(f"Job lookup failed: {e}")
+            return None
+
+    def purge(self, before):
+        """
+        Forget jobs last updated before ``before``.
+        """
+        self._execute("DELETE FROM jobs WHERE updated_at < ?", (before,))
+
+    def delete(self, job_id):
+        """
+        Forget one job.
+        """
+        self._execute("DELETE FROM jobs WHERE job_id = ?", (job_id,))
+
+    def _execute(self, sql, params):
+        try:
+            with self._lock:
+                db = self._connection()
+                db.execute(sql, params)
+                db.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Job store update failed: {e}")
+
+    def _connection(self):
+        if self._db is None:
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            db = sqlite3.connect(self.db_path, timeout=5, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "job_id TEXT PRIMARY KEY, job TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+            db.commit()
+            self._db = db
+        return self._db
+
+
+class JobQueue:
+    """
+    Bounded job queue.
+
+    ``workers`` threads (started on first use) run submitted jobs in order; at
+    most ``max_pending`` jobs wait at a time and further submissions raise
+    ``QueueFull``. Finished jobs are kept for ``result_ttl`` seconds.
+
+    Jobs run in the process that accepted them, but their state is written to a
+    ``JobStore`` so ``get`` answers for jobs accepted by any worker process on
+    the host, polling the store every ``poll_interval`` seconds while waiting.
+
+    A job's function returns ``(result, ok)``; exceptions mark the job failed.
+    """
+
+    def __init__(
+        self,
+        workers=None,
+        max_pending=None,
+        result_ttl=None,
+        store=None,
+        poll_interval=0.25,
+    ):
+        self.workers = workers if workers is not None else Config.JOB_WORKERS
+        self.max_pending = (
+            max_pending if max_pending is not None else Config.JOB_QUEUE_SIZE
+        )
+        self.result_ttl = (
+            result_ttl if result_ttl is not None else Config.JOB_RESULT_TTL
+        )
+        self.store = store or JobStore()
+        self.poll_interval = poll_interval
+        self._queue = queue.Queue(maxsize=self.max_pending)
+        self._jobs = {}
+        self._threads = []
+        self._lock = threading.Lock()
+        self._stats = {"submitted": 0, "succeeded": 0, "failed": 0, "rejected": 0}
+
+    def submit(self, fn, *args, kind=None):
+        """
+        Queue ``fn(*args)`` and return its ``Job`` without waiting for it.
+        """
+        job = Job(fn, args, kind)
+        self._start_workers()
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            with self._lock:
+                self._stats["rejected"] += 1
+            raise QueueFull("Too many queued jobs; try again later")
+        now = time.time()
+        with self._lock:
+            self._purge(now)
+            self._jobs[job.id] = job
+            self._stats["submitted"] += 1
+        self.store.purge(now - self.result_ttl)
+        self.store.save(job)
+        return job
+
+    def get(self, job_id, wait=0):
+        """
+        Return the job, waiting up to ``wait`` seconds for it to finish, or
+        ``None`` when it is unknown or has expired.
+        """
+        with self._lock:
+            self._purge(time.time())
+            job = self._jobs.get(job_id)
+        if job is None:
+            return self._get_shared(job_id, wait)
+        if wait > 0:
+            job.done.wait(wait)
+        return job
+
+    def stats(self):
+        """
+        Queue depth, running jobs and lifetime counters.
+        """
+        with self._lock:
+            running = sum(job.status == RUNNING for job in self._jobs.values())
+            return {
+                **self._stats,
+                "queued": self._queue.qsize(),
+                "running": running,
+                "retained": len(self._jobs),
+                "workers": self.workers,
+            }
+
+    def clear(self):
+        """
+        Forget finished jobs and reset the counters.
+        """
+        with self._lock:
+            finished = [
+                job_id for job_id, job in self._jobs.items() if job.done.is_set()
+            ]
+            for job_id in finished:
+                del self._jobs[job_id]
+            for name in self._stats:
+                self._stats[name] = 0
+        for job_id in finished:
+            self.store.delete(job_id)
+
+    # Internals
+
+    def _get_shared(self, job_id, wait):
+        """
+        Look a job accepted by another process up in the store, polling until
+        it finishes or ``wait`` seconds pass.
+        """
+        deadline = time.monotonic() + wait
+        while True:
+            job = self.store.load(job_id, since=time.time() - self.result_ttl)
+            remaining = deadline - time.monotonic()
+            if job is None or job.done.is_set() or remaining <= 0:
+                return job
+            time.sleep(min(self.poll_interval, remaining))
+
+    def _start_workers(self):
+        if self._threads:
+            return
+        with self._lock:
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(
+                    target=self._work,
+                    name=f"job-worker-{len(self._threads)}",
+                    daemon=True,
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+            job.status = RUNNING
+            job.started_at = time.time()
+            self.store.save(job)
+            try:
+                job.result, ok = job._fn(*job._args)
+                job.status = SUCCEEDED if ok else FAILED
+            except Exception as e:
+                job.error = str(e)
+                job.status = FAILED
+            finally:
+                job.finished_at = time.time()
+                job._fn = job._args = None
+                with self._lock:
+                    self._stats[job.status] += 1
+                job.done.set()
+                self.store.save(job)
+                self._queue.task_done()
+
+    def _purge(self, now):
+        expired = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job.finished_at is not None and job.finished_at + self.result_ttl < now
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue():
+    """
+    Return the process-wide analysis job queue.
+    """
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = JobQueue()
+    return _queue
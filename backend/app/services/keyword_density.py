@@ -0,0 +1,137 @@
+import re
+from collections import deque
+
+# Words, keeping inner apostrophes ("don't") and hyphens ("e-commerce") intact.
+TOKEN_PATTERN = re.compile(r"\w+(?:['’-]\w+)*")
+
+
+def tokenize(text):
+    """
+    Split text into lowercase word tokens.
+    """
+    return TOKEN_PATTERN.findall(text.lower()) if text else []
+
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton over word tokens.
+
+    Every keyword is tokenized the same way as the page, so a keyword only
+    matches whole words ("art" does not match "party") and multi-word phrases
+    match token sequences regardless of the whitespace and punctuation between
+    them. A single pass over the page tokens counts all keywords at once.
+    """
+
+    def __init__(self, keywords):
+        self.keywords = list(dict.fromkeys(keywords))
+        self.phrase_lengths = []
+        self._goto = [{}]
+        self._fail = [0]
+        self._outputs = [[]]
+
+        for index, keyword in enumerate(self.keywords):
+            phrase = tokenize(keyword)
+            self.phrase_lengths.append(len(phrase))
+            if phrase:
+                self._insert(phrase, index)
+        self._link()
+
+    def _insert(self, phrase, index):
+        state = 0
+        for token in phrase:
+            next_state = self._goto[state].get(token)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][token] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._outputs.append([])
+            state = next_state
+        self._outputs[state].append(index)
+
+    def _link(self):
+        # Breadth-first, so every failure target is complete before it is used.
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and token not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(token, 0)
+                self._outputs[next_state] = (
+                    self._outputs[next_state] + self._outputs[self._fail[next_state]]
+                )
+
+    def count(self, tokens):
+        """
+        Count the occurrences of every keyword in a token sequence, returning a
+        list aligned with ``self.keywords``. Overlapping matches all count.
+        """
+        counts = [0] * len(self.keywords)
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        state = 0
+        for token in tokens:
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+            for index in outputs[state]:
+                counts[index] += 1
+        return counts
+
+
+def density(count, phrase_length, word_count):
+    """
+    Percentage of the page's words taken up by a keyword's occurrences.
+    """
+    if word_count == 0:
+        return 0
+    return round((count * phrase_length / word_count) * 100, 2)
+
+
+def keyword_density(text, keyword, tokens=None):
+    """
+    Density of a single keyword (or phrase) in ``text``. Pass ``tokens`` to reuse
+    an already tokenized text.
+    """
+    if tokens is None:
+        tokens = tokenize(text)
+    matcher = KeywordMatcher([keyword])
+    return density(matcher.count(tokens)[0], matcher.phrase_lengths[0], len(tokens))
+
+
+def analyze_keywords(keywords, text, title=None, h1=(), tokens=None):
+    """
+    Count many keywords and phrases in one pass over each part of the page.
+
+    Returns ``{keyword: {"count", "density", "positions"}}`` where ``count`` and
+    ``density`` refer to the whole page text and ``positions`` breaks occurrences
+    down into the title, the H1 headings and the page text ("body"). Pass
+    ``tokens`` to reuse an already tokenized page text.
+    """
+    matcher = KeywordMatcher(keywords)
+    if tokens is None:
+        tokens = tokenize(text)
+    body_counts = matcher.count(tokens)
+    title_counts = matcher.count(tokenize(title))
+    # Headings are matched one by one so phrases never span two of them.
+    h1_counts = [0] * len(matcher.keywords)
+    for heading in h1:
+        for index, count in enumerate(matcher.count(tokenize(heading))):
+            h1_counts[index] += count
+
+    return {
+        keyword: {
+            "count": body_counts[index],
+            "density": density(
+                body_counts[index], matcher.phrase_lengths[index], len(tokens)
+            ),
+            "positions": {
+                "title": title_counts[index],
+                "h1": h1_counts[index],
+                "body": body_counts[index],
+            },
+        }
+        for index, keyword in enumerate(matcher.keywords)
+    }
@@ -0,0 +1,297 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from app.config import Config
+from app.services.single_flight import AsyncSingleFlight, SingleFlight
+
+logger = logging.getLogger(__name__)
+
+
+def parse_ttls(value):
+    """
+    Parse ``"prompt_type=seconds,..."`` into a dict of per-prompt-type TTLs.
+    """
+    ttls = {}
+    for part in (value or "").split(","):
+        name, _, seconds = part.partition("=")
+        if name.strip() and seconds.strip():
+            ttls[name.strip()] = float(seconds)
+    return ttls
+
+
+class LLMCache:
+    """
+    Persistent cache for LLM completions, keyed on model, messages and max_tokens.
+
+    An in-memory LRU sits in front of a SQLite store that survives restarts and is
+    shared by every worker process on the host. Entries expire after a TTL chosen
+    per prompt type (``LLM_CACHE_TTLS``, falling back to ``LLM_CACHE_TTL``), and
+    the least recently used ones are evicted once the store exceeds
+    ``LLM_CACHE_MAX_BYTES``. ``flights`` (and ``async_flights`` for asyncio
+    callers) coalesces identical completion requests that are in flight at the
+    same time.
+    """
+
+    def __init__(
+        self,
+        db_path=None,
+        memory_entries=None,
+        max_bytes=None,
+        default_ttl=None,
+        ttls=None,
+        enabled=None,
+    ):
+        self.db_path = db_path or Config.LLM_CACHE_PATH
+        self.memory_entries = (
+            memory_entries
+            if memory_entries is not None
+            else Config.LLM_CACHE_MEMORY_ENTRIES
+        )
+        self.max_bytes = (
+            max_bytes if max_bytes is not None else Config.LLM_CACHE_MAX_BYTES
+        )
+        self.default_ttl = (
+            default_ttl if default_ttl is not None else Config.LLM_CACHE_TTL
+        )
+        self.ttls = ttls if ttls is not None else parse_ttls(Config.LLM_CACHE_TTLS)
+        self.enabled = enabled if enabled is not None else Config.LLM_CACHE_ENABLED
+        self._memory = OrderedDict()
+        self._db = None
+        self._db_bytes = 0
+        self._lock = threading.RLock()
+        self.flights = SingleFlight()
+        self.async_flights = AsyncSingleFlight()
+        self._stats = {
+            "memory_hits": 0,
+            "db_hits": 0,
+            "misses": 0,
+            "bypasses": 0,
+            "stores": 0,
+            "evictions": 0,
+            "stale_hits": 0,
+        }
+
+    def key(self, model, messages, max_tokens=None):
+        """
+        Cache key for a chat completion request. ``max_tokens`` is part of it so
+        changing the completion budget does not serve answers cut to the old one.
+        """
+        payload = json.dumps(
+            {"model": model, "messages": messages, "max_tokens": max_tokens},
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def ttl_for(self, prompt_type=None):
+        """
+        Lifetime in seconds of a cached completion for the given prompt type.
+        """
+        return self.ttls.get(prompt_type, self.default_ttl)
+
+    def get(self, key, now=None):
+        """
+        Return the cached completion for ``key``, or ``None`` when it is missing
+        or expired.
+        """
+        if not self.enabled:
+            return None
+        now = now if now is not None else time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and entry[1] > now:
+                self._memory.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                return entry[0]
+
+            try:
+                db = self._connection()
+                row = db.execute(
+                    "SELECT response, expires_at FROM llm_responses WHERE key = ?",
+                    (key,),
+                ).fetchone()
+                if row is not None and row[1] > now:
+                    db.execute(
+                        "UPDATE llm_responses SET accessed_at = ? WHERE key = ?",
+                        (now, key),
+                    )
+                    db.commit()
+                    response = json.loads(row[0])
+                    self._remember(key, response, row[1])
+                    self._stats["db_hits"] += 1
+                    return response
+            except (sqlite3.Error, ValueError) as e:
+                logger.warning(f"LLM cache lookup failed: {e}")
+            self._memory.pop(key, None)
+            self._stats["misses"] += 1
+            return None
+
+    def get_stale(self, key):
+        """
+        Return the last stored completion for ``key`` even if it has expired, for
+        use as a fallback while the upstream is unavailable.
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._stats["stale_hits"] += 1
+                return entry[0]
+            try:
+                row = (
+                    self._connection()
+                    .execute("SELECT response FROM llm_responses WHERE key = ?", (key,))
+                    .fetchone()
+                )
+                if row is not None:
+                    self._stats["stale_hits"] += 1
+                    return json.loads(row[0])
+            except (sqlite3.Error, ValueError) as e:
+                logger.warning(f"LLM cache lookup failed: {e}")
+            return None
+
+    def set(self, key, response, prompt_type=None, model=None, now=None):
+        """
+        Store a completion. Failures are logged rather than raised: the cache is
+        an optimisation and must never fail the request that produced the value.
+        """
+        if not self.enabled:
+            return
+        now = now if now is not None else time.time()
+        expires_at = now + self.ttl_for(prompt_type)
+        if expires_at <= now:
+            return
+        try:
+            payload = json.dumps(response)
+            size = len(payload.encode("utf-8"))
+            with self._lock:
+                db = self._connection()
+                row = db.execute(
+                    "SELECT size FROM llm_responses WHERE key = ?", (key,)
+                ).fetchone()
+                db.execute(
+                    "INSERT OR REPLACE INTO llm_responses "
+                    "(key, model, prompt_type, response, size, expires_at, accessed_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (key, model, prompt_type, payload, size, expires_at, now),
+                )
+                self._db_bytes += size - (row[0] if row else 0)
+                self._evict(db, key, now)
+                db.commit()
+                self._remember(key, response, expires_at)
+                self._stats["stores"] += 1
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            logger.warning(f"Could not cache LLM response: {e}")
+
+    def count(self, name):
+        """
+        Increment one of the counters reported by ``stats``.
+        """
+        with self._lock:
+            self._stats[name] += 1
+
+    def stats(self):
+        """
+        Return hit/miss counters and current cache occupancy.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["hits"] = stats["memory_hits"] + stats["db_hits"]
+            stats["memory_entries"] = len(self._memory)
+            stats["db_bytes"] = self._db_bytes
+        stats["coalesced"] = self.flights.coalesced + self.async_flights.coalesced
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        return stats
+
+    def clear(self):
+        """
+        Drop every entry from memory and the database and reset the counters.
+        """
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None or os.path.exists(self.db_path):
+                db = self._connection()
+                db.execute("DELETE FROM llm_responses")
+                db.commit()
+                self._db_bytes = 0
+            for name in self._stats:
+                self._stats[name] = 0
+            self.flights.reset()
+            self.async_flights.reset()
+
+    # Internals
+
+    def _connection(self):
+        if self._db is None:
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            db = sqlite3.connect(self.db_path, timeout=5, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS llm_responses ("
+                "key TEXT PRIMARY KEY, model TEXT, prompt_type TEXT, "
+                "response TEXT NOT NULL, size INTEGER NOT NULL, "
+                "expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            db.execute(
+                "CREATE INDEX IF NOT EXISTS llm_responses_accessed_at "
+                "ON llm_responses (accessed_at)"
+            )
+            db.commit()
+            self._db_bytes = db.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM llm_responses"
+            ).fetchone()[0]
+            self._db = db
+        return self._db
+
+    def _evict(self, db, keep, now):
+        if self._db_bytes <= self.max_bytes:
+            return
+        # Expired rows go first, then the least recently used ones.
+        db.execute("DELETE FROM llm_responses WHERE expires_at <= ?", (now,))
+        self._db_bytes = db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM llm_responses"
+        ).fetchone()[0]
+        while self._db_bytes > self.max_bytes:
+            rows = db.execute(
+                "SELECT key, size FROM llm_responses WHERE key != ? "
+                "ORDER BY accessed_at LIMIT 64",
+                (keep,),
+            ).fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                db.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+                self._memory.pop(key, None)
+                self._db_bytes -= size
+                self._stats["evictions"] += 1
+                if self._db_bytes <= self.max_bytes:
+                    break
+
+    def _remember(self, key, response, expires_at):
+        self._memory[key] = (response, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache():
+    """
+    Return the process-wide LLM response cache.
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = LLMCache()
+    return _cache
@@ -1,13 +1,20 @@
-import requests
-from bs4 import BeautifulSoup
 from urllib.parse import urlparse
 import json
+from app.services.html_extractor import collect_seo_signals
+from app.services.http_client import get_http_client
+from app.services.parser_backends import get_default_parser_backend, parse_html
+from app.services.response_cache import get_response_cache
 
 class LocalSEOAnalysisService:
     """
     Service for performing Local SEO analysis on a given URL.
     """
 
+    def __init__(self, http_client=None, response_cache=None, parser_backend=None):
+        self.http_client = http_client or get_http_client()
+        self.response_cache = response_cache or get_response_cache()
+        self.parser_backend = parser_backend or get_default_parser_backend()
+
     def perform_local_seo_analysis(self, url, location, keyword=None):
         """
         Perform a local SEO analysis on the given URL.
@@ -16,12 +23,13 @@ class LocalSEOAnalysisService:
             return {"error": "Invalid URL format"}
 
         try:
-            response = requests.get(url)
+            response = self.response_cache.fetch(url, self.http_client)
             response.raise_for_status()
-            soup = BeautifulSoup(response.content, "html.parser")
+            soup = parse_html(response.content, self.parser_backend)
 
             # Extract SEO elements
             seo_elements = self.extract_local_seo_elements(soup, url, location, keyword)
+            seo_elements["Page Truncated"] = response.truncated
             return seo_elements
         except Exception as e:
             return {"error": str(e)}
@@ -35,19 +43,17 @@ class LocalSEOAnalysisService:
 
     def extract_local_seo_elements(self, soup, url, location, keyword=None):
         """
-        Extract various local SEO elements from the soup object.
+        Extract local SEO elements from the parsed document in a single traversal.
         """
-        title = soup.title.string if soup.title else "No title found"
-        meta_description_tag = soup.find("meta", attrs={"name": "description"})
-        meta_description = (
-            meta_description_tag["content"]
-            if meta_description_tag and meta_description_tag.get("content")
-            else "No meta description found"
-        )
-        
+        signals = collect_seo_signals(soup, collect_text=False)
+        title = signals.title if signals.has_title else "No title found"
+        meta_description = signals.meta_description or "No meta description found"
+
         # Extract local business schema, maps, and Google My Business integration
-        local_business_schemas = self._extract_local_business_schemas(soup)
-        google_maps_embed = self._check_google_maps_embed(soup)
+        local_business_schemas = self._extract_local_business_schemas(
+            signals.ld_json
+        )
+        google_maps_embed = signals.google_maps_embed
 
         # NAP consistency could come from various online platforms, but we'll simplify for now.
         nap_consistency = self._check_nap_consistency(url)
@@ -61,14 +67,14 @@ class LocalSEOAnalysisService:
             "Google Maps Embed": google_maps_embed
         }
 
-    def _extract_local_business_schemas(self, soup):
+    def _extract_local_business_schemas(self, ld_json_blocks):
         """
-        Extract LocalBusiness schemas from the HTML.
+        Extract LocalBusiness schemas from the page's JSON-LD script contents.
         """
         schemas = []
-        for script in soup.find_all("script", type="application/ld+json"):
+        for block in ld_json_blocks:
             try:
-                json_content = json.loads(script.string)
+                json_content = json.loads(block)
                 if (
                     isinstance(json_content, dict)
                     and json_content.get("@type") == "LocalBusiness"
@@ -78,15 +84,6 @@ class LocalSEOAnalysisService:
                 return {"error": f"Error parsing LocalBusiness schema: {e}"}
         return schemas
 
-    def _check_google_maps_embed(self, soup):
-        """
-        Check if Google Maps is embedded.
-        """
-        google_maps_iframe = soup.find(
-            "iframe", src=lambda src: src and "google.com/maps" in src
-        )
-        return bool(google_maps_iframe)
-
     def _check_nap_consistency(self, url):
         """
         Simulate checking NAP (Name, Address, Phone) consistency for now.
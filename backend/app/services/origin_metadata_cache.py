@@ -0,0 +1,193 @@
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlsplit
+
+from app.config import Config
+from app.services.http_client import get_http_client
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_origin(url):
+    """
+    Reduce a URL to its normalized origin: lowercase scheme and host, no
+    credentials, path, query or fragment, and no default port.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").rstrip(".")
+    if not scheme or not host:
+        raise ValueError(f"Cannot determine origin of URL: {url}")
+    if ":" in host:
+        host = f"[{host}]"
+    port = parts.port
+    if port and port != DEFAULT_PORTS.get(scheme):
+        return f"{scheme}://{host}:{port}"
+    return f"{scheme}://{host}"
+
+
+def normalize_url(url):
+    """
+    Normalize a page URL for use as a key: normalized origin, path defaulting to
+    "/", the query kept as is and no fragment.
+    """
+    parts = urlsplit(url.strip())
+    path = parts.path or "/"
+    query = f"?{parts.query}" if parts.query else ""
+    return f"{normalize_origin(url)}{path}{query}"
+
+
+class OriginMetadataCache:
+    """
+    Per-origin cache of well-known origin files such as robots.txt and sitemap.xml.
+
+    Entries are keyed on the normalized scheme+host, so every page of a site shares
+    a single lookup. Found resources are kept for ``ttl`` seconds and then
+    revalidated with a conditional GET (If-None-Match / If-Modified-Since); missing
+    resources (404/410) are negatively cached for ``negative_ttl`` seconds.
+    Transport errors are never cached.
+    """
+
+    NEGATIVE_STATUSES = (404, 410)
+
+    def __init__(self, http_client=None, ttl=None, negative_ttl=None, max_entries=None):
+        self.http_client = http_client or get_http_client()
+        self.ttl = ttl if ttl is not None else Config.ORIGIN_CACHE_TTL
+        self.negative_ttl = (
+            negative_ttl
+            if negative_ttl is not None
+            else Config.ORIGIN_CACHE_NEGATIVE_TTL
+        )
+        self.max_entries = (
+            max_entries if max_entries is not None else Config.ORIGIN_CACHE_MAX_ENTRIES
+        )
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def lookup(self, url, path):
+        """
+        Return metadata for ``path`` (e.g. ``"robots.txt"``) on the origin of ``url``.
+
+        The result is a dict with the resolved ``url``, whether it was ``found``,
+        the upstream ``status_code`` and, for transport failures, an ``error``.
+        """
+        key, resource_url, entry = self._cached(url, path)
+        if entry is not None and entry["expires_at"] > time.monotonic():
+            return self._public(entry)
+
+        try:
+            response = self.http_client.get_status(
+                resource_url, headers=self._conditional_headers(entry)
+            )
+        except Exception as e:
+            return self._transport_error(resource_url, e)
+        return self._update(
+            key, resource_url, entry, response.status_code, response.headers
+        )
+
+    async def lookup_async(self, url, path, engine):
+        """
+        ``lookup`` for asyncio callers. The request goes through ``engine`` (an
+        ``AsyncFetchEngine``) so it counts against the engine's connection limits.
+        """
+        key, resource_url, entry = self._cached(url, path)
+        if entry is not None and entry["expires_at"] > time.monotonic():
+            return self._public(entry)
+
+        try:
+            response = await engine.fetch_status(
+                resource_url, headers=self._conditional_headers(entry)
+            )
+        except Exception as e:
+            return self._transport_error(resource_url, e)
+        return self._update(
+            key, resource_url, entry, response.status_code, response.headers
+        )
+
+    def clear(self):
+        """
+        Drop every cached entry.
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def _cached(self, url, path):
+        key = (normalize_origin(url), path.lstrip("/"))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        return key, f"{key[0]}/{key[1]}", entry
+
+    def _conditional_headers(self, entry):
+        headers = {}
+        if entry is not None and entry["found"]:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def _transport_error(self, resource_url, error):
+        return {
+            "url": resource_url,
+            "found": False,
+            "status_code": None,
+            "error": str(error),
+        }
+
+    def _update(self, key, resource_url, entry, status_code, headers):
+        """
+        Store the outcome of a (conditional) GET and return its public metadata.
+        """
+        if status_code == 304 and entry is not None:
+            entry = dict(entry, expires_at=time.monotonic() + self.ttl)
+        elif status_code == 200:
+            entry = {
+                "url": resource_url,
+                "found": True,
+                "status_code": status_code,
+                "etag": headers.get("ETag"),
+                "last_modified": headers.get("Last-Modified"),
+                "expires_at": time.monotonic() + self.ttl,
+            }
+        elif status_code in self.NEGATIVE_STATUSES:
+            entry = {
+                "url": resource_url,
+                "found": False,
+                "status_code": status_code,
+                "expires_at": time.monotonic() + self.negative_ttl,
+            }
+        else:
+            return {"url": resource_url, "found": False, "status_code": status_code}
+
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return self._public(entry)
+
+    def _public(self, entry):
+        return {
+            "url": entry["url"],
+            "found": entry["found"],
+            "status_code": entry["status_code"],
+        }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_origin_metadata_cache():
+    """
+    Return the process-wide origin metadata cache shared by the analysis services.
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = OriginMetadataCache()
+    return _cache
@@ -0,0 +1,50 @@
+from bs4 import BeautifulSoup, UnicodeDammit
+
+from app.config import Config
+
+# Backends accepted by ``HTML_PARSER_BACKEND``. "html.parser" is the pure Python
+# parser from the standard library; "lxml" builds the same BeautifulSoup tree
+# with libxml2; "selectolax" parses with the lexbor C engine and is walked
+# directly without building a BeautifulSoup tree at all.
+PARSER_BACKENDS = ("html.parser", "lxml", "selectolax")
+
+
+def get_default_parser_backend():
+    """
+    The parser backend configured through ``HTML_PARSER_BACKEND``.
+    """
+    return Config.HTML_PARSER_BACKEND
+
+
+def parse_html(content, backend=None):
+    """
+    Parse an HTML document with the given backend.
+
+    Returns a BeautifulSoup object for the "html.parser" and "lxml" backends and a
+    selectolax ``LexborHTMLParser`` for "selectolax"; both are accepted by
+    ``collect_seo_signals``. Raises ``ValueError`` for unknown or uninstalled
+    backends.
+    """
+    backend = backend or get_default_parser_backend()
+    if backend == "html.parser":
+        return BeautifulSoup(content, "html.parser")
+    if backend == "lxml":
+        try:
+            return BeautifulSoup(content, "lxml")
+        except Exception as e:
+            # bs4 raises FeatureNotFound when lxml is missing.
+            raise ValueError(f"HTML parser backend 'lxml' is unavailable: {e}")
+    if backend == "selectolax":
+        try:
+            from selectolax.lexbor import LexborHTMLParser
+        except ImportError as e:
+            raise ValueError(f"HTML parser backend 'selectolax' is unavailable: {e}")
+        if isinstance(content, bytes):
+            # Decode the way BeautifulSoup does (declared charset first) so every
+            # backend sees the same text.
+            content = UnicodeDammit(content, is_html=True).unicode_markup or ""
+        return LexborHTMLParser(content)
+    raise ValueError(
+        f"Unknown HTML parser backend: {backend!r} "
+        f"(expected one of {', '.join(PARSER_BACKENDS)})"
+    )
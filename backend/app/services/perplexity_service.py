@@ -1,6 +1,48 @@
-import os
+import asyncio
+import time
+import aiohttp
 import requests
 import json
+from app.config import Config
+from app.services.circuit_breaker import (
+    CircuitOpenError,
+    get_perplexity_circuit_breaker,
+)
+from app.services.llm_cache import get_llm_cache
+from app.services.prompt_builder import PromptBuilder
+from app.services.rate_limiter import (
+    OVERLOAD_STATUSES,
+    RateLimitExceeded,
+    get_perplexity_limiter,
+    retry_delay,
+)
+from app.services.usage_metrics import get_usage_metrics
+
+
+def is_upstream_failure(status_code):
+    """
+    Whether a response status means the API itself is failing or overloaded.
+    """
+    return status_code == 429 or status_code >= 500
+
+
+class _AttemptClock:
+    """
+    Times the latest upstream attempt, excluding limiter queueing and retry
+    backoff.
+    """
+
+    def __init__(self):
+        self.sent_at = None
+
+    def start(self):
+        self.sent_at = time.monotonic()
+
+    def elapsed(self):
+        """
+        Seconds since the latest attempt was sent, or ``None`` if none was.
+        """
+        return None if self.sent_at is None else time.monotonic() - self.sent_at
 
 
 class PerplexityService:
@@ -8,29 +50,464 @@ class PerplexityService:
     Service for interacting with the Perplexity API and generating prompts.
     """
 
-    def __init__(self):
-        self.api_key = os.getenv("PERPLEXITY_API_KEY")
-        self.api_url = "https://api.perplexity.ai/chat/completions"
+    def __init__(
+        self, llm_cache=None, limiter=None, usage_metrics=None, circuit_breaker=None
+    ):
+        self.api_key = Config.PERPLEXITY_API_KEY
+        self.api_url = Config.PERPLEXITY_API_URL
         self.headers = {"Authorization": f"Bearer {self.api_key}"}
+        self.llm_cache = llm_cache or get_llm_cache()
+        self.limiter = limiter or get_perplexity_limiter()
+        self.usage_metrics = usage_metrics or get_usage_metrics()
+        self.circuit_breaker = circuit_breaker or get_perplexity_circuit_breaker()
+        self.timeout = (
+            Config.PERPLEXITY_CONNECT_TIMEOUT,
+            Config.PERPLEXITY_READ_TIMEOUT,
+        )
+        self.max_retries = Config.PERPLEXITY_MAX_RETRIES
+        self.backoff_factor = Config.PERPLEXITY_BACKOFF_FACTOR
+        self.max_tokens = Config.PERPLEXITY_MAX_TOKENS
+        self.prompt_builder = PromptBuilder()
 
-    def query_perplexity(self, prompt):
+    def query_perplexity(
+        self, prompt, prompt_type=None, bypass_cache=False, route=None
+    ):
         """
         Send a prompt to the Perplexity API and return the parsed response.
         """
+        return self.parse_completion(
+            self.query_completion(prompt, prompt_type, bypass_cache, route)
+        )
+
+    def query_completion(
+        self, prompt, prompt_type=None, bypass_cache=False, route=None
+    ):
+        """
+        Send a prompt to the Perplexity API and return the raw chat completion,
+        or ``{"error": ...}``.
+
+        Completions are cached on model and prompt for the TTL configured for
+        ``prompt_type``. ``bypass_cache`` skips the lookup but still stores the
+        fresh completion. Concurrent identical requests share one API call.
+        Usage is accounted to ``route`` (the API route asking), or to
+        ``prompt_type`` when there is none.
+        """
+        data, cache_key, cached = self._prepare_request(
+            prompt, prompt_type, bypass_cache, route
+        )
+        if cached is not None:
+            return cached
+
+        return self.llm_cache.flights.do(
+            cache_key, self._request_completion, data, cache_key, prompt_type, route
+        )
+
+    def _prepare_request(self, prompt, prompt_type, bypass_cache, route):
+        """
+        Build the chat completions request for ``prompt`` and look it up in the
+        completion cache. Returns ``(data, cache_key, cached)``, where ``cached``
+        is the cached completion (already metered as a cache hit) or ``None``.
+        """
         data = {
             "model": "mistral-7b-instruct",
             "messages": [{"role": "user", "content": prompt}],
+            "max_tokens": self.max_tokens,
         }
-        response = requests.post(
-            self.api_url, headers=self.headers, data=json.dumps(data)
+        cache_key = self.llm_cache.key(
+            data["model"], data["messages"], data["max_tokens"]
         )
+        if bypass_cache:
+            self.llm_cache.count("bypasses")
+            return data, cache_key, None
+        cached = self.llm_cache.get(cache_key)
+        if cached is not None:
+            self.usage_metrics.record(
+                prompt_type, data["model"], cached=True, route=route
+            )
+        return data, cache_key, cached
 
-        if response.status_code == 200:
-            return self.parse_perplexity_response(response.json())
+    def _request_completion(self, data, cache_key, prompt_type, route):
+        """
+        Call the chat completions API, caching successful completions and
+        recording their token usage and latency. While the API is unavailable the
+        last cached completion is served instead, marked ``stale``.
+        """
+        clock = _AttemptClock()
+        try:
+            response = self._post(data, clock=clock)
+        except (CircuitOpenError, RateLimitExceeded, requests.RequestException) as e:
+            self.usage_metrics.record(
+                prompt_type, data["model"], clock.elapsed(), error=True, route=route
+            )
+            return self._unavailable(cache_key, e)
+
+        body = response.json() if response.status_code == 200 else response.text
+        return self._completion_result(
+            response.status_code,
+            body,
+            data,
+            cache_key,
+            prompt_type,
+            route,
+            clock.elapsed(),
+        )
+
+    def _completion_result(
+        self, status_code, body, data, cache_key, prompt_type, route, latency
+    ):
+        """
+        Turn a chat completions response (the decoded completion on 200, the
+        response text otherwise) into the raw completion: cache and meter it, or
+        fall back while the API is failing.
+        """
+        if status_code == 200:
+            self.usage_metrics.record(
+                prompt_type,
+                data["model"],
+                latency,
+                usage=body.get("usage"),
+                error=not body.get("choices"),
+                route=route,
+            )
+            if body.get("choices"):
+                self.llm_cache.set(
+                    cache_key, body, prompt_type=prompt_type, model=data["model"]
+                )
+            return body
         else:
+            self.usage_metrics.record(
+                prompt_type, data["model"], latency, error=True, route=route
+            )
+            error = f"HTTP error occurred: {status_code} - {body}"
+            if is_upstream_failure(status_code):
+                return self._unavailable(cache_key, error)
+            return {"error": error}
+
+    def _unavailable(self, cache_key, error):
+        """
+        Fallback while the API is failing: the last cached completion for the
+        prompt, however old, or an error flagging that only local data is
+        available.
+        """
+        stale = self.llm_cache.get_stale(cache_key)
+        if stale is not None:
+            return {**stale, "stale": True}
+        if isinstance(error, CircuitOpenError):
             return {
-                "error": f"HTTP error occurred: {response.status_code} - {response.text}"
+                "error": "Perplexity is temporarily unavailable; try again later.",
+                "circuit_open": True,
             }
+        return {"error": str(error)}
+
+    async def query_perplexity_async(
+        self, session, prompt, prompt_type=None, bypass_cache=False, route=None
+    ):
+        """
+        ``query_perplexity`` for asyncio callers: the API is called through the
+        aiohttp ``session`` without blocking the event loop. The completion
+        cache, limiter, circuit breaker and usage metrics are the ones the
+        synchronous path uses; cache reads and writes run in a worker thread.
+        Concurrent identical requests on the event loop share one API call.
+        """
+        data, cache_key, cached = await asyncio.to_thread(
+            self._prepare_request, prompt, prompt_type, bypass_cache, route
+        )
+        if cached is not None:
+            return self.parse_completion(cached)
+
+        completion = await self.llm_cache.async_flights.do(
+            cache_key,
+            self._request_completion_async,
+            session,
+            data,
+            cache_key,
+            prompt_type,
+            route,
+        )
+        return self.parse_completion(completion)
+
+    async def _request_completion_async(
+        self, session, data, cache_key, prompt_type, route
+    ):
+        """
+        ``_request_completion`` through the aiohttp ``session``.
+        """
+        clock = _AttemptClock()
+        try:
+            status_code, body = await self._post_async(session, data, clock)
+        except (
+            CircuitOpenError,
+            RateLimitExceeded,
+            aiohttp.ClientError,
+            asyncio.TimeoutError,
+        ) as e:
+            self.usage_metrics.record(
+                prompt_type, data["model"], clock.elapsed(), error=True, route=route
+            )
+            return await asyncio.to_thread(self._unavailable, cache_key, e)
+
+        latency = clock.elapsed()
+        if status_code == 200:
+            body = json.loads(body)
+        return await asyncio.to_thread(
+            self._completion_result,
+            status_code,
+            body,
+            data,
+            cache_key,
+            prompt_type,
+            route,
+            latency,
+        )
+
+    def stream_perplexity(
+        self, prompt, prompt_type=None, bypass_cache=False, route=None
+    ):
+        """
+        Stream a prompt's completion, yielding each actionable insight
+        (``{"insight": ...}``) as soon as its paragraph is complete.
+
+        Failures are yielded as a final ``{"error": ...}`` item. Cached
+        completions are replayed without calling the API, and streamed
+        completions are cached like those from ``query_perplexity``.
+        """
+        data, cache_key, cached = self._prepare_request(
+            prompt, prompt_type, bypass_cache, route
+        )
+        if cached is not None:
+            result = self.parse_perplexity_response(cached)
+            yield from result.get("actionable_insights", [result])
+            return
+
+        clock = _AttemptClock()
+        try:
+            response = self._post({**data, "stream": True}, stream=True, clock=clock)
+        except (CircuitOpenError, RateLimitExceeded, requests.RequestException) as e:
+            self.usage_metrics.record(
+                prompt_type, data["model"], clock.elapsed(), error=True, route=route
+            )
+            yield from self._stream_fallback(cache_key, e)
+            return
+        try:
+            if response.status_code != 200:
+                self.usage_metrics.record(
+                    prompt_type, data["model"], clock.elapsed(), error=True, route=route
+                )
+                error = f"HTTP error occurred: {response.status_code} - {response.text}"
+                if is_upstream_failure(response.status_code):
+                    yield from self._stream_fallback(cache_key, error)
+                else:
+                    yield {"error": error}
+                return
+
+            content = []
+            pending = ""
+            usage = {}
+            try:
+                for delta in self._iter_stream_deltas(response, usage):
+                    content.append(delta)
+                    *paragraphs, pending = (pending + delta).split("\n\n")
+                    for paragraph in paragraphs:
+                        if paragraph.strip():
+                            yield {"insight": paragraph.strip()}
+            except (requests.RequestException, ValueError) as e:
+                self.circuit_breaker.record_failure()
+                self.usage_metrics.record(
+                    prompt_type,
+                    data["model"],
+                    clock.elapsed(),
+                    usage=usage,
+                    error=True,
+                    route=route,
+                )
+                if content:
+                    # Insights already sent can't be swapped for a stale copy.
+                    yield {"error": f"Stream interrupted: {e}"}
+                else:
+                    yield from self._stream_fallback(cache_key, e)
+                return
+            except BaseException as e:
+                self._record_breaker_error(e)
+                raise
+        finally:
+            response.close()
+
+        content = "".join(content)
+        if content.strip():
+            self.circuit_breaker.record_success()
+        else:
+            self.circuit_breaker.record_failure()
+        if pending.strip():
+            yield {"insight": pending.strip()}
+        self.usage_metrics.record(
+            prompt_type,
+            data["model"],
+            clock.elapsed(),
+            usage=usage,
+            error=not content.strip(),
+            route=route,
+        )
+        if not content.strip():
+            yield {"error": "No actionable insights were provided by Perplexity."}
+            return
+        completion = {
+            "choices": [{"message": {"role": "assistant", "content": content}}],
+            "usage": usage,
+        }
+        self.llm_cache.set(
+            cache_key, completion, prompt_type=prompt_type, model=data["model"]
+        )
+
+    def _stream_fallback(self, cache_key, error):
+        """
+        The items ``stream_perplexity`` yields while the API is failing: the
+        insights of the stale completion, each marked ``stale``, or the error.
+        """
+        result = self.parse_completion(self._unavailable(cache_key, error))
+        if result.get("stale"):
+            return [{**item, "stale": True} for item in result["actionable_insights"]]
+        return [result]
+
+    def _post(self, data, stream=False, clock=None):
+        """
+        POST to the chat completions API through the circuit breaker and the
+        process-wide limiter.
+
+        Raises ``CircuitOpenError`` without calling the API while the circuit is
+        open. Connection errors, timeouts, 429 and 5xx responses count as
+        failures towards opening it. The outcome of a streamed 200 response is
+        left to the caller, to record once the body has been consumed.
+        """
+        self.circuit_breaker.check()
+        try:
+            response = self._post_with_retries(data, stream, clock)
+        except BaseException as e:
+            self._record_breaker_error(e)
+            raise
+        if is_upstream_failure(response.status_code):
+            self.circuit_breaker.record_failure()
+        elif not (stream and response.status_code == 200):
+            self.circuit_breaker.record_success()
+        return response
+
+    def _post_with_retries(self, data, stream, clock=None):
+        """
+        POST through the limiter, retrying overload responses (429 and 502-504)
+        up to ``max_retries`` times with jittered exponential backoff, honouring
+        ``Retry-After``. For streamed requests the slot is held until the response
+        headers arrive. ``clock`` is started as each attempt is sent.
+        """
+        clock = clock or _AttemptClock()
+        for attempt in range(self.max_retries + 1):
+            with self.limiter.slot() as slot:
+                clock.start()
+                response = requests.post(
+                    self.api_url,
+                    headers=self.headers,
+                    data=json.dumps(data),
+                    stream=stream,
+                    timeout=self.timeout,
+                )
+                slot.report(response.status_code)
+            if (
+                response.status_code not in OVERLOAD_STATUSES
+                or attempt == self.max_retries
+            ):
+                return response
+            response.close()
+            self.limiter.count("retries")
+            time.sleep(
+                retry_delay(
+                    attempt,
+                    self.backoff_factor,
+                    response.headers.get("Retry-After"),
+                )
+            )
+
+    def _record_breaker_error(self, error):
+        """
+        Account a call that raised instead of returning a response. Calls that
+        never reached the API, or were abandoned by the caller, hand their
+        half-open probe back; any other error counts as a failure.
+        """
+        if isinstance(error, RateLimitExceeded) or not isinstance(error, Exception):
+            self.circuit_breaker.record_cancelled()
+        else:
+            self.circuit_breaker.record_failure()
+
+    async def _post_async(self, session, data, clock=None):
+        """
+        ``_post`` for asyncio callers, returning ``(status_code, text)``.
+        """
+        self.circuit_breaker.check()
+        try:
+            status_code, body = await self._post_with_retries_async(
+                session, data, clock
+            )
+        except BaseException as e:
+            self._record_breaker_error(e)
+            raise
+        if is_upstream_failure(status_code):
+            self.circuit_breaker.record_failure()
+        else:
+            self.circuit_breaker.record_success()
+        return status_code, body
+
+    async def _post_with_retries_async(self, session, data, clock=None):
+        """
+        ``_post_with_retries`` for asyncio callers. The body text is read inside
+        the limiter slot; decoding it is left to the caller.
+        """
+        connect_timeout, read_timeout = self.timeout
+        timeout = aiohttp.ClientTimeout(
+            sock_connect=connect_timeout, sock_read=read_timeout
+        )
+        clock = clock or _AttemptClock()
+        for attempt in range(self.max_retries + 1):
+            async with self.limiter.async_slot() as slot:
+                clock.start()
+                async with session.post(
+                    self.api_url, headers=self.headers, json=data, timeout=timeout
+                ) as response:
+                    status_code = response.status
+                    body = await response.text()
+                    retry_after = response.headers.get("Retry-After")
+                slot.report(status_code)
+            if status_code not in OVERLOAD_STATUSES or attempt == self.max_retries:
+                return status_code, body
+            self.limiter.count("retries")
+            await asyncio.sleep(retry_delay(attempt, self.backoff_factor, retry_after))
+
+    def _iter_stream_deltas(self, response, usage=None):
+        """
+        Yield the content deltas of a server-sent chat completion stream. The
+        stream's latest ``usage`` object, if any, is copied into ``usage``.
+        """
+        for line in response.iter_lines(decode_unicode=True):
+            if not line or not line.startswith("data:"):
+                continue
+            payload = line[len("data:") :].strip()
+            if payload == "[DONE]":
+                break
+            chunk = json.loads(payload)
+            if usage is not None and chunk.get("usage"):
+                usage.update(chunk["usage"])
+            choices = chunk.get("choices") or [{}]
+            delta = choices[0].get("delta") or {}
+            if delta.get("content"):
+                yield delta["content"]
+
+    def parse_completion(self, completion):
+        """
+        ``parse_perplexity_response`` for the results of ``query_completion``:
+        errors pass through and stale fallbacks keep their ``stale`` flag.
+        """
+        if "error" in completion:
+            return completion
+        result = self.parse_perplexity_response(completion)
+        if completion.get("stale") and "error" not in result:
+            result["stale"] = True
+        return result
 
     def parse_perplexity_response(self, perplexity_response):
         """
@@ -48,7 +525,8 @@ class PerplexityService:
         ]
         return {"actionable_insights": actionable_items}
 
-    # Prompts for various SEO use cases
+    # Prompts for various SEO use cases. Each grounds its instruction in the
+    # extracted seo_data; pass seo_data=None for the bare instruction.
 
     def create_content_optimization_prompt(self, url, seo_data, keyword):
         """
@@ -59,7 +537,7 @@ class PerplexityService:
             f"Identify areas where the content could be better optimized for this keyword, including "
             f"improvements in keyword density, content structure, and relevance."
         )
-        return prompt
+        return self.prompt_builder.build(prompt, seo_data)
 
     def create_technical_seo_audit_prompt(self, url, seo_data):
         """
@@ -70,7 +548,7 @@ class PerplexityService:
             f"Evaluate the website's performance, mobile-friendliness, SSL configuration, sitemap, "
             f"robots.txt, and schema markup. Identify any issues that prevent search engines from properly crawling the site."
         )
-        return prompt
+        return self.prompt_builder.build(prompt, seo_data)
 
     def create_local_seo_enhancement_prompt(self, url, seo_data, location):
         """
@@ -81,7 +559,7 @@ class PerplexityService:
             f"Evaluate the presence of local business schemas, Google My Business integration, "
             f"NAP (Name, Address, Phone Number) consistency, and local keyword usage."
         )
-        return prompt
+        return self.prompt_builder.build(prompt, seo_data)
 
     def create_competitor_comparison_prompt(self, url, seo_data, competitor_url):
         """
@@ -91,7 +569,7 @@ class PerplexityService:
             f"Compare the SEO elements of the URL '{url}' with the competitor site '{competitor_url}'. "
             f"Analyze differences in keyword usage, content structure, and backlink profiles."
         )
-        return prompt
+        return self.prompt_builder.build(prompt, seo_data)
 
     def create_ecommerce_seo_optimization_prompt(self, url, seo_data, product_name):
         """
@@ -102,7 +580,7 @@ class PerplexityService:
             f"Evaluate the page's SEO elements including title tags, meta descriptions, product descriptions, "
             f"alt texts for images, and schema markup. Provide recommendations for optimizing the page for search visibility."
         )
-        return prompt
+        return self.prompt_builder.build(prompt, seo_data)
 
     def create_content_gap_analysis_prompt(self, url, seo_data, related_keywords):
         """
@@ -112,7 +590,7 @@ class PerplexityService:
             f"Perform a content gap analysis for the URL '{url}' with respect to the related keywords '{', '.join(related_keywords)}'. "
             f"Identify areas where the existing content lacks coverage on important topics or keywords."
         )
-        return prompt
+        return self.prompt_builder.build(prompt, seo_data)
 
     def create_backlink_strategy_prompt(self, url, seo_data):
         """
@@ -122,4 +600,4 @@ class PerplexityService:
             f"Analyze the URL '{url}' and suggest a backlink strategy to improve the site's authority and search rankings. "
             f"Consider the current backlink profile and opportunities for acquiring new high-quality backlinks."
         )
-        return prompt
+        return self.prompt_builder.build(prompt, seo_data)
@@ -0,0 +1,119 @@
+import json
+import math
+
+from app.config import Config
+from app.services.seo_fields import SEO_FIELDS
+
+# Rough size of a token in characters of English prose; good enough for budgeting
+# without shipping the model's tokenizer.
+CHARS_PER_TOKEN = 4
+
+# Per-list item caps tried in turn until the signals fit the budget.
+LIST_LIMITS = (10, 5, 3, 1)
+
+# Longest a single value may be once lists alone no longer fit.
+MAX_VALUE_CHARS = 160
+
+# Only the extracted signals are worth prompt tokens; other keys (such as
+# "Page Truncated") describe the page download itself.
+_SIGNAL_LABELS = {field.label for field in SEO_FIELDS.values()}
+
+
+def estimate_tokens(text):
+    """
+    Approximate token count of ``text``.
+    """
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def _truncate(text, limit):
+    return text if len(text) <= limit else text[: limit - 3].rstrip() + "..."
+
+
+def _format_value(value, list_limit, value_chars):
+    if isinstance(value, bool):
+        return "yes" if value else "no"
+    if isinstance(value, list):
+        items = [_format_value(item, list_limit, value_chars) for item in value]
+        items = [item for item in items if item]
+        if not items:
+            return "none"
+        shown = " | ".join(items[:list_limit])
+        if len(items) > list_limit:
+            shown += f" (+{len(items) - list_limit} more)"
+        return shown
+    if isinstance(value, dict):
+        value = json.dumps(value, sort_keys=True, separators=(",", ":"))
+    text = " ".join(str(value).split())
+    return _truncate(text, value_chars) if value_chars else text
+
+
+class PromptBuilder:
+    """
+    Build prompts that ground the instruction in the extracted SEO signals.
+
+    Signals (the labels in ``SEO_FIELDS``) are serialized one ``label: value``
+    line each, in ``seo_data`` order; other keys are left out.
+    Long lists (H2s, image alts, links) are cut to fewer items and long values
+    shortened until the block fits ``token_budget`` (``PROMPT_TOKEN_BUDGET``);
+    trailing lines are dropped as a last resort. The prompt also asks for at most
+    ``max_insights`` short recommendations (``PROMPT_MAX_INSIGHTS``).
+    """
+
+    def __init__(self, token_budget=None, max_insights=None):
+        self.token_budget = (
+            token_budget if token_budget is not None else Config.PROMPT_TOKEN_BUDGET
+        )
+        self.max_insights = (
+            max_insights if max_insights is not None else Config.PROMPT_MAX_INSIGHTS
+        )
+
+    def serialize(self, seo_data):
+        """
+        Compact, deterministic rendering of ``seo_data`` within the token budget.
+        """
+        items = [
+            (label, value)
+            for label, value in (seo_data or {}).items()
+            if label in _SIGNAL_LABELS and value not in (None, "", "N/A")
+        ]
+        lines = []
+        for list_limit in LIST_LIMITS:
+            for value_chars in (None, MAX_VALUE_CHARS):
+                lines = [
+                    f"{label}: {_format_value(value, list_limit, value_chars)}"
+                    for label, value in items
+                ]
+                if estimate_tokens("\n".join(lines)) <= self.token_budget:
+                    return "\n".join(lines)
+        while lines and estimate_tokens("\n".join(lines)) > self.token_budget:
+            lines.pop()
+        return "\n".join(lines)
+
+    def output_instructions(self, sections=1):
+        """
+        Constraints on the completion's length and shape, applied to each of
+        ``sections`` when a prompt asks for several analyses at once.
+        """
+        per_section = " per section" if sections > 1 else ""
+        return (
+            f"Respond with at most {self.max_insights} recommendations{per_section}, "
+            f"most important first. Write each as one paragraph of at most two "
+            f"sentences and separate them with a blank line. Do not restate the page "
+            f"signals."
+        )
+
+    def build(self, instruction, seo_data, sections=1):
+        """
+        The full prompt: instruction, page signals and output constraints. With
+        ``seo_data`` of ``None`` only the instruction is returned, so callers can
+        embed it in a larger prompt.
+        """
+        if seo_data is None:
+            return instruction
+        signals = self.serialize(seo_data)
+        parts = [instruction]
+        if signals:
+            parts.append(f"Signals extracted from the page:\n{signals}")
+        parts.append(self.output_instructions(sections))
+        return "\n\n".join(parts)
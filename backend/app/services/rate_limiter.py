@@ -0,0 +1,348 @@
+import asyncio
+import random
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+
+from app.config import Config
+
+# Upstream statuses that mean "slow down" rather than "this request is wrong".
+OVERLOAD_STATUSES = (429, 502, 503, 504)
+
+
+class RateLimitExceeded(Exception):
+    """
+    Raised when a caller waited longer than its timeout for upstream capacity.
+    """
+
+
+def retry_delay(attempt, backoff_factor, retry_after=None, max_delay=60.0):
+    """
+    Exponential backoff with full jitter; a Retry-After value in seconds wins.
+    """
+    if retry_after:
+        try:
+            return min(max(float(retry_after), 0.0), max_delay)
+        except (TypeError, ValueError):
+            pass
+    return random.uniform(0, min(backoff_factor * (2**attempt), max_delay))
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: ``rate`` tokens per second, bursts of up to
+    ``capacity``.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    def try_acquire(self):
+        """
+        Take a token if one is available, otherwise return how many seconds until
+        the next one is.
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+    def acquire(self, timeout=None):
+        """
+        Block until a token is available. Returns ``False`` on timeout.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self.try_acquire()
+            if not wait:
+                return True
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
+
+    async def acquire_async(self, timeout=None):
+        """
+        ``acquire`` for asyncio callers: waits with ``asyncio.sleep`` instead of
+        blocking the event loop.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self.try_acquire()
+            if not wait:
+                return True
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            await asyncio.sleep(wait)
+
+
+class AdaptiveConcurrencyLimit:
+    """
+    AIMD concurrency limit.
+
+    Each successful call that finishes within ``latency_target`` grows the limit
+    by ``1 / limit`` (about one slot per round trip); an overload signal or a slow
+    call multiplies it by ``backoff_ratio``. The limit stays within
+    ``[min_limit, max_limit]``.
+    """
+
+    def __init__(
+        self,
+        initial_limit,
+        min_limit=1,
+        max_limit=64,
+        latency_target=20.0,
+        backoff_ratio=0.5,
+    ):
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target = latency_target
+        self.backoff_ratio = backoff_ratio
+        self.in_flight = 0
+        self.waiting = 0
+        self._condition = threading.Condition()
+
+    def acquire(self, timeout=None):
+        """
+        Wait for a free slot. Returns ``False`` on timeout.
+        """
+        with self._condition:
+            self.waiting += 1
+            try:
+                acquired = self._condition.wait_for(
+                    lambda: self.in_flight < int(self.limit), timeout
+                )
+            finally:
+                self.waiting -= 1
+            if acquired:
+                self.in_flight += 1
+            return acquired
+
+    def try_acquire(self):
+        """
+        Take a free slot without waiting. Returns ``False`` when none is free.
+        """
+        with self._condition:
+            if self.in_flight < int(self.limit):
+                self.in_flight += 1
+                return True
+            return False
+
+    async def acquire_async(self, timeout=None, poll_interval=0.01):
+        """
+        ``acquire`` for asyncio callers. The limit is shared with threads, so
+        this polls every ``poll_interval`` seconds rather than blocking the event
+        loop on the condition.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            self.waiting += 1
+        try:
+            while not self.try_acquire():
+                if deadline is not None and time.monotonic() >= deadline:
+                    return False
+                await asyncio.sleep(poll_interval)
+            return True
+        finally:
+            with self._condition:
+                self.waiting -= 1
+
+    def release(self, latency, overloaded=False, adjust=True):
+        """
+        Free a slot and adjust the limit from the call's outcome. Pass
+        ``adjust=False`` for a slot whose call never went upstream.
+        """
+        with self._condition:
+            self.in_flight -= 1
+            if adjust:
+                if overloaded or latency > self.latency_target:
+                    self.limit = max(self.min_limit, self.limit * self.backoff_ratio)
+                else:
+                    self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            self._condition.notify_all()
+
+
+class UpstreamLimiter:
+    """
+    Process-wide admission control for an upstream API: a token bucket for the
+    request rate in front of an adaptive concurrency limit.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute=None,
+        burst=None,
+        initial_concurrency=None,
+        max_concurrency=None,
+        latency_target=None,
+        queue_timeout=None,
+    ):
+        requests_per_minute = (
+            requests_per_minute
+            if requests_per_minute is not None
+            else Config.PERPLEXITY_REQUESTS_PER_MINUTE
+        )
+        burst = burst if burst is not None else Config.PERPLEXITY_BURST
+        self.bucket = TokenBucket(requests_per_minute / 60.0, burst)
+        self.concurrency = AdaptiveConcurrencyLimit(
+            initial_limit=(
+                initial_concurrency
+                if initial_concurrency is not None
+                else Config.PERPLEXITY_INITIAL_CONCURRENCY
+            ),
+            max_limit=(
+                max_concurrency
+                if max_concurrency is not None
+                else Config.PERPLEXITY_MAX_CONCURRENCY
+            ),
+            latency_target=(
+                latency_target
+                if latency_target is not None
+                else Config.PERPLEXITY_LATENCY_TARGET
+            ),
+        )
+        self.queue_timeout = (
+            queue_timeout
+            if queue_timeout is not None
+            else Config.PERPLEXITY_QUEUE_TIMEOUT
+        )
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "throttled": 0, "retries": 0, "rejected": 0}
+
+    @contextmanager
+    def slot(self):
+        """
+        Hold one upstream request slot for the duration of the ``with`` block.
+
+        Call ``report(status_code)`` on the yielded object with the upstream
+        status; exceptions count as overload. Raises ``RateLimitExceeded`` when no
+        capacity frees up within ``queue_timeout``.
+        """
+        deadline = time.monotonic() + self.queue_timeout
+        if not self.concurrency.acquire(timeout=self.queue_timeout):
+            self.count("rejected")
+            raise RateLimitExceeded("Timed out waiting for a Perplexity request slot")
+        outcome = _SlotOutcome()
+        started = None
+        try:
+            if not self.bucket.acquire(timeout=max(0, deadline - time.monotonic())):
+                self.count("rejected")
+                raise RateLimitExceeded("Perplexity request rate limit exceeded")
+            self.count("requests")
+            started = time.monotonic()
+            yield outcome
+        except RateLimitExceeded:
+            raise
+        except Exception:
+            outcome.overloaded = True
+            raise
+        finally:
+            self._release(outcome, started)
+
+    @asynccontextmanager
+    async def async_slot(self):
+        """
+        ``slot`` for asyncio callers, sharing the same rate and concurrency
+        limits without blocking the event loop while waiting for capacity.
+        """
+        deadline = time.monotonic() + self.queue_timeout
+        if not await self.concurrency.acquire_async(timeout=self.queue_timeout):
+            self.count("rejected")
+            raise RateLimitExceeded("Timed out waiting for a Perplexity request slot")
+        outcome = _SlotOutcome()
+        started = None
+        try:
+            if not await self.bucket.acquire_async(
+                timeout=max(0, deadline - time.monotonic())
+            ):
+                self.count("rejected")
+                raise RateLimitExceeded("Perplexity request rate limit exceeded")
+            self.count("requests")
+            started = time.monotonic()
+            yield outcome
+        except RateLimitExceeded:
+            raise
+        except Exception:
+            outcome.overloaded = True
+            raise
+        finally:
+            self._release(outcome, started)
+
+    def _release(self, outcome, started):
+        if started is None:
+            # Rejected before the request was sent: nothing to learn from.
+            self.concurrency.release(0.0, adjust=False)
+            return
+        if outcome.status_code == 429:
+            self.count("throttled")
+        self.concurrency.release(
+            time.monotonic() - started, overloaded=outcome.overloaded
+        )
+
+    def count(self, name):
+        """
+        Increment one of the counters reported by ``stats``.
+        """
+        with self._lock:
+            self._stats[name] += 1
+
+    def stats(self):
+        """
+        Current limit, queue depth and request counters.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        concurrency = self.concurrency
+        stats.update(
+            {
+                "concurrency_limit": round(concurrency.limit, 2),
+                "in_flight": concurrency.in_flight,
+                "queue_depth": concurrency.waiting,
+                "tokens_available": round(self.bucket.tokens, 2),
+            }
+        )
+        return stats
+
+
+class _SlotOutcome:
+    def __init__(self):
+        self.status_code = None
+        self.overloaded = False
+
+    def report(self, status_code):
+        self.status_code = status_code
+        self.overloaded = status_code in OVERLOAD_STATUSES
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_perplexity_limiter():
+    """
+    Return the process-wide Perplexity API limiter.
+    """
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = UpstreamLimiter()
+    return _limiter
@@ -0,0 +1,442 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from app.config import Config
+from app.services.origin_metadata_cache import normalize_url
+from app.services.single_flight import AsyncSingleFlight, SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# Response headers kept alongside a cached (already decoded) body.
+STORED_HEADERS = (
+    "Content-Type",
+    "ETag",
+    "Last-Modified",
+    "Cache-Control",
+    "Expires",
+    "Date",
+    "Age",
+)
+
+# Upper bound for heuristic freshness (RFC 9111 section 4.2.2).
+MAX_HEURISTIC_LIFETIME = 24 * 3600
+
+# How often (in seconds) a process rescans the disk store for entries written by
+# other workers before enforcing the size bound.
+DISK_RESCAN_INTERVAL = 60
+
+
+def parse_cache_control(value):
+    """
+    Parse a Cache-Control header into a dict of lowercase directives.
+    """
+    directives = {}
+    for part in (value or "").split(","):
+        name, _, argument = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = argument.strip().strip('"') or None
+    return directives
+
+
+def _http_date(value):
+    try:
+        return parsedate_to_datetime(value).timestamp() if value else None
+    except (TypeError, ValueError):
+        return None
+
+
+def freshness_lifetime(headers, now=None):
+    """
+    Compute how long (in seconds) a response stays fresh according to its
+    Cache-Control, Expires and Last-Modified headers. Returns ``None`` when the
+    response must not be stored at all.
+    """
+    now = now if now is not None else time.time()
+    directives = parse_cache_control(headers.get("Cache-Control"))
+    if "no-store" in directives:
+        return None
+    if "no-cache" in directives:
+        return 0
+
+    try:
+        age = max(0, int(headers.get("Age") or 0))
+    except ValueError:
+        age = 0
+
+    date = _http_date(headers.get("Date")) or now
+    if directives.get("max-age") is not None:
+        try:
+            return max(0, int(directives["max-age"]) - age)
+        except ValueError:
+            return 0
+    if headers.get("Expires") is not None:
+        expires = _http_date(headers.get("Expires"))
+        return max(0, expires - date - age) if expires else 0
+
+    last_modified = _http_date(headers.get("Last-Modified"))
+    if last_modified and date > last_modified:
+        return max(0, min((date - last_modified) / 10, MAX_HEURISTIC_LIFETIME) - age)
+    return 0
+
+
+class ResponseCache:
+    """
+    HTTP-semantics-aware cache for analyzed pages.
+
+    A small in-memory LRU sits in front of a size-bounded on-disk store. Responses
+    are stored according to their Cache-Control/Expires headers (with the RFC 9111
+    heuristic for pages that only carry Last-Modified); stale or ``no-cache``
+    entries are revalidated with a conditional GET using their ETag and
+    Last-Modified validators. Pages are always fetched without credentials, so
+    ``private`` responses are cached like public ones.
+
+    Worker processes may share ``cache_dir``. Each keeps its own index of the
+    store and rescans the directory (outside the lock) at most every
+    ``DISK_RESCAN_INTERVAL`` seconds, so ``max_disk_bytes`` bounds the shared
+    store, give or take what other workers wrote since the last scan. Reads
+    touch an entry's mtime, which makes eviction least-recently-used across
+    workers.
+    """
+
+    def __init__(
+        self, cache_dir=None, memory_entries=None, max_disk_bytes=None, enabled=None
+    ):
+        self.cache_dir = cache_dir or Config.RESPONSE_CACHE_DIR
+        self.memory_entries = (
+            memory_entries
+            if memory_entries is not None
+            else Config.RESPONSE_CACHE_MEMORY_ENTRIES
+        )
+        self.max_disk_bytes = (
+            max_disk_bytes
+            if max_disk_bytes is not None
+            else Config.RESPONSE_CACHE_MAX_DISK_BYTES
+        )
+        self.enabled = enabled if enabled is not None else Config.RESPONSE_CACHE_ENABLED
+        self._memory = OrderedDict()
+        self._disk_index = None
+        self._disk_bytes = 0
+        self._disk_scanned_at = 0
+        self._lock = threading.RLock()
+        self.flights = SingleFlight()
+        self.async_flights = AsyncSingleFlight()
+        self._stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "revalidations": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+        }
+
+    # Fetch
+
+    def fetch(self, url, http_client, **kwargs):
+        """
+        Fetch a page through the cache with ``HTTPClient.get_page``, returning a
+        ``requests.Response``.
+
+        Fresh entries are served without touching the network; stale entries with
+        validators are revalidated and served from cache on ``304 Not Modified``.
+        Concurrent fetches of the same normalized URL share one upstream request.
+        """
+        return self.flights.do(
+            self._normalized(url), self._fetch, url, http_client, **kwargs
+        )
+
+    def _fetch(self, url, http_client, **kwargs):
+        if not self.enabled:
+            return http_client.get_page(url, **kwargs)
+
+        entry = self.lookup(url)
+        if entry is not None and self.is_fresh(entry):
+            return self.to_response(entry)
+
+        headers = dict(kwargs.pop("headers", None) or {})
+        if entry is not None:
+            headers.update(self.conditional_headers(entry))
+        response = http_client.get_page(url, headers=headers, **kwargs)
+
+        if entry is not None and response.status_code == 304:
+            entry = self.refresh(url, entry, response.headers)
+            self.count("revalidations")
+            return self.to_response(entry)
+
+        self.count("misses")
+        self.store(
+            url,
+            response.status_code,
+            response.headers,
+            response.content,
+            truncated=response.truncated,
+        )
+        return response
+
+    # Cache steps (shared by the synchronous and asynchronous fetchers)
+
+    def lookup(self, url):
+        """
+        Return the cached entry for ``url`` from memory or disk, or ``None``.
+        """
+        key = self._key(url)
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                if self.is_fresh(entry):
+                    self._stats["memory_hits"] += 1
+                return entry
+
+        entry = self._read_disk(key)
+        if entry is not None:
+            self._remember(key, entry)
+            if self.is_fresh(entry):
+                self.count("disk_hits")
+        return entry
+
+    def is_fresh(self, entry, now=None):
+        now = now if now is not None else time.time()
+        return entry["fresh_until"] > now
+
+    def conditional_headers(self, entry):
+        """
+        Build If-None-Match / If-Modified-Since headers for revalidating ``entry``.
+        """
+        headers = {}
+        if entry["headers"].get("ETag"):
+            headers["If-None-Match"] = entry["headers"]["ETag"]
+        if entry["headers"].get("Last-Modified"):
+            headers["If-Modified-Since"] = entry["headers"]["Last-Modified"]
+        return headers
+
+    def store(self, url, status_code, headers, body, truncated=False):
+        """
+        Store a response if its status and headers allow it. Caching is best
+        effort: failures are logged and never propagate to the caller.
+        """
+        if not self.enabled or status_code != 200:
+            return None
+        try:
+            now = time.time()
+            lifetime = freshness_lifetime(headers, now)
+            has_validators = headers.get("ETag") or headers.get("Last-Modified")
+            if lifetime is None or (lifetime == 0 and not has_validators):
+                return None
+
+            entry = {
+                "url": url,
+                "status_code": status_code,
+                "headers": {
+                    name: headers[name] for name in STORED_HEADERS if name in headers
+                },
+                "stored_at": now,
+                "fresh_until": now + lifetime,
+                "truncated": truncated,
+                "body": bytes(body),
+            }
+            key = self._key(url)
+            self._write_disk(key, entry)
+            self._remember(key, entry)
+            self.count("stores")
+            return entry
+        except Exception as e:
+            logger.warning(f"Could not cache response for {url}: {e}")
+            return None
+
+    def refresh(self, url, entry, headers):
+        """
+        Update a stale entry after a ``304 Not Modified`` and extend its freshness.
+        """
+        merged = dict(entry["headers"])
+        for name in STORED_HEADERS:
+            if name in headers and name != "Content-Type":
+                merged[name] = headers[name]
+        now = time.time()
+        lifetime = freshness_lifetime(merged, now) or 0
+        entry = dict(entry, headers=merged, stored_at=now, fresh_until=now + lifetime)
+        try:
+            key = self._key(url)
+            self._write_disk(key, entry)
+            self._remember(key, entry)
+        except Exception as e:
+            logger.warning(f"Could not refresh cached response for {url}: {e}")
+        return entry
+
+    def to_response(self, entry):
+        """
+        Rebuild a ``requests.Response`` from a cache entry.
+        """
+        response = requests.Response()
+        response.status_code = entry["status_code"]
+        response.url = entry["url"]
+        response.headers = CaseInsensitiveDict(entry["headers"])
+        response._content = entry["body"]
+        response.truncated = entry.get("truncated", False)
+        response.from_cache = True
+        return response
+
+    # Maintenance
+
+    def stats(self):
+        """
+        Return hit/miss counters and current cache occupancy.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["hits"] = stats["memory_hits"] + stats["disk_hits"]
+            stats["memory_entries"] = len(self._memory)
+            stats["disk_bytes"] = self._disk_bytes
+        stats["coalesced"] = self.flights.coalesced + self.async_flights.coalesced
+        lookups = stats["hits"] + stats["revalidations"] + stats["misses"]
+        stats["hit_ratio"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        return stats
+
+    def clear(self):
+        """
+        Drop every entry from memory and disk and reset the counters.
+        """
+        self._refresh_disk_index(force=True)
+        with self._lock:
+            self._memory.clear()
+            for key in list(self._disk_index):
+                self._remove_disk(key)
+            for name in self._stats:
+                self._stats[name] = 0
+            self.flights.reset()
+            self.async_flights.reset()
+
+    # Internals
+
+    def _normalized(self, url):
+        try:
+            return normalize_url(url)
+        except ValueError:
+            return url
+
+    def _key(self, url):
+        return hashlib.sha256(self._normalized(url).encode("utf-8")).hexdigest()
+
+    def count(self, name):
+        """
+        Increment one of the hit/miss counters reported by ``stats``.
+        """
+        with self._lock:
+            self._stats[name] += 1
+
+    def _remember(self, key, entry):
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key)
+
+    def _refresh_disk_index(self, force=False):
+        """
+        Rebuild the LRU index of on-disk entries (oldest access first) if it
+        was never built or is older than ``DISK_RESCAN_INTERVAL``. The directory
+        is walked without holding the lock.
+        """
+        if (
+            not force
+            and self._disk_index is not None
+            and time.monotonic() - self._disk_scanned_at < DISK_RESCAN_INTERVAL
+        ):
+            return
+        files = []
+        for root, _, names in os.walk(self.cache_dir):
+            for name in names:
+                if len(name) != 64:
+                    continue
+                try:
+                    stat = os.stat(os.path.join(root, name))
+                except FileNotFoundError:
+                    continue  # evicted by another worker meanwhile
+                files.append((stat.st_mtime, name, stat.st_size))
+        files.sort()
+        with self._lock:
+            self._disk_index = OrderedDict((name, size) for _, name, size in files)
+            self._disk_bytes = sum(self._disk_index.values())
+            self._disk_scanned_at = time.monotonic()
+
+    def _read_disk(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                header = json.loads(f.readline())
+                body = f.read()
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Discarding unreadable cache entry {path}: {e}")
+            with self._lock:
+                self._remove_disk(key)
+            return None
+        with self._lock:
+            if self._disk_index is not None and key in self._disk_index:
+                self._disk_index.move_to_end(key)
+        header["body"] = body
+        return header
+
+    def _write_disk(self, key, entry):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        header = {name: value for name, value in entry.items() if name != "body"}
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(json.dumps(header).encode("utf-8") + b"\n")
+                f.write(entry["body"])
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        size = os.path.getsize(path)
+
+        self._refresh_disk_index()
+        with self._lock:
+            index = self._disk_index
+            self._disk_bytes += size - index.pop(key, 0)
+            index[key] = size
+            while self._disk_bytes > self.max_disk_bytes and len(index) > 1:
+                oldest = next(iter(index))
+                self._remove_disk(oldest)
+                self._memory.pop(oldest, None)
+                self._stats["evictions"] += 1
+
+    def _remove_disk(self, key):
+        if self._disk_index is not None:
+            self._disk_bytes -= self._disk_index.pop(key, 0)
+        try:
+            os.unlink(self._path(key))
+        except FileNotFoundError:
+            pass
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    """
+    Return the process-wide page response cache.
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResponseCache()
+    return _cache
@@ -1,31 +1,232 @@
-import requests
-from bs4 import BeautifulSoup
+import asyncio
+import itertools
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urlparse
 import json
+from app.config import Config
+from app.services.async_fetch_engine import AsyncFetchEngine
+from app.services.html_extractor import collect_seo_signals
+from app.services.http_client import get_http_client
+from app.services.response_cache import get_response_cache
+from app.services.origin_metadata_cache import get_origin_metadata_cache
+from app.services.parser_backends import get_default_parser_backend, parse_html
+from app.services.seo_fields import SEO_FIELDS, FieldContext, resolve_fields
+
+# Background workers for the sitemap and robots.txt checks that run alongside the
+# page download and parse. Asynchronous analyses fetch them through their
+# AsyncFetchEngine instead.
+_origin_check_executor = ThreadPoolExecutor(
+    max_workers=Config.ORIGIN_CHECK_WORKERS,
+    thread_name_prefix="origin-check",
+)
 
 class SEOAnalysisService:
     """
     Service for performing SEO analysis on a given URL and returning structured data.
     """
 
-    def perform_local_seo_analysis(self, url, keyword=None):
+    def __init__(
+        self,
+        http_client=None,
+        origin_cache=None,
+        response_cache=None,
+        parser_backend=None,
+    ):
+        self.http_client = http_client or get_http_client()
+        self.origin_cache = origin_cache or get_origin_metadata_cache()
+        self.response_cache = response_cache or get_response_cache()
+        self.parser_backend = parser_backend or get_default_parser_backend()
+
+    def perform_local_seo_analysis(self, url, keyword=None, fields=None, keywords=None):
         """
         Perform a local SEO analysis on the given URL.
+
+        ``fields`` limits the analysis to the named signals in ``SEO_FIELDS``
+        (all of them by default); the page is not downloaded at all when none of
+        the requested signals are read from it. ``keywords`` are extra keywords
+        and phrases reported under "Keyword Analysis" alongside ``keyword``.
         """
         if not self.validate_url(url):
             return {"error": "Invalid URL format"}
-
         try:
-            response = requests.get(url)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, "html.parser")
+            fields = resolve_fields(fields)
+        except ValueError as e:
+            return {"error": str(e)}
 
-            # Extract SEO elements
-            seo_elements = self.extract_seo_elements(soup, url, keyword)
-            return seo_elements
+        # Start the sitemap and robots.txt checks so they overlap with the page
+        # download and parse instead of running after them.
+        origin_checks = self._start_origin_checks(url, fields)
+        try:
+            if not self._needs_page(fields):
+                return self.extract_seo_elements(
+                    None, url, keyword, origin_checks, fields, keywords
+                )
+            response = self.response_cache.fetch(url, self.http_client)
+            return self._analyze_response(
+                response, url, keyword, origin_checks, fields, keywords
+            )
         except Exception as e:
+            for future in origin_checks.values():
+                future.cancel()
+            return {"error": str(e)}
+
+    async def perform_local_seo_analysis_async(
+        self, url, keyword=None, fields=None, keywords=None, engine=None
+    ):
+        """
+        ``perform_local_seo_analysis`` for asyncio callers. The page is downloaded
+        by ``engine`` (a new ``AsyncFetchEngine`` for this call unless given) and
+        parsed in a worker thread.
+        """
+        if engine is None:
+            async with AsyncFetchEngine() as engine:
+                return await self._analyze_async(url, keyword, engine, fields, keywords)
+        return await self._analyze_async(url, keyword, engine, fields, keywords)
+
+    async def analyze_many(
+        self, urls, keyword=None, engine=None, fields=None, keywords=None
+    ):
+        """
+        Analyze many URLs concurrently, yielding ``(url, result)`` pairs as each
+        analysis completes.
+
+        Pages are downloaded by an ``AsyncFetchEngine`` (a new one is opened and
+        closed around the run unless ``engine`` is given), which bounds global and
+        per-host concurrency. At most ``engine.max_concurrency`` analyses are in
+        flight at once, so arbitrarily long URL iterables are consumed lazily.
+        Per-URL failures are yielded as ``{"error": ...}`` results.
+        """
+        if engine is None:
+            async with AsyncFetchEngine() as engine:
+                async for item in self.analyze_many(
+                    urls, keyword, engine, fields, keywords
+                ):
+                    yield item
+            return
+
+        urls = iter(urls)
+
+        async def analyze(url):
+            return url, await self._analyze_async(
+                url, keyword, engine, fields, keywords
+            )
+
+        pending = {
+            asyncio.ensure_future(analyze(url))
+            for url in itertools.islice(urls, engine.max_concurrency)
+        }
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    for next_url in itertools.islice(urls, 1):
+                        pending.add(asyncio.ensure_future(analyze(next_url)))
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _analyze_async(self, url, keyword, engine, fields=None, keywords=None):
+        """
+        Asynchronous counterpart of ``perform_local_seo_analysis``. Parsing and
+        extraction run in a worker thread to keep the event loop responsive.
+        """
+        if not self.validate_url(url):
+            return {"error": "Invalid URL format"}
+        try:
+            fields = resolve_fields(fields)
+        except ValueError as e:
             return {"error": str(e)}
 
+        origin_checks = self._start_origin_checks_async(url, fields, engine)
+        try:
+            if not self._needs_page(fields):
+                return await asyncio.to_thread(
+                    self.extract_seo_elements,
+                    None,
+                    url,
+                    keyword,
+                    origin_checks,
+                    fields,
+                    keywords,
+                )
+            response = await engine.fetch_page(url)
+            return await asyncio.to_thread(
+                self._analyze_response,
+                response,
+                url,
+                keyword,
+                origin_checks,
+                fields,
+                keywords,
+            )
+        except asyncio.CancelledError:
+            for future in origin_checks.values():
+                future.cancel()
+            raise
+        except Exception as e:
+            for future in origin_checks.values():
+                future.cancel()
+            return {"error": str(e) or repr(e)}
+
+    def _analyze_response(
+        self, response, url, keyword, origin_checks, fields=None, keywords=None
+    ):
+        """
+        Parse a fetched page and extract its SEO elements.
+        """
+        response.raise_for_status()
+        soup = parse_html(response.content, self.parser_backend)
+
+        # Extract SEO elements
+        seo_elements = self.extract_seo_elements(
+            soup, url, keyword, origin_checks, fields, keywords
+        )
+        seo_elements["Page Truncated"] = response.truncated
+        return seo_elements
+
+    def _start_origin_checks(self, url, fields=None):
+        """
+        Submit the sitemap and robots.txt checks the requested fields need to the
+        background executor.
+        """
+        checks = {"sitemap": self._check_sitemap, "robots_txt": self._check_robots_txt}
+        needed = {SEO_FIELDS[name].origin_check for name in resolve_fields(fields)}
+        return {
+            name: _origin_check_executor.submit(check, url)
+            for name, check in checks.items()
+            if name in needed
+        }
+
+    def _start_origin_checks_async(self, url, fields, engine):
+        """
+        Start the sitemap and robots.txt checks the requested fields need on the
+        running event loop, fetching through ``engine`` so they stay within its
+        global and per-host connection limits. The returned futures can be waited
+        on from the worker thread that extracts the page's SEO elements.
+        """
+        checks = {
+            "sitemap": ("sitemap.xml", "sitemap"),
+            "robots_txt": ("robots.txt", "robots.txt"),
+        }
+        needed = {SEO_FIELDS[name].origin_check for name in resolve_fields(fields)}
+        loop = asyncio.get_running_loop()
+        return {
+            name: asyncio.run_coroutine_threadsafe(
+                self._check_origin_file_async(url, path, label, engine), loop
+            )
+            for name, (path, label) in checks.items()
+            if name in needed
+        }
+
+    def _needs_page(self, fields):
+        """
+        Whether any of the requested fields is read from the page itself.
+        """
+        return any(SEO_FIELDS[name].needs_page for name in fields)
+
     def validate_url(self, url):
         """
         Validate a given URL string.
@@ -33,61 +234,42 @@ class SEOAnalysisService:
         parsed = urlparse(url)
         return all([parsed.scheme, parsed.netloc])
 
-    def extract_seo_elements(self, soup, url, keyword=None):
+    def extract_seo_elements(
+        self, soup, url, keyword=None, origin_checks=None, fields=None, keywords=None
+    ):
         """
-        Extract various SEO elements from the soup object.
+        Extract various SEO elements from the parsed document in a single traversal.
+
+        ``fields`` selects which entries of ``SEO_FIELDS`` are computed (all of
+        them by default); ``soup`` may be ``None`` when none of them read the page.
+        ``origin_checks`` holds the in-flight sitemap and robots.txt futures started
+        by ``perform_local_seo_analysis``; they are only awaited once the page itself
+        has been processed. Without it the checks run inline.
         """
-        title = soup.title.string if soup.title else "No title found"
-        meta_description_tag = soup.find("meta", attrs={"name": "description"})
-        meta_description = (
-            meta_description_tag["content"]
-            if meta_description_tag and meta_description_tag.get("content")
-            else "No meta description found"
-        )
-        h1_tags = [h1.get_text() for h1 in soup.find_all("h1")]
-        h2_tags = [h2.get_text() for h2 in soup.find_all("h2")]
-        alt_texts_and_image_info = [
-            {"alt": img.get("alt", ""), "src": img.get("src", "")}
-            for img in soup.find_all("img")
-        ]
-        local_business_schemas = self._extract_local_business_schemas(soup)
-        sitemap = self._check_sitemap(url)
-        robots_txt = self._check_robots_txt(url)
-        mobile_friendly = self._check_mobile_friendly(soup)
-        ssl = url.startswith("https://")
-        social_media_links = self._extract_social_media_links(soup)
-        keyword_density = (
-            self._calculate_keyword_density(soup, keyword) if keyword else "N/A"
-        )
-        blog = self._check_blog(soup)
-        google_maps_embed = self._check_google_maps_embed(soup)
+        fields = resolve_fields(fields)
+        signals = None
+        if self._needs_page(fields):
+            collect_text = bool(keyword or keywords) and any(
+                SEO_FIELDS[name].needs_text for name in fields
+            )
+            signals = collect_seo_signals(soup, collect_text=collect_text)
+        context = FieldContext(self, url, signals, keyword, origin_checks, keywords)
+
+        # Page signals first, then whatever waits on the network.
+        ordered = sorted(fields, key=lambda name: bool(SEO_FIELDS[name].origin_check))
+        values = {name: SEO_FIELDS[name].compute(context) for name in ordered}
 
         # Combine all extracted SEO elements into a structured dictionary
-        return {
-            "Title": title,
-            "Meta Description": meta_description,
-            "H1 Tags": h1_tags,
-            "H2 Tags": h2_tags,
-            "Alt Texts and Image Info": alt_texts_and_image_info,
-            "Local Business Schemas": local_business_schemas,
-            "Sitemap": sitemap,
-            "Robots.txt": robots_txt,
-            "Mobile Friendly": mobile_friendly,
-            "SSL": ssl,
-            "Social Media Links": social_media_links,
-            "Keyword Density": keyword_density,
-            "Blog": blog,
-            "Google Maps Embed": google_maps_embed,
-        }
+        return {SEO_FIELDS[name].label: values[name] for name in fields}
 
-    def _extract_local_business_schemas(self, soup):
+    def _extract_local_business_schemas(self, ld_json_blocks):
         """
-        Extract LocalBusiness schemas from the HTML.
+        Extract LocalBusiness schemas from the page's JSON-LD script contents.
         """
         schemas = []
-        for script in soup.find_all("script", type="application/ld+json"):
+        for block in ld_json_blocks:
             try:
-                json_content = json.loads(script.string)
+                json_content = json.loads(block)
                 if (
                     isinstance(json_content, dict)
                     and json_content.get("@type") == "LocalBusiness"
@@ -103,85 +285,46 @@ class SEOAnalysisService:
 
     def _check_sitemap(self, url):
         """
-        Check if the sitemap exists.
+        Check if the sitemap exists at the root of the URL's origin.
         """
-        sitemap_url = f"{url}/sitemap.xml"
-        try:
-            response = requests.get(sitemap_url)
-            if response.status_code == 200:
-                return sitemap_url
-        except Exception as e:
-            return f"No sitemap found: {e}"
+        return self._check_origin_file(url, "sitemap.xml", "sitemap")
 
     def _check_robots_txt(self, url):
         """
-        Check if robots.txt exists.
-        """
-        robots_url = f"{url}/robots.txt"
-        try:
-            response = requests.get(robots_url)
-            if response.status_code == 200:
-                return robots_url
-        except Exception as e:
-            return f"No robots.txt found: {e}"
-
-    def _check_mobile_friendly(self, soup):
-        """
-        Check if the website is mobile-friendly.
-        """
-        viewport_meta = soup.find("meta", attrs={"name": "viewport"})
-        return bool(viewport_meta)
-
-    def _extract_social_media_links(self, soup):
-        """
-        Extract social media links.
+        Check if robots.txt exists at the root of the URL's origin.
         """
-        social_media_links = []
-        for a in soup.find_all("a", href=True):
-            href = a["href"]
-            if any(
-                platform in href
-                for platform in [
-                    "facebook.com",
-                    "twitter.com",
-                    "instagram.com",
-                    "linkedin.com",
-                ]
-            ):
-                social_media_links.append(href)
-        return social_media_links
+        return self._check_origin_file(url, "robots.txt", "robots.txt")
 
-    def _calculate_keyword_density(self, soup, keyword):
+    def _check_origin_file(self, url, path, label):
         """
-        Calculate keyword density.
+        Look up an origin-level file through the shared origin metadata cache.
         """
-        text = soup.get_text().lower()
-        word_count = len(text.split())
-        keyword_count = text.count(keyword.lower())
-        if word_count == 0:
-            return 0
-        return round((keyword_count / word_count) * 100, 2)
+        try:
+            metadata = self.origin_cache.lookup(url, path)
+        except Exception as e:
+            return f"No {label} found: {e}"
+        return self._origin_file_result(metadata, label)
 
-    def _check_blog(self, soup):
+    async def _check_origin_file_async(self, url, path, label, engine):
         """
-        Check if a blog section exists.
+        ``_check_origin_file`` fetching through an ``AsyncFetchEngine``.
         """
-        blog_section = soup.find("section", id="blog") or soup.find(
-            "div", class_="blog"
-        )
-        return bool(blog_section)
+        try:
+            metadata = await self.origin_cache.lookup_async(url, path, engine)
+        except Exception as e:
+            return f"No {label} found: {e}"
+        return self._origin_file_result(metadata, label)
 
-    def _check_google_maps_embed(self, soup):
-        """
-        Check if Google Maps is embedded.
-        """
-        google_maps_iframe = soup.find(
-            "iframe", src=lambda src: src and "google.com/maps" in src
-        )
-        return bool(google_maps_iframe)
+    def _origin_file_result(self, metadata, label):
+        if metadata["found"]:
+            return metadata["url"]
+        if metadata.get("error"):
+            return f"No {label} found: {metadata['error']}"
+        return f"No {label} found (HTTP {metadata['status_code']})"
 
 # Example of usage
-seo_service = SEOAnalysisService()
-url = 'https://example.com'
-seo_data = seo_service.perform_local_seo_analysis(url, keyword='sustainable fashion')
-print(seo_data)
+if __name__ == "__main__":
+    seo_service = SEOAnalysisService()
+    url = 'https://example.com'
+    seo_data = seo_service.perform_local_seo_analysis(url, keyword='sustainable fashion')
+    print(seo_data)
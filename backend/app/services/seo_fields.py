@@ -0,0 +1,210 @@
+from app.services.keyword_density import analyze_keywords, keyword_density, tokenize
+
+
+class SEOField:
+    """
+    A named SEO signal that can be computed independently of the others.
+
+    ``label`` is the key it is reported under. ``needs_page`` marks signals read
+    from the downloaded page, ``needs_text`` those that also need the page text,
+    and ``origin_check`` names the background origin check (sitemap or
+    robots.txt) the signal waits on.
+    """
+
+    def __init__(
+        self, label, compute, needs_page=True, needs_text=False, origin_check=None
+    ):
+        self.label = label
+        self.compute = compute
+        self.needs_page = needs_page
+        self.needs_text = needs_text
+        self.origin_check = origin_check
+
+
+class FieldContext:
+    """
+    Everything a field needs to compute its value for one page.
+    """
+
+    def __init__(
+        self,
+        service,
+        url,
+        signals=None,
+        keyword=None,
+        origin_checks=None,
+        keywords=None,
+    ):
+        self.service = service
+        self.url = url
+        self.signals = signals
+        self.keyword = keyword
+        self.origin_checks = origin_checks or {}
+        self.keywords = list(keywords or [])
+        self._tokens = None
+
+    @property
+    def tokens(self):
+        """
+        The page text tokenized once and shared by every keyword field.
+        """
+        if self._tokens is None:
+            self._tokens = tokenize(self.signals.text)
+        return self._tokens
+
+    def analyze_keywords(self):
+        """
+        Counts, density and positions for ``keyword`` and ``keywords``.
+        """
+        keywords = ([self.keyword] if self.keyword else []) + self.keywords
+        if not keywords:
+            return "N/A"
+        signals = self.signals
+        return analyze_keywords(
+            keywords, signals.text, signals.title, signals.h1, tokens=self.tokens
+        )
+
+    def origin_result(self, name):
+        """
+        The result of an origin check, run inline when it was not started ahead.
+        """
+        future = self.origin_checks.get(name)
+        if future is not None:
+            return future.result()
+        return ORIGIN_CHECKS[name](self.service, self.url)
+
+
+ORIGIN_CHECKS = {
+    "sitemap": lambda service, url: service._check_sitemap(url),
+    "robots_txt": lambda service, url: service._check_robots_txt(url),
+}
+
+# Registered fields, in the order they are reported.
+SEO_FIELDS = {
+    "title": SEOField(
+        "Title",
+        lambda ctx: (ctx.signals.title if ctx.signals.has_title else "No title found"),
+    ),
+    "meta_description": SEOField(
+        "Meta Description",
+        lambda ctx: ctx.signals.meta_description or "No meta description found",
+    ),
+    "h1_tags": SEOField("H1 Tags", lambda ctx: ctx.signals.h1),
+    "h2_tags": SEOField("H2 Tags", lambda ctx: ctx.signals.h2),
+    "images": SEOField("Alt Texts and Image Info", lambda ctx: ctx.signals.images),
+    "local_business_schemas": SEOField(
+        "Local Business Schemas",
+        lambda ctx: ctx.service._extract_local_business_schemas(ctx.signals.ld_json),
+    ),
+    "sitemap": SEOField(
+        "Sitemap",
+        lambda ctx: ctx.origin_result("sitemap"),
+        needs_page=False,
+        origin_check="sitemap",
+    ),
+    "robots_txt": SEOField(
+        "Robots.txt",
+        lambda ctx: ctx.origin_result("robots_txt"),
+        needs_page=False,
+        origin_check="robots_txt",
+    ),
+    "mobile_friendly": SEOField(
+        "Mobile Friendly", lambda ctx: ctx.signals.mobile_friendly
+    ),
+    "ssl": SEOField(
+        "SSL", lambda ctx: ctx.url.startswith("https://"), needs_page=False
+    ),
+    "social_media_links": SEOField(
+        "Social Media Links", lambda ctx: ctx.signals.social_media_links
+    ),
+    "keyword_density": SEOField(
+        "Keyword Density",
+        lambda ctx: (
+            keyword_density(ctx.signals.text, ctx.keyword, tokens=ctx.tokens)
+            if ctx.keyword
+            else "N/A"
+        ),
+        needs_text=True,
+    ),
+    "keyword_analysis": SEOField(
+        "Keyword Analysis", FieldContext.analyze_keywords, needs_text=True
+    ),
+    "blog": SEOField("Blog", lambda ctx: ctx.signals.blog),
+    "google_maps_embed": SEOField(
+        "Google Maps Embed", lambda ctx: ctx.signals.google_maps_embed
+    ),
+}
+
+# Fields each analysis route computes unless the client asks for others.
+ROUTE_FIELDS = {
+    "perplexity": tuple(SEO_FIELDS),
+    "content-optimization": (
+        "title",
+        "meta_description",
+        "h1_tags",
+        "h2_tags",
+        "keyword_density",
+        "keyword_analysis",
+    ),
+    "technical-seo": (
+        "title",
+        "meta_description",
+        "local_business_schemas",
+        "sitemap",
+        "robots_txt",
+        "mobile_friendly",
+        "ssl",
+    ),
+    "local-seo": (
+        "title",
+        "meta_description",
+        "local_business_schemas",
+        "google_maps_embed",
+    ),
+    "competitor-comparison": (
+        "title",
+        "meta_description",
+        "h1_tags",
+        "h2_tags",
+        "social_media_links",
+    ),
+    "ecommerce-seo": (
+        "title",
+        "meta_description",
+        "images",
+        "local_business_schemas",
+    ),
+    "content-gap": (
+        "title",
+        "meta_description",
+        "h1_tags",
+        "h2_tags",
+        "keyword_analysis",
+    ),
+    "backlink-strategy": ("title", "meta_description", "social_media_links"),
+}
+
+
+def resolve_fields(names=None):
+    """
+    Validate requested field names, returning them in report order.
+
+    ``None`` selects every field. A comma-separated string is accepted as well as
+    a list. Raises ``ValueError`` naming any unknown fields.
+    """
+    if names is None:
+        return list(SEO_FIELDS)
+    if isinstance(names, str):
+        names = [name.strip() for name in names.split(",") if name.strip()]
+    if not isinstance(names, (list, tuple, set, frozenset)):
+        raise ValueError("fields must be a list of field names")
+    unknown = [
+        name for name in names if not isinstance(name, str) or name not in SEO_FIELDS
+    ]
+    if unknown:
+        raise ValueError(
+            f"Unknown fields: {', '.join(map(str, unknown))} "
+            f"(available: {', '.join(SEO_FIELDS)})"
+        )
+    requested = set(names)
+    return [name for name in SEO_FIELDS if name in requested]
@@ -0,0 +1,133 @@
+import asyncio
+import threading
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key into a single execution.
+
+    The first caller for a key runs the function; callers arriving while it is
+    still in flight block until it finishes and receive the same result (or the
+    same exception). Nothing is remembered once the call completes, so this
+    complements the caches rather than replacing them. Safe to share between
+    threads.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.executions = 0
+        self.coalesced = 0
+
+    def do(self, key, fn, *args, **kwargs):
+        """
+        Run ``fn(*args, **kwargs)`` unless a call for ``key`` is already in flight,
+        in which case wait for that call and return its result.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executions += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self):
+        """
+        Return how many calls ran and how many joined one already in flight.
+        """
+        with self._lock:
+            return {
+                "executions": self.executions,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._calls),
+            }
+
+    def reset(self):
+        """
+        Reset the counters.
+        """
+        with self._lock:
+            self.executions = 0
+            self.coalesced = 0
+
+
+class AsyncSingleFlight:
+    """
+    ``SingleFlight`` for coroutines.
+
+    The first caller for a key starts ``fn(*args, **kwargs)`` as a task; callers
+    arriving while it runs await the same task. Each caller awaits it through
+    ``asyncio.shield``, so a caller that is cancelled leaves the others' result
+    intact. Calls are coalesced per event loop, so an instance may be shared by
+    loops running in different threads.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self.executions = 0
+        self.coalesced = 0
+
+    async def do(self, key, fn, *args, **kwargs):
+        """
+        Await ``fn(*args, **kwargs)`` unless a call for ``key`` is already in
+        flight, in which case await that call instead.
+        """
+        key = (asyncio.get_running_loop(), key)
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn(*args, **kwargs))
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+            self.executions += 1
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _forget(self, key, task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()  # retrieved, even if every caller went away
+
+    def stats(self):
+        """
+        Return how many calls ran and how many joined one already in flight.
+        """
+        return {
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._calls),
+        }
+
+    def reset(self):
+        """
+        Reset the counters.
+        """
+        self.executions = 0
+        self.coalesced = 0
@@ -0,0 +1,156 @@
+import bisect
+import logging
+import threading
+
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (seconds) of the latency histogram buckets; the last is +Inf.
+LATENCY_BUCKETS = (0.5, 1, 2, 5, 10, 20, 30, 60)
+
+
+class _Series:
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.cache_hits = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cost = 0.0
+        self.timed_calls = 0
+        self.latency_sum = 0.0
+        self.latency_buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.models = {}
+
+    def as_dict(self):
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "cache_hits": self.cache_hits,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cost_usd": round(self.cost, 6),
+            "latency_mean": (
+                round(self.latency_sum / self.timed_calls, 3)
+                if self.timed_calls
+                else 0.0
+            ),
+            # Cumulative counts, Prometheus style: calls that took <= bound.
+            "latency_histogram": {
+                **{
+                    str(bound): sum(self.latency_buckets[: n + 1])
+                    for n, bound in enumerate(LATENCY_BUCKETS)
+                },
+                "+Inf": sum(self.latency_buckets),
+            },
+            "models": dict(self.models),
+        }
+
+
+class UsageMetrics:
+    """
+    In-process token, latency and cost accounting for LLM calls, aggregated per
+    API route (falling back to the prompt type for calls made outside a route).
+    Latency is that of the upstream HTTP attempt alone: calls that were never
+    sent (circuit open, rate limited) count as errors without a latency.
+
+    Costs are estimated from ``PERPLEXITY_PROMPT_TOKEN_COST`` and
+    ``PERPLEXITY_COMPLETION_TOKEN_COST``, in USD per million tokens.
+    """
+
+    def __init__(self, prompt_token_cost=None, completion_token_cost=None):
+        self.prompt_token_cost = (
+            prompt_token_cost
+            if prompt_token_cost is not None
+            else Config.PERPLEXITY_PROMPT_TOKEN_COST
+        )
+        self.completion_token_cost = (
+            completion_token_cost
+            if completion_token_cost is not None
+            else Config.PERPLEXITY_COMPLETION_TOKEN_COST
+        )
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        prompt_type,
+        model,
+        latency=None,
+        usage=None,
+        error=False,
+        cached=False,
+        route=None,
+    ):
+        """
+        Record one call made for ``route``. ``usage`` is the API's ``usage``
+        object; cache hits count as calls but add no tokens, cost or latency.
+        """
+        usage = usage or {}
+        prompt_tokens = int(usage.get("prompt_tokens") or 0)
+        completion_tokens = int(usage.get("completion_tokens") or 0)
+        cost = (
+            prompt_tokens * self.prompt_token_cost
+            + completion_tokens * self.completion_token_cost
+        ) / 1_000_000
+        name = route or prompt_type or "unspecified"
+
+        with self._lock:
+            for key in (name, "total"):
+                series = self._series.setdefault(key, _Series())
+                series.calls += 1
+                series.models[model] = series.models.get(model, 0) + 1
+                if cached:
+                    series.cache_hits += 1
+                    continue
+                series.errors += bool(error)
+                series.prompt_tokens += prompt_tokens
+                series.completion_tokens += completion_tokens
+                series.cost += cost
+                if latency is not None:
+                    series.timed_calls += 1
+                    series.latency_sum += latency
+                    series.latency_buckets[
+                        bisect.bisect_left(LATENCY_BUCKETS, latency)
+                    ] += 1
+
+        if not cached:
+            shown_latency = "-" if latency is None else f"{latency:.3f}s"
+            logger.info(
+                f"LLM call route={route} prompt_type={prompt_type} model={model} "
+                f"latency={shown_latency} "
+                f"prompt_tokens={prompt_tokens} completion_tokens={completion_tokens} "
+                f"cost_usd={cost:.6f} error={bool(error)}"
+            )
+
+    def stats(self):
+        """
+        Return the aggregated series, keyed by route (or prompt type) plus
+        ``total``.
+        """
+        with self._lock:
+            return {name: series.as_dict() for name, series in self._series.items()}
+
+    def clear(self):
+        """
+        Drop every recorded series.
+        """
+        with self._lock:
+            self._series.clear()
+
+
+_metrics = None
+_metrics_lock = threading.Lock()
+
+
+def get_usage_metrics():
+    """
+    Return the process-wide LLM usage metrics.
+    """
+    global _metrics
+    if _metrics is None:
+        with _metrics_lock:
+            if _metrics is None:
+                _metrics = UsageMetrics()
+    return _metrics
@@ -0,0 +1,5 @@
+from app.asgi import create_asgi_app
+
+# Async serving mode: run with an ASGI server, e.g.
+#   uvicorn asgi:app --host 0.0.0.0 --port 5000
+app = create_asgi_app()
@@ -0,0 +1,90 @@
+"""
+Compare parse + extract time for each HTML parser backend.
+
+Run from the backend directory:
+
+    python -m benchmarks.parser_backends [--repeat N]
+"""
+
+import argparse
+import json
+import statistics
+import time
+from unittest.mock import Mock
+
+from app.services.parser_backends import PARSER_BACKENDS, parse_html
+from app.services.seo_analysis_service import SEOAnalysisService
+
+SCHEMA = json.dumps(
+    {"@type": "LocalBusiness", "name": "Corner Bakery", "telephone": "555-0100"}
+)
+
+
+def build_page(sections):
+    """
+    A realistic page with ``sections`` repeated content blocks.
+    """
+    body = []
+    for n in range(sections):
+        body.append(f"""
+            <section class="card">
+              <h2>Section {n}</h2>
+              <p>Fresh <a href="/bread/{n}">bread</a> and pastries, baked daily.
+                 Our <strong>sourdough</strong> uses a {n}-year-old starter.</p>
+              <img src="/img/{n}.jpg" alt="Loaf {n}">
+              <ul><li>Rye</li><li>Spelt</li><li>Wholewheat</li></ul>
+              <a href="https://www.facebook.com/bakery/posts/{n}">Share</a>
+            </section>""")
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+  <meta charset="utf-8">
+  <meta name="viewport" content="width=device-width, initial-scale=1">
+  <title>Corner Bakery</title>
+  <meta name="description" content="Fresh bread baked daily.">
+  <script type="application/ld+json">{SCHEMA}</script>
+  <script>window.dataLayer = [];</script>
+  <style>.card {{ margin: 1em }}</style>
+</head>
+<body>
+  <h1>Corner Bakery</h1>
+  <div class="blog">{"".join(body)}</div>
+  <iframe src="https://www.google.com/maps/embed?pb=bakery"></iframe>
+</body>
+</html>""".encode("utf-8")
+
+
+PAGES = {
+    "small": build_page(5),
+    "medium": build_page(400),
+    "very large": build_page(12000),
+}
+
+
+def run(repeat):
+    service = SEOAnalysisService()
+    origin_checks = {
+        key: Mock(**{"result.return_value": key}) for key in ("sitemap", "robots_txt")
+    }
+
+    print(f"{'page':<12}{'size':>10}  " + "".join(f"{b:>14}" for b in PARSER_BACKENDS))
+    for name, page in PAGES.items():
+        timings = []
+        for backend in PARSER_BACKENDS:
+            samples = []
+            for _ in range(repeat if len(page) < 1_000_000 else max(1, repeat // 10)):
+                start = time.perf_counter()
+                document = parse_html(page, backend)
+                service.extract_seo_elements(
+                    document, "https://example.com", "bread", origin_checks
+                )
+                samples.append(time.perf_counter() - start)
+            timings.append(statistics.median(samples))
+        cells = "".join(f"{t * 1000:>12.2f}ms" for t in timings)
+        print(f"{name:<12}{len(page) / 1024:>8.0f}KB  {cells}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    run(parser.parse_args().repeat)
@@ -0,0 +1,112 @@
+"""
+Load-test an analysis route end to end, offline, against the local stubs.
+
+Run from the backend directory:
+
+    python -m benchmarks.route_load [--route technical-seo] [--requests 200]
+        [--concurrency 16] [--distinct-urls 50] [--latency lognormal:-0.7,0.4]
+        [--origin-latency fixed:0.02] [--error-rate 0] [--replay FILE] [--cache]
+
+Both stubs run in-process on free ports. The response and LLM caches are off
+unless --cache is given, so every request takes the full fetch + LLM path.
+"""
+
+import argparse
+import collections
+import os
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks import stub_origin, stub_perplexity
+
+ROUTE_BODIES = {
+    "perplexity": {"keyword": "bread"},
+    "content-optimization": {"keyword": "bread"},
+    "technical-seo": {},
+    "local-seo": {"location": "Leeds"},
+    "competitor-comparison": {"competitor_url": "https://competitor.example"},
+    "ecommerce-seo": {"product_name": "Sourdough loaf"},
+    "content-gap": {"related_keywords": ["rye", "spelt", "sourdough starter"]},
+    "backlink-strategy": {},
+}
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def run(args):
+    perplexity = stub_perplexity.make_server(
+        stub_perplexity.StubPerplexity(
+            replay=stub_perplexity.load_replay(args.replay) if args.replay else None,
+            latency=args.latency,
+            error_rate=args.error_rate,
+            seed=args.seed,
+        )
+    )
+    origin = stub_origin.make_server(args.sections, args.origin_latency, seed=args.seed)
+    stub_perplexity.start_in_thread(perplexity)
+    stub_perplexity.start_in_thread(origin)
+
+    # Services read their settings when the app is imported, so set them first.
+    os.environ["PERPLEXITY_API_URL"] = (
+        f"http://127.0.0.1:{perplexity.server_port}/chat/completions"
+    )
+    os.environ.setdefault("PERPLEXITY_REQUESTS_PER_MINUTE", "600000")
+    os.environ.setdefault("PERPLEXITY_BURST", str(args.concurrency * 4))
+    if not args.cache:
+        os.environ["RESPONSE_CACHE_ENABLED"] = "false"
+        os.environ["LLM_CACHE_ENABLED"] = "false"
+    from app import create_app
+
+    app = create_app()
+    origin_url = f"http://127.0.0.1:{origin.server_port}"
+    body = ROUTE_BODIES[args.route]
+
+    def request(n):
+        url = f"{origin_url}/pages/{n % args.distinct_urls}"
+        started = time.perf_counter()
+        response = app.test_client().post(
+            f"/seo/analyze/{args.route}", json={"url": url, **body}
+        )
+        return response.status_code, time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        results = list(executor.map(request, range(args.requests)))
+    elapsed = time.perf_counter() - started
+
+    latencies = [latency for _, latency in results]
+    statuses = collections.Counter(status for status, _ in results)
+    print(
+        f"{args.route}: {args.requests} requests, concurrency {args.concurrency}, "
+        f"{elapsed:.2f}s ({args.requests / elapsed:.1f} req/s)"
+    )
+    print(
+        f"latency mean {statistics.fmean(latencies) * 1000:.1f}ms, "
+        f"p50 {percentile(latencies, 0.5) * 1000:.1f}ms, "
+        f"p95 {percentile(latencies, 0.95) * 1000:.1f}ms, "
+        f"p99 {percentile(latencies, 0.99) * 1000:.1f}ms, "
+        f"max {max(latencies) * 1000:.1f}ms"
+    )
+    print(f"statuses {dict(sorted(statuses.items()))}")
+    perplexity.shutdown()
+    origin.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--route", choices=list(ROUTE_BODIES), default="technical-seo")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--distinct-urls", type=int, default=50)
+    parser.add_argument("--sections", type=int, default=400)
+    parser.add_argument("--latency", default="lognormal:-0.7,0.4")
+    parser.add_argument("--origin-latency", default="fixed:0.02")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--replay", help="CSV or JSONL of recorded completions")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--cache", action="store_true")
+    run(parser.parse_args())
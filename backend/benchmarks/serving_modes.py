@@ -0,0 +1,245 @@
+"""
+Compare the sync WSGI deployment with the async ASGI serving mode under load.
+
+Run from the backend directory (needs gunicorn and uvicorn):
+
+    python -m benchmarks.serving_modes [--modes sync,async] [--route technical-seo]
+        [--requests 1000] [--concurrency 200] [--sync-workers 4] [--sync-threads 1]
+        [--latency lognormal:-0.7,0.4] [--origin-latency fixed:0.05] [--sections 40]
+
+Each mode is started as a separate server process (gunicorn sync workers as in
+the Procfile, or ``uvicorn asgi:app`` with one worker) against the in-process
+Perplexity and origin stubs, with the response, completion and SEO data caches
+off so every request does the full fetch + LLM round trip. Reports throughput,
+latency percentiles and the peak resident memory of the server's process tree.
+"""
+
+import argparse
+import asyncio
+import collections
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import aiohttp
+
+from benchmarks import stub_origin, stub_perplexity
+from benchmarks.route_load import ROUTE_BODIES, percentile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def server_command(mode, port, args):
+    if mode == "sync":
+        return [
+            sys.executable,
+            "-m",
+            "gunicorn",
+            "--workers",
+            str(args.sync_workers),
+            "--threads",
+            str(args.sync_threads),
+            "--timeout",
+            "120",
+            "--bind",
+            f"127.0.0.1:{port}",
+            "app:create_app()",
+        ]
+    return [
+        sys.executable,
+        "-m",
+        "uvicorn",
+        "asgi:app",
+        "--port",
+        str(port),
+        "--workers",
+        "1",
+        "--log-level",
+        "warning",
+    ]
+
+
+def process_tree_rss(pid):
+    """
+    Resident memory in bytes of ``pid`` and all of its descendants (Linux).
+    """
+    children = collections.defaultdict(list)
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # The command name may contain spaces; fields resume after ")".
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children[ppid].append(int(entry))
+
+    total = 0
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        pending.extend(children[current])
+        try:
+            with open(f"/proc/{current}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total += int(line.split()[1]) * 1024
+        except OSError:
+            continue
+    return total
+
+
+class MemorySampler(threading.Thread):
+    def __init__(self, pid, interval=0.2):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.interval = interval
+        self.peak = 0
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.is_set():
+            self.peak = max(self.peak, process_tree_rss(self.pid))
+            self.stopped.wait(self.interval)
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+        return self.peak
+
+
+async def wait_until_ready(base_url, timeout=30):
+    deadline = time.monotonic() + timeout
+    async with aiohttp.ClientSession() as session:
+        while time.monotonic() < deadline:
+            try:
+                async with session.get(f"{base_url}/seo/metrics") as response:
+                    if response.status == 200:
+                        return
+            except aiohttp.ClientError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"Server at {base_url} did not start")
+
+
+async def drive(base_url, origin_url, args):
+    """
+    Send ``args.requests`` analyses with at most ``args.concurrency`` in flight,
+    returning ``(elapsed, [(status, latency)])``.
+    """
+    body = ROUTE_BODIES[args.route]
+    semaphore = asyncio.Semaphore(args.concurrency)
+    connector = aiohttp.TCPConnector(limit=args.concurrency)
+    timeout = aiohttp.ClientTimeout(total=300)
+
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+
+        async def request(n):
+            url = f"{origin_url}/pages/{n}"
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    async with session.post(
+                        f"{base_url}/seo/analyze/{args.route}",
+                        json={"url": url, **body},
+                    ) as response:
+                        await response.read()
+                        status = response.status
+                except (aiohttp.ClientError, asyncio.TimeoutError):
+                    status = "error"
+                return status, time.perf_counter() - started
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(request(n) for n in range(args.requests)))
+        return time.perf_counter() - started, results
+
+
+def run_mode(mode, port, env, origin_url, args):
+    server = subprocess.Popen(
+        server_command(mode, port, args),
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        asyncio.run(wait_until_ready(base_url))
+        idle_rss = process_tree_rss(server.pid)
+        sampler = MemorySampler(server.pid)
+        sampler.start()
+        elapsed, results = asyncio.run(drive(base_url, origin_url, args))
+        peak_rss = sampler.stop()
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+    latencies = [latency for _, latency in results]
+    statuses = collections.Counter(status for status, _ in results)
+    print(
+        f"{mode:>5}: {args.requests / elapsed:7.1f} req/s  "
+        f"p50 {percentile(latencies, 0.5) * 1000:7.1f}ms  "
+        f"p95 {percentile(latencies, 0.95) * 1000:7.1f}ms  "
+        f"p99 {percentile(latencies, 0.99) * 1000:7.1f}ms  "
+        f"rss idle {idle_rss / 2**20:6.1f}MiB peak {peak_rss / 2**20:6.1f}MiB  "
+        f"statuses {dict(sorted(statuses.items(), key=str))}"
+    )
+
+
+def main(args):
+    perplexity = stub_perplexity.make_server(
+        stub_perplexity.StubPerplexity(latency=args.latency, seed=args.seed)
+    )
+    origin = stub_origin.make_server(args.sections, args.origin_latency, seed=args.seed)
+    stub_perplexity.start_in_thread(perplexity)
+    stub_perplexity.start_in_thread(origin)
+    origin_url = f"http://127.0.0.1:{origin.server_port}"
+
+    # Neither the client-side Perplexity limits nor the caches should be the
+    # bottleneck being measured.
+    limit = str(args.concurrency)
+    env = {
+        **os.environ,
+        "PERPLEXITY_API_URL": (
+            f"http://127.0.0.1:{perplexity.server_port}/chat/completions"
+        ),
+        "PERPLEXITY_REQUESTS_PER_MINUTE": "6000000",
+        "PERPLEXITY_BURST": limit,
+        "PERPLEXITY_INITIAL_CONCURRENCY": limit,
+        "PERPLEXITY_MAX_CONCURRENCY": limit,
+        "ASYNC_FETCH_MAX_CONCURRENCY": limit,
+        "ASYNC_FETCH_PER_HOST_CONCURRENCY": limit,
+        "RESPONSE_CACHE_ENABLED": "false",
+        "LLM_CACHE_ENABLED": "false",
+        "SEO_DATA_CACHE_ENABLED": "false",
+    }
+
+    print(
+        f"{args.route}: {args.requests} requests, concurrency {args.concurrency}, "
+        f"LLM latency {args.latency}, origin latency {args.origin_latency}"
+    )
+    try:
+        for n, mode in enumerate(args.modes.split(",")):
+            run_mode(mode, args.port + n, env, origin_url, args)
+    finally:
+        perplexity.shutdown()
+        origin.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--modes", default="sync,async")
+    parser.add_argument("--route", choices=list(ROUTE_BODIES), default="technical-seo")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--sync-workers", type=int, default=4)
+    parser.add_argument("--sync-threads", type=int, default=1)
+    parser.add_argument("--sections", type=int, default=40)
+    parser.add_argument("--latency", default="lognormal:-0.7,0.4")
+    parser.add_argument("--origin-latency", default="fixed:0.05")
+    parser.add_argument("--port", type=int, default=8095)
+    parser.add_argument("--seed", type=int, default=1)
+    main(parser.parse_args())
@@ -0,0 +1,88 @@
+"""
+Local static site to analyze in offline benchmarks.
+
+Run from the backend directory:
+
+    python -m benchmarks.stub_origin [--port 8090] [--sections 400] [--latency fixed:0.05]
+
+Every path under /pages/ serves the same generated page (so a load test can use
+many distinct URLs), alongside /sitemap.xml and /robots.txt.
+"""
+
+import argparse
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks.parser_backends import build_page
+from benchmarks.stub_perplexity import LatencyModel
+
+SITEMAP = b"""<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <url><loc>/</loc></url>
+</urlset>
+"""
+
+ROBOTS = b"User-agent: *\nAllow: /\nSitemap: /sitemap.xml\n"
+
+
+def make_handler(page, latency):
+    files = {
+        "/sitemap.xml": ("application/xml", SITEMAP),
+        "/robots.txt": ("text/plain", ROBOTS),
+    }
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_HEAD(self):
+            self._respond(send_body=False)
+
+        def do_GET(self):
+            self._respond(send_body=True)
+
+        def _respond(self, send_body):
+            time.sleep(latency.sample())
+            path = self.path.split("?")[0]
+            status = 200
+            if path in files:
+                content_type, body = files[path]
+            elif path == "/" or path.startswith("/pages/"):
+                content_type, body = "text/html; charset=utf-8", page
+            else:
+                status, content_type, body = 404, "text/plain", b"Not Found"
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("Cache-Control", "max-age=60")
+            self.end_headers()
+            if send_body:
+                self.wfile.write(body)
+
+    return Handler
+
+
+def make_server(sections=400, latency="fixed:0", host="127.0.0.1", port=0, seed=None):
+    """
+    A threaded static-site server; port 0 picks a free port.
+    """
+    handler = make_handler(build_page(sections), LatencyModel(latency, seed))
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--sections", type=int, default=400)
+    parser.add_argument("--latency", default="fixed:0")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    server = make_server(args.sections, args.latency, args.host, args.port, args.seed)
+    print(f"Stub origin on http://{args.host}:{server.server_port}/")
+    server.serve_forever()
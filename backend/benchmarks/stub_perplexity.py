@@ -0,0 +1,260 @@
+"""
+Local stand-in for the Perplexity chat completions API.
+
+Run from the backend directory, then point the API at it with
+PERPLEXITY_API_URL=http://127.0.0.1:8089/chat/completions:
+
+    python -m benchmarks.stub_perplexity [--port 8089] [--replay perplexity_prompts_responses.csv]
+        [--latency lognormal:0.5,0.4] [--error-rate 0.02] [--throttle-rate 0.02] [--seed 1]
+
+Recorded completions are replayed for known prompts; other prompts get a
+completion picked deterministically from the recordings (or a synthetic one).
+"""
+
+import argparse
+import ast
+import csv
+import hashlib
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class LatencyModel:
+    """
+    Latency distribution parsed from ``fixed:S``, ``uniform:LOW,HIGH``,
+    ``normal:MEAN,STDDEV`` or ``lognormal:MU,SIGMA`` (seconds).
+    """
+
+    KINDS = ("fixed", "uniform", "normal", "lognormal")
+
+    def __init__(self, spec="fixed:0", seed=None):
+        kind, _, args = spec.partition(":")
+        if kind not in self.KINDS:
+            raise ValueError(f"latency must be one of: {', '.join(self.KINDS)}")
+        self.kind = kind
+        self.args = [float(arg) for arg in args.split(",") if arg]
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample(self):
+        with self._lock:
+            if self.kind == "fixed":
+                value = self.args[0] if self.args else 0.0
+            elif self.kind == "uniform":
+                value = self._random.uniform(*self.args)
+            elif self.kind == "normal":
+                value = self._random.gauss(*self.args)
+            else:
+                value = self._random.lognormvariate(*self.args)
+        return max(0.0, value)
+
+
+def load_replay(path):
+    """
+    Recorded completions keyed by prompt, from the ``prompt,response`` CSV
+    written by the old prompt runner, or from the JSONL or CSV results of
+    ``BatchPromptRunner`` (a ``completion`` or raw ``response`` per prompt).
+    """
+    replay = {}
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.lower().endswith(".csv"):
+            rows = csv.DictReader(f)
+        else:
+            rows = (json.loads(line) for line in f if line.strip())
+        for row in rows:
+            response = row.get("completion") or row.get("response")
+            if isinstance(response, str):
+                try:
+                    response = json.loads(response)
+                except ValueError:
+                    try:
+                        response = ast.literal_eval(response)
+                    except (ValueError, SyntaxError):
+                        continue
+            if isinstance(response, dict) and response.get("choices"):
+                replay[row["prompt"]] = response
+    return replay
+
+
+def synthetic_completion(prompt):
+    content = "\n\n".join(f"Recommendation {n} for: {prompt[:60]}" for n in range(1, 4))
+    return {
+        "model": "mistral-7b-instruct",
+        "choices": [{"message": {"role": "assistant", "content": content}}],
+    }
+
+
+class StubPerplexity:
+    """
+    Behaviour of the stub: replayed completions, latency and injected failures.
+    """
+
+    def __init__(
+        self,
+        replay=None,
+        latency="fixed:0",
+        error_rate=0.0,
+        throttle_rate=0.0,
+        chunk_delay=0.0,
+        seed=None,
+    ):
+        self.replay = replay or {}
+        self.recordings = [self.replay[prompt] for prompt in sorted(self.replay)]
+        self.latency = LatencyModel(latency, seed)
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.chunk_delay = chunk_delay
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.requests = 0
+
+    def completion_for(self, prompt):
+        if prompt in self.replay:
+            return self.replay[prompt]
+        if not self.recordings:
+            return synthetic_completion(prompt)
+        digest = hashlib.sha256(prompt.encode("utf-8")).digest()
+        return self.recordings[int.from_bytes(digest[:4], "big") % len(self.recordings)]
+
+    def failure(self):
+        """
+        The injected failure status for the next request, if any.
+        """
+        with self._lock:
+            self.requests += 1
+            roll = self._random.random()
+        if roll < self.throttle_rate:
+            return 429
+        if roll < self.throttle_rate + self.error_rate:
+            return 503
+        return None
+
+
+def usage_for(prompt, content):
+    prompt_tokens = max(1, len(prompt) // 4)
+    completion_tokens = max(1, len(content) // 4)
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+    }
+
+
+def make_handler(stub):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_POST(self):
+            if self.path.rstrip("/") != "/chat/completions":
+                return self._send_json(404, {"error": "not found"})
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            prompt = body["messages"][-1]["content"]
+
+            time.sleep(stub.latency.sample())
+            status = stub.failure()
+            if status == 429:
+                return self._send_json(
+                    429, {"error": "rate limited"}, {"Retry-After": "1"}
+                )
+            if status:
+                return self._send_json(status, {"error": "upstream unavailable"})
+
+            completion = stub.completion_for(prompt)
+            content = completion["choices"][0]["message"]["content"]
+            usage = usage_for(prompt, content)
+            if body.get("stream"):
+                return self._stream(body["model"], content, usage)
+            self._send_json(
+                200,
+                {
+                    **completion,
+                    "id": str(uuid.uuid4()),
+                    "model": body["model"],
+                    "created": int(time.time()),
+                    "usage": usage,
+                },
+            )
+
+        def _send_json(self, status, payload, headers=None):
+            data = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _stream(self, model, content, usage):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.close_connection = True
+            chunk_id = str(uuid.uuid4())
+            for n, word in enumerate(content.split(" ")):
+                delta = word if n == 0 else " " + word
+                chunk = {
+                    "id": chunk_id,
+                    "model": model,
+                    "choices": [{"index": 0, "delta": {"content": delta}}],
+                    "usage": usage,
+                }
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+                time.sleep(stub.chunk_delay)
+            self.wfile.write(b"data: [DONE]\n\n")
+
+    return Handler
+
+
+def make_server(stub, host="127.0.0.1", port=0):
+    """
+    A threaded HTTP server for ``stub``; port 0 picks a free port.
+    """
+    server = ThreadingHTTPServer((host, port), make_handler(stub))
+    server.daemon_threads = True
+    return server
+
+
+def start_in_thread(server):
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+    )
+    thread.start()
+    return thread
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--replay", help="CSV or JSONL of recorded completions")
+    parser.add_argument("--latency", default="fixed:0")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--chunk-delay", type=float, default=0.0)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    stub = StubPerplexity(
+        replay=load_replay(args.replay) if args.replay else None,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        chunk_delay=args.chunk_delay,
+        seed=args.seed,
+    )
+    server = make_server(stub, args.host, args.port)
+    print(
+        f"Stub Perplexity API with {len(stub.replay)} recordings on "
+        f"http://{args.host}:{server.server_port}/chat/completions"
+    )
+    server.serve_forever()
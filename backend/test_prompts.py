@@ -1,48 +1,21 @@
-import os
-import requests
-import json
-import pandas as pd
+"""
+Regression-run the SEO prompt templates against Perplexity.
+
+Run from the backend directory:
+
+    python test_prompts.py [--output results.jsonl] [--concurrency N] [--use-cache]
+
+Results are appended to the output file (JSONL, or CSV for a .csv path) as each
+prompt finishes; rerunning with the same output skips prompts that succeeded.
+"""
+
+import argparse
 from dotenv import load_dotenv
+from app.services.batch_runner import BatchPromptRunner, format_summary
 
 # Load environment variables from .env file
 load_dotenv()
 
-class PerplexityService:
-    def __init__(self):
-        self.api_key = os.getenv("PERPLEXITY_API_KEY")
-        self.api_url = "https://api.perplexity.ai/chat/completions"
-        self.headers = {"Authorization": f"Bearer {self.api_key}"}
-
-    def query_perplexity(self, prompt):
-        """
-        Send a prompt to the Perplexity API and return the parsed response.
-        """
-        data = {
-            "model": "mistral-7b-instruct",
-            "messages": [{"role": "user", "content": prompt}],
-        }
-        response = requests.post(self.api_url, headers=self.headers, data=json.dumps(data))
-
-        if response.status_code == 200:
-            return response.json()
-        else:
-            return {"error": f"HTTP error occurred: {response.status_code} - {response.text}"}
-
-    def run_prompts(self, prompts):
-        """
-        Run all prompts and store responses in a DataFrame.
-        """
-        results = []
-        for idx, prompt in enumerate(prompts):
-            print(f"Running prompt {idx + 1}/{len(prompts)}: {prompt}")
-            response = self.query_perplexity(prompt)
-            results.append({"prompt": prompt, "response": response})
-        
-        # Convert results to a DataFrame for easy analysis
-        df = pd.DataFrame(results)
-        return df
-
-
 # Expanded list of SEO-related prompts with more real-world URLs and keywords
 prompts = [
     # SEO Analysis Prompts
@@ -117,12 +90,25 @@ prompts = [
     "What are the best visual optimization practices for https://example.com to improve its performance on search engines?",
 ]
 
-# Initialize the service and run the prompts
-perplexity_service = PerplexityService()
-response_df = perplexity_service.run_prompts(prompts)
 
-# Save the results to a CSV file for further analysis
-output_file = "perplexity_prompts_responses.csv"
-response_df.to_csv(output_file, index=False)
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--output", default="perplexity_prompts_results.jsonl")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument(
+        "--use-cache",
+        action="store_true",
+        help="answer prompts from the LLM cache when possible",
+    )
+    args = parser.parse_args()
+
+    runner = BatchPromptRunner(
+        args.output, concurrency=args.concurrency, bypass_cache=not args.use_cache
+    )
+    summary = runner.run(prompts)
+    print(format_summary(summary))
+    print(f"Results saved to {args.output}")
+
 
-print(f"Results saved to {output_file}")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+import os
+import tempfile
+import pytest
+
+# Keep the on-disk caches out of the developer's real cache directory.
+_cache_root = tempfile.mkdtemp(prefix="mg-seo-api-")
+os.environ.setdefault("RESPONSE_CACHE_DIR", os.path.join(_cache_root, "responses"))
+os.environ.setdefault("LLM_CACHE_PATH", os.path.join(_cache_root, "llm.sqlite3"))
+os.environ.setdefault("JOB_STORE_PATH", os.path.join(_cache_root, "jobs.sqlite3"))
+# Don't let the Perplexity rate limit pace the mocked API calls.
+os.environ.setdefault("PERPLEXITY_REQUESTS_PER_MINUTE", "60000")
+os.environ.setdefault("PERPLEXITY_BURST", "1000")
+
+from app.services.analysis_pipeline import get_seo_data_cache
+from app.services.circuit_breaker import get_perplexity_circuit_breaker
+from app.services.llm_cache import get_llm_cache
+from app.services.origin_metadata_cache import get_origin_metadata_cache
+from app.services.response_cache import get_response_cache
+
+
+@pytest.fixture(autouse=True)
+def reset_shared_caches():
+    """
+    Keep the process-wide caches from leaking results between tests.
+    """
+    caches = [
+        get_origin_metadata_cache(),
+        get_response_cache(),
+        get_llm_cache(),
+        get_seo_data_cache(),
+    ]
+    for cache in caches:
+        cache.clear()
+    get_perplexity_circuit_breaker().reset()
+    yield
+    for cache in caches:
+        cache.clear()
+    get_perplexity_circuit_breaker().reset()
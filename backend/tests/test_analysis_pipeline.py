@@ -0,0 +1,148 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+from app.services.analysis_pipeline import AnalysisPipeline, SEODataCache
+
+PAGE = {
+    "Title": "T",
+    "Meta Description": "D",
+    "Keyword Density": {"bread": 1.5},
+    "Page Truncated": False,
+}
+
+
+class TestAnalysisPipeline(unittest.TestCase):
+    def setUp(self):
+        self.seo_service = MagicMock()
+        self.seo_service.perform_local_seo_analysis.return_value = dict(PAGE)
+        self.cache = SEODataCache(ttl=60, max_urls=2, enabled=True)
+        self.pipeline = AnalysisPipeline(self.seo_service, self.cache)
+
+    def test_repeat_extractions_are_served_from_cache(self):
+        seo_data, age = self.pipeline.extract(
+            "http://Example.com", fields=["title", "meta_description"]
+        )
+        cached, cached_age = self.pipeline.extract(
+            "http://example.com/", fields=["meta_description", "title"]
+        )
+
+        self.assertIsNone(age)
+        self.assertGreaterEqual(cached_age, 0)
+        self.assertEqual(seo_data, PAGE)
+        self.assertEqual(
+            cached, {"Title": "T", "Meta Description": "D", "Page Truncated": False}
+        )
+        self.seo_service.perform_local_seo_analysis.assert_called_once()
+        self.assertEqual(self.cache.stats()["hits"], 1)
+
+    def test_subsets_of_cached_fields_are_projected(self):
+        self.pipeline.extract(
+            "http://example.com", "bread", fields=["title", "keyword_density"]
+        )
+
+        seo_data, age = self.pipeline.extract("http://example.com", fields=["title"])
+
+        self.assertIsNotNone(age)
+        self.assertEqual(seo_data, {"Title": "T", "Page Truncated": False})
+
+    def test_keywords_are_part_of_the_key_only_for_keyword_fields(self):
+        self.pipeline.extract(
+            "http://example.com", "bread", fields=["title", "keyword_density"]
+        )
+        self.pipeline.extract("http://example.com", "rye", fields=["title"])
+        self.assertEqual(self.seo_service.perform_local_seo_analysis.call_count, 1)
+
+        self.pipeline.extract("http://example.com", "rye", fields=["keyword_density"])
+        self.assertEqual(self.seo_service.perform_local_seo_analysis.call_count, 2)
+
+    def test_errors_are_not_cached(self):
+        self.seo_service.perform_local_seo_analysis.return_value = {"error": "boom"}
+
+        self.pipeline.extract("http://example.com", fields=["title"])
+        result, age = self.pipeline.extract("http://example.com", fields=["title"])
+
+        self.assertEqual(result, {"error": "boom"})
+        self.assertIsNone(age)
+        self.assertEqual(self.seo_service.perform_local_seo_analysis.call_count, 2)
+
+    def test_invalid_requests_go_straight_to_the_service(self):
+        self.seo_service.perform_local_seo_analysis.return_value = {"error": "bad"}
+
+        self.pipeline.extract("http://example.com", fields=["nope"])
+
+        self.assertEqual(self.cache.stats()["misses"], 0)
+        self.seo_service.perform_local_seo_analysis.assert_called_once()
+
+    def test_entries_expire_and_are_evicted(self):
+        with patch("app.services.analysis_pipeline.time.monotonic") as clock:
+            clock.return_value = 100.0
+            self.pipeline.extract("http://a.com", fields=["title"])
+            clock.return_value = 161.0
+            self.pipeline.extract("http://a.com", fields=["title"])
+            self.pipeline.extract("http://b.com", fields=["title"])
+            self.pipeline.extract("http://c.com", fields=["title"])
+
+        self.assertEqual(self.seo_service.perform_local_seo_analysis.call_count, 4)
+        self.assertEqual(self.cache.stats()["urls"], 2)
+        self.assertEqual(self.cache.stats()["evictions"], 1)
+
+    def test_async_extractions_share_the_cache(self):
+        self.seo_service.perform_local_seo_analysis_async = AsyncMock(
+            return_value=dict(PAGE)
+        )
+        self.pipeline.extract("http://example.com", fields=["title"])
+
+        cached, age = asyncio.run(
+            self.pipeline.extract_async("http://example.com", fields=["title"])
+        )
+        fresh, fresh_age = asyncio.run(
+            self.pipeline.extract_async("http://example.org", fields=["title"])
+        )
+
+        self.assertIsNotNone(age)
+        self.assertIsNone(fresh_age)
+        self.seo_service.perform_local_seo_analysis_async.assert_awaited_once()
+        self.assertEqual(self.cache.stats()["stores"], 2)
+
+    def test_no_cache_extracts_afresh_and_refreshes_the_cache(self):
+        self.pipeline.extract("http://example.com", fields=["title"])
+
+        _, age = self.pipeline.extract(
+            "http://example.com", fields=["title"], bypass_cache=True
+        )
+        _, cached_age = self.pipeline.extract("http://example.com", fields=["title"])
+
+        self.assertIsNone(age)
+        self.assertIsNotNone(cached_age)
+        self.assertEqual(self.seo_service.perform_local_seo_analysis.call_count, 2)
+        self.assertEqual(self.cache.stats()["bypasses"], 1)
+
+    def test_concurrent_async_extractions_share_one_download(self):
+        async def download(*args, **kwargs):
+            await asyncio.sleep(0.01)
+            return dict(PAGE)
+
+        self.seo_service.perform_local_seo_analysis_async = AsyncMock(
+            side_effect=download
+        )
+
+        async def extract_twice():
+            return await asyncio.gather(
+                *(
+                    self.pipeline.extract_async(
+                        "http://example.com", fields=["title"], bypass_cache=True
+                    )
+                    for _ in range(2)
+                )
+            )
+
+        results = asyncio.run(extract_twice())
+
+        self.assertEqual(results[0], results[1])
+        self.seo_service.perform_local_seo_analysis_async.assert_awaited_once()
+        self.assertEqual(self.pipeline.async_flights.stats()["coalesced"], 1)
+        self.assertEqual(self.cache.stats()["bypasses"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,229 @@
+import asyncio
+import json
+import shutil
+import tempfile
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+import aiohttp
+from aiohttp import web
+from app.asgi import AsyncAnalysisApp
+from app.services.circuit_breaker import CLOSED, HALF_OPEN, CircuitBreaker
+from app.services.llm_cache import LLMCache
+from app.services.perplexity_service import PerplexityService
+from app.services.rate_limiter import UpstreamLimiter
+from app.services.usage_metrics import UsageMetrics
+
+COMPLETION = {
+    "choices": [{"message": {"content": "Fix titles\n\nAdd alt text"}}],
+    "usage": {"prompt_tokens": 10, "completion_tokens": 5},
+}
+
+
+def call(app, method, path, body=None, headers=(), query=b""):
+    """
+    Send one HTTP request through an ASGI app, returning
+    ``(status, headers, json_body)``.
+    """
+    messages = []
+    scope = {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "query_string": query,
+        "headers": [(k.encode(), v.encode()) for k, v in headers],
+    }
+    payload = body if isinstance(body, bytes) else json.dumps(body).encode()
+
+    async def receive():
+        return {"type": "http.request", "body": payload, "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    start, content = messages
+    response_headers = {k.decode(): v.decode() for k, v in start["headers"]}
+    return start["status"], response_headers, json.loads(content["body"])
+
+
+class TestAsyncAnalysisApp(unittest.TestCase):
+    def setUp(self):
+        self.pipeline = MagicMock()
+        self.pipeline.extract_async = AsyncMock(return_value=({"Title": "T"}, None))
+        self.perplexity = PerplexityService()
+        self.perplexity.query_perplexity_async = AsyncMock(
+            return_value={"actionable_insights": [{"insight": "Do X"}]}
+        )
+        self.fallback = AsyncMock()
+        self.app = AsyncAnalysisApp(
+            fallback=self.fallback,
+            pipeline=self.pipeline,
+            perplexity_service=self.perplexity,
+        )
+        self.app.session = MagicMock()
+
+    def test_analysis_routes_are_served_natively(self):
+        status, headers, body = call(
+            self.app,
+            "POST",
+            "/seo/analyze/local-seo",
+            {"url": "http://example.com", "location": "Leeds"},
+        )
+
+        self.assertEqual(status, 200)
+        self.assertEqual(body, {"actionable_insights": [{"insight": "Do X"}]})
+        self.assertEqual(headers["x-seo-data-cache"], "MISS")
+        self.assertEqual(headers["vary"], "Accept-Encoding")
+        self.assertNotIn("etag", headers)
+        prompt = self.perplexity.query_perplexity_async.call_args.args[1]
+        self.assertIn("Leeds", prompt)
+        self.assertEqual(
+            self.perplexity.query_perplexity_async.call_args.kwargs["prompt_type"],
+            "local_seo_enhancement",
+        )
+        self.fallback.assert_not_called()
+
+    def test_perplexity_route_returns_seo_data_alongside(self):
+        self.pipeline.extract_async.return_value = ({"Title": "T"}, 12.5)
+
+        status, headers, body = call(
+            self.app,
+            "POST",
+            "/seo/analyze/perplexity",
+            {"url": "http://example.com", "keyword": "bread"},
+        )
+
+        self.assertEqual(body["seo_data"], {"Title": "T"})
+        self.assertEqual((headers["age"], headers["x-seo-data-cache"]), ("12", "HIT"))
+        self.assertEqual(
+            self.pipeline.extract_async.call_args.kwargs["keyword"], "bread"
+        )
+
+    def test_errors(self):
+        self.pipeline.extract_async.return_value = ({"error": "Invalid URL"}, None)
+        status, _, body = call(self.app, "POST", "/seo/analyze/technical-seo", {})
+        self.assertEqual((status, body), (400, {"error": "Invalid URL"}))
+
+        status, _, _ = call(self.app, "POST", "/seo/analyze/technical-seo", b"{")
+        self.assertEqual(status, 400)
+
+        self.pipeline.extract_async.side_effect = RuntimeError("boom")
+        status, _, body = call(self.app, "POST", "/seo/analyze/technical-seo", {})
+        self.assertEqual((status, body["message"]), (500, "boom"))
+
+    def test_other_requests_go_to_the_fallback(self):
+        async def fallback(scope, receive, send):
+            await send({"type": "http.response.start", "status": 202, "headers": []})
+            await send({"type": "http.response.body", "body": b"{}"})
+
+        self.fallback.side_effect = fallback
+
+        for method, path, headers, query in [
+            ("GET", "/seo/metrics", (), b""),
+            ("POST", "/seo/analyze/composite", (), b""),
+            ("POST", "/seo/analyze/technical-seo", [("Prefer", "respond-async")], b""),
+            ("POST", "/seo/analyze/technical-seo", (), b"stream=true"),
+        ]:
+            status, _, _ = call(self.app, method, path, {}, headers, query)
+            self.assertEqual(status, 202, path)
+        self.pipeline.extract_async.assert_not_called()
+
+
+class TestPerplexityServiceAsync(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        self.service = PerplexityService(
+            llm_cache=LLMCache(db_path=f"{self.tmp}/llm.sqlite3"),
+            limiter=UpstreamLimiter(requests_per_minute=6000, burst=100),
+            usage_metrics=UsageMetrics(),
+            circuit_breaker=CircuitBreaker("test", failure_threshold=5),
+        )
+        self.service.backoff_factor = 0
+        self.statuses = []
+
+    def query(self, statuses, **kwargs):
+        return self.serve(
+            statuses,
+            lambda session: self.service.query_perplexity_async(
+                session, "Audit this page", **kwargs
+            ),
+        )
+
+    def serve(self, statuses, call, delay=0):
+        async def completions(request):
+            await asyncio.sleep(delay)
+            status = statuses.pop(0) if statuses else 200
+            self.statuses.append(status)
+            if status == "html":
+                return web.Response(text="<html>Maintenance</html>")
+            if status != 200:
+                return web.json_response({"error": "busy"}, status=status)
+            return web.json_response(COMPLETION)
+
+        async def main():
+            app = web.Application()
+            app.router.add_post("/chat/completions", completions)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, "127.0.0.1", 0)
+            await site.start()
+            port = site._server.sockets[0].getsockname()[1]
+            self.service.api_url = f"http://127.0.0.1:{port}/chat/completions"
+            try:
+                async with aiohttp.ClientSession() as session:
+                    return await call(session)
+            finally:
+                await runner.cleanup()
+
+        return asyncio.run(main())
+
+    def test_completions_are_retried_cached_and_metered(self):
+        result = self.query([429, 200], prompt_type="technical_seo_audit")
+        cached = self.query([], prompt_type="technical_seo_audit")
+
+        self.assertEqual(len(result["actionable_insights"]), 2)
+        self.assertEqual(cached, result)
+        self.assertEqual(self.statuses, [429, 200])
+        self.assertEqual(self.service.limiter.stats()["retries"], 1)
+        usage = self.service.usage_metrics.stats()["technical_seo_audit"]
+        self.assertEqual((usage["calls"], usage["cache_hits"]), (2, 1))
+
+    def test_identical_prompts_share_one_api_call(self):
+        async def gather(session):
+            return await asyncio.gather(
+                *(
+                    self.service.query_perplexity_async(session, "Audit this page")
+                    for _ in range(4)
+                )
+            )
+
+        results = self.serve([], gather, delay=0.05)
+
+        self.assertEqual(self.statuses, [200])
+        self.assertEqual(len({repr(result) for result in results}), 1)
+        self.assertEqual(self.service.llm_cache.stats()["coalesced"], 3)
+
+    def test_upstream_failures_count_towards_the_circuit(self):
+        self.service.max_retries = 0
+
+        result = self.query([503])
+
+        self.assertIn("503", result["error"])
+        self.assertEqual(self.service.circuit_breaker.stats()["failures"], 1)
+
+    def test_undecodable_probe_does_not_wedge_the_circuit(self):
+        breaker = CircuitBreaker("test", failure_threshold=1, recovery_timeout=0)
+        breaker.record_failure()
+        self.service.circuit_breaker = breaker
+        self.assertEqual(breaker.state, HALF_OPEN)
+
+        with self.assertRaises(json.JSONDecodeError):
+            self.query(["html"])
+
+        self.assertEqual(breaker.state, CLOSED)
+        self.assertIn("actionable_insights", self.query([200]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,166 @@
+import asyncio
+import unittest
+from unittest.mock import Mock
+from aiohttp import web
+from app.services.async_fetch_engine import AsyncFetchEngine
+from app.services.origin_metadata_cache import OriginMetadataCache
+from app.services.response_cache import ResponseCache
+from app.services.seo_analysis_service import SEOAnalysisService
+
+
+class OriginServer:
+    """
+    Local aiohttp origin that tracks how many page requests are in flight.
+    """
+
+    def __init__(self):
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.failures_left = 0
+        self.page_requests = 0
+        app = web.Application()
+        app.router.add_get("/page/{n}", self.page)
+        app.router.add_get("/flaky", self.flaky)
+        app.router.add_get("/big", self.big)
+        app.router.add_get("/trickle", self.trickle)
+        app.router.add_get("/image", self.image)
+        app.router.add_get("/robots.txt", self.robots)
+        self.runner = web.AppRunner(app)
+
+    async def start(self):
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.base_url = f"http://127.0.0.1:{port}"
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+    async def track(self):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.02)
+        self.in_flight -= 1
+
+    async def page(self, request):
+        self.page_requests += 1
+        await self.track()
+        n = request.match_info["n"]
+        return web.Response(
+            text=f"<html><head><title>Page {n}</title></head></html>",
+            content_type="text/html",
+        )
+
+    async def flaky(self, request):
+        if self.failures_left:
+            self.failures_left -= 1
+            return web.Response(status=503, headers={"Retry-After": "0"})
+        return web.Response(text="<html></html>", content_type="text/html")
+
+    async def big(self, request):
+        return web.Response(body=b"<html>" + b"a" * 100000, content_type="text/html")
+
+    async def trickle(self, request):
+        # Never idle long enough for the read timeout, never finishing either
+        response = web.StreamResponse(headers={"Content-Type": "text/html"})
+        await response.prepare(request)
+        for _ in range(100):
+            await response.write(b"<p>")
+            await asyncio.sleep(0.02)
+        return response
+
+    async def image(self, request):
+        return web.Response(body=b"\x89PNG", content_type="image/png")
+
+    async def robots(self, request):
+        await self.track()
+        return web.Response(text="User-agent: *\nAllow: /\n")
+
+
+class TestAsyncFetchEngine(unittest.TestCase):
+    def run_with_origin(self, scenario, **engine_kwargs):
+        async def main():
+            origin = OriginServer()
+            await origin.start()
+            engine = AsyncFetchEngine(
+                response_cache=ResponseCache(enabled=False),
+                backoff_factor=0,
+                **engine_kwargs,
+            )
+            try:
+                async with engine:
+                    return await scenario(origin, engine)
+            finally:
+                await origin.stop()
+
+        return asyncio.run(main())
+
+    def test_retries_transient_statuses(self):
+        async def scenario(origin, engine):
+            origin.failures_left = 2
+            return await engine.fetch_page(f"{origin.base_url}/flaky")
+
+        response = self.run_with_origin(scenario, max_retries=2)
+        self.assertEqual(response.status_code, 200)
+
+    def test_concurrent_fetches_of_a_url_share_one_request(self):
+        async def scenario(origin, engine):
+            urls = [f"{origin.base_url}/page/1", f"{origin.base_url}/page/1#top"] * 2
+            responses = await asyncio.gather(*(engine.fetch_page(u) for u in urls))
+            return origin.page_requests, responses
+
+        page_requests, responses = self.run_with_origin(scenario)
+        self.assertEqual(page_requests, 1)
+        self.assertEqual({response.status_code for response in responses}, {200})
+
+    def test_total_timeout_bounds_slow_bodies(self):
+        async def scenario(origin, engine):
+            with self.assertRaises(asyncio.TimeoutError):
+                await engine.fetch_page(f"{origin.base_url}/trickle")
+
+        self.run_with_origin(scenario, read_timeout=1, total_timeout=0.2, max_retries=0)
+
+    def test_enforces_byte_cap(self):
+        async def scenario(origin, engine):
+            return await engine.fetch_page(f"{origin.base_url}/big")
+
+        response = self.run_with_origin(scenario, max_page_bytes=1000)
+        self.assertEqual(len(response.content), 1000)
+        self.assertTrue(response.truncated)
+
+    def test_rejects_non_html_content(self):
+        async def scenario(origin, engine):
+            return await engine.fetch_page(f"{origin.base_url}/image")
+
+        with self.assertRaises(ValueError):
+            self.run_with_origin(scenario)
+
+    def test_analyze_many_bounds_per_host_concurrency(self):
+        origin_cache = OriginMetadataCache(http_client=Mock(), ttl=0)
+        service = SEOAnalysisService(origin_cache=origin_cache)
+
+        async def scenario(origin, engine):
+            urls = [f"{origin.base_url}/page/{n}" for n in range(12)]
+            urls.append("not-a-url")
+            results = [item async for item in service.analyze_many(urls, engine=engine)]
+            return origin, results
+
+        origin, results = self.run_with_origin(
+            scenario, max_concurrency=10, per_host_concurrency=3
+        )
+
+        self.assertEqual(len(results), 13)
+        titles = {result["Title"] for _, result in results if "Title" in result}
+        self.assertEqual(titles, {f"Page {n}" for n in range(12)})
+        self.assertEqual(dict(results)["not-a-url"], {"error": "Invalid URL format"})
+        # robots.txt checks go through the engine too, so they count towards
+        # the per-host bound alongside the pages.
+        robots = {result["Robots.txt"] for _, result in results if "Title" in result}
+        self.assertEqual(robots, {f"{origin.base_url}/robots.txt"})
+        self.assertLessEqual(origin.max_in_flight, 3)
+        origin_cache.http_client.get_status.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
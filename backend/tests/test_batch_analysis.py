@@ -0,0 +1,121 @@
+import asyncio
+import json
+import unittest
+from app.services.batch_analysis import iterate_async, resolve_batch, stream_batch
+
+
+class FakeSEOService:
+    def __init__(self):
+        self.closed = False
+        self.calls = []
+
+    async def analyze_many(self, urls, keyword=None, fields=None, keywords=None):
+        self.calls.append({"keyword": keyword, "fields": fields, "keywords": keywords})
+        try:
+            for url in reversed(urls):
+                if url == "boom":
+                    raise RuntimeError("engine failed")
+                if url.startswith("http"):
+                    yield url, {"Title": url}
+                else:
+                    yield url, {"error": "Invalid URL format"}
+        finally:
+            self.closed = True
+
+
+class LeavesTasksBehind:
+    """
+    Cancels its in-flight task on close without awaiting it, as
+    ``SEOAnalysisService.analyze_many`` does.
+    """
+
+    async def analyze(self):
+        try:
+            await asyncio.sleep(60)
+        finally:
+            # Cleanup that outlives the generator's own close.
+            await asyncio.sleep(0.01)
+
+    async def analyze_many(self, urls, keyword=None, fields=None, keywords=None):
+        self.task = asyncio.ensure_future(self.analyze())
+        try:
+            yield urls[0], {"Title": urls[0]}
+        finally:
+            self.task.cancel()
+
+
+class TestBatchAnalysis(unittest.TestCase):
+    def test_streams_one_line_per_url_then_a_summary(self):
+        service = FakeSEOService()
+
+        lines = list(
+            stream_batch(
+                service, ["http://a.com", "nope", "http://b.com"], ["title"], "bread"
+            )
+        )
+
+        records = [json.loads(line) for line in lines]
+        self.assertTrue(all(line.endswith("\n") for line in lines))
+        self.assertEqual(
+            records[0], {"url": "http://b.com", "seo_data": {"Title": "http://b.com"}}
+        )
+        self.assertEqual(records[1], {"url": "nope", "error": "Invalid URL format"})
+        summary = records[-1]["summary"]
+        self.assertEqual(
+            (summary["total"], summary["succeeded"], summary["failed"]), (3, 2, 1)
+        )
+        self.assertEqual(service.calls[0]["fields"], ["title"])
+        self.assertEqual(service.calls[0]["keyword"], "bread")
+
+    def test_unexpected_errors_end_the_stream_cleanly(self):
+        records = [
+            json.loads(line)
+            for line in stream_batch(FakeSEOService(), ["boom", "http://a.com"], None)
+        ]
+
+        self.assertEqual(records[0]["url"], "http://a.com")
+        self.assertEqual(records[1]["message"], "engine failed")
+        self.assertIn("summary", records[2])
+
+    def test_closing_the_stream_closes_the_analysis(self):
+        service = FakeSEOService()
+        lines = stream_batch(service, ["http://a.com", "http://b.com"], None)
+
+        next(lines)
+        lines.close()
+
+        self.assertTrue(service.closed)
+
+    def test_closing_the_stream_awaits_cancelled_tasks(self):
+        service = LeavesTasksBehind()
+        lines = stream_batch(service, ["http://a.com", "http://b.com"], None)
+
+        next(lines)
+        lines.close()
+
+        self.assertTrue(service.task.cancelled())
+
+    def test_resolve_batch(self):
+        self.assertIn("sitemap", resolve_batch(["http://a.com"], None))
+        self.assertIn(
+            "google_maps_embed", resolve_batch(["http://a.com"], ["local-seo"])
+        )
+        for urls, analyses, message in [
+            ([], None, "non-empty list"),
+            ([1], None, "list of strings"),
+            (["http://a.com"] * 3, None, "at most 2"),
+            (["http://a.com"], ["nope"], "Unknown analyses: nope"),
+        ]:
+            with self.assertRaisesRegex(ValueError, message):
+                resolve_batch(urls, analyses, max_urls=2)
+
+    def test_iterate_async(self):
+        async def numbers():
+            for n in range(3):
+                yield n
+
+        self.assertEqual(list(iterate_async(numbers())), [0, 1, 2])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import csv
+import json
+import shutil
+import tempfile
+import unittest
+from unittest.mock import Mock
+from app.services.batch_runner import BatchPromptRunner, format_summary, prompt_id
+
+
+def completion(prompt):
+    return {
+        "choices": [{"message": {"role": "assistant", "content": prompt.upper()}}],
+        "usage": {"prompt_tokens": 3, "completion_tokens": 2},
+    }
+
+
+def fake_service(failing=()):
+    service = Mock()
+
+    def query_completion(prompt, **kwargs):
+        if prompt in failing:
+            return {"error": "HTTP error occurred: 500 - boom"}
+        return completion(prompt)
+
+    service.query_completion.side_effect = query_completion
+    return service
+
+
+class TestBatchPromptRunner(unittest.TestCase):
+    def setUp(self):
+        self.output_dir = tempfile.mkdtemp()
+        self.prompts = [f"prompt {n}" for n in range(6)]
+
+    def tearDown(self):
+        shutil.rmtree(self.output_dir, ignore_errors=True)
+
+    def read_jsonl(self, path):
+        with open(path) as f:
+            return [json.loads(line) for line in f]
+
+    def test_results_are_streamed_to_jsonl(self):
+        path = f"{self.output_dir}/results.jsonl"
+        service = fake_service(failing={"prompt 2"})
+        runner = BatchPromptRunner(path, service=service, concurrency=3)
+
+        summary = runner.run(self.prompts, progress=lambda line: None)
+
+        records = self.read_jsonl(path)
+        self.assertEqual(len(records), 6)
+        by_prompt = {record["prompt"]: record for record in records}
+        self.assertEqual(by_prompt["prompt 2"]["status"], "error")
+        self.assertEqual(by_prompt["prompt 0"]["response"], completion("prompt 0"))
+        self.assertEqual((summary["completed"], summary["failed"]), (5, 1))
+        self.assertIn("5 ok, 1 failed", format_summary(summary))
+        service.query_completion.assert_any_call(
+            "prompt 0", prompt_type="batch", bypass_cache=True
+        )
+
+    def test_rerun_skips_prompts_that_succeeded(self):
+        path = f"{self.output_dir}/results.jsonl"
+        BatchPromptRunner(
+            path, service=fake_service(failing={"prompt 2"}), concurrency=2
+        ).run(self.prompts, progress=lambda line: None)
+
+        service = fake_service()
+        summary = BatchPromptRunner(path, service=service).run(
+            self.prompts, progress=lambda line: None
+        )
+
+        service.query_completion.assert_called_once()
+        self.assertEqual(service.query_completion.call_args.args, ("prompt 2",))
+        self.assertEqual(summary["skipped"], 5)
+        self.assertEqual(self.read_jsonl(path)[-1]["status"], "ok")
+
+    def test_resume_drops_a_partially_written_record(self):
+        path = f"{self.output_dir}/results.jsonl"
+        BatchPromptRunner(path, service=fake_service()).run(
+            self.prompts[:2], progress=lambda line: None
+        )
+        with open(path, "a") as f:
+            f.write('{"prompt_id": "abc", "prompt": "prompt 2", "sta')
+
+        service = fake_service()
+        BatchPromptRunner(path, service=service).run(
+            self.prompts[:3], progress=lambda line: None
+        )
+
+        records = self.read_jsonl(path)
+        self.assertEqual([r["prompt"] for r in records], self.prompts[:3])
+        service.query_completion.assert_called_once()
+
+    def test_csv_output_can_be_resumed(self):
+        path = f"{self.output_dir}/results.csv"
+        BatchPromptRunner(path, service=fake_service()).run(
+            self.prompts[:3], progress=lambda line: None
+        )
+
+        service = fake_service()
+        BatchPromptRunner(path, service=service).run(
+            self.prompts, progress=lambda line: None
+        )
+
+        with open(path, newline="") as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(rows[0]["prompt_id"], prompt_id(rows[0]["prompt"]))
+        self.assertEqual(service.query_completion.call_count, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,188 @@
+import shutil
+import tempfile
+import unittest
+from unittest.mock import Mock, patch
+import requests
+from app.services.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from app.services.llm_cache import LLMCache
+from app.services.perplexity_service import PerplexityService
+
+COMPLETION = {"choices": [{"message": {"content": "Insight 1\n\nInsight 2"}}]}
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def setUp(self):
+        self.now = 1000.0
+        patcher = patch("app.services.circuit_breaker.time.monotonic", lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.breaker = CircuitBreaker("test", failure_threshold=3, recovery_timeout=10)
+
+    def test_opens_after_consecutive_failures(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.breaker.record_success()
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CLOSED)
+
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, OPEN)
+        self.assertFalse(self.breaker.allow_request())
+        self.assertEqual(self.breaker.stats()["rejected"], 1)
+
+    def test_half_open_probe_closes_or_reopens(self):
+        for _ in range(3):
+            self.breaker.record_failure()
+        self.now += 10
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+
+        self.assertTrue(self.breaker.allow_request())
+        self.assertFalse(self.breaker.allow_request())
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, OPEN)
+        self.assertEqual(self.breaker.stats()["opened"], 2)
+
+        self.now += 10
+        self.assertTrue(self.breaker.allow_request())
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state, CLOSED)
+
+    def test_cancelled_probe_is_given_back(self):
+        for _ in range(3):
+            self.breaker.record_failure()
+        self.now += 10
+
+        self.assertTrue(self.breaker.allow_request())
+        self.breaker.record_cancelled()
+        self.assertTrue(self.breaker.allow_request())
+
+
+class TestPerplexityCircuit(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.llm_cache = LLMCache(db_path=f"{self.cache_dir}/llm.sqlite3")
+        self.breaker = CircuitBreaker(
+            "Perplexity", failure_threshold=2, recovery_timeout=60
+        )
+        self.service = PerplexityService(
+            llm_cache=self.llm_cache, circuit_breaker=self.breaker
+        )
+        self.service.max_retries = 0
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    @patch("requests.post")
+    def test_open_circuit_serves_stale_completion(self, mock_post):
+        mock_post.return_value = Mock(
+            status_code=200, **{"json.return_value": COMPLETION}
+        )
+        self.service.query_perplexity("prompt")
+        self.assertEqual(mock_post.call_args.kwargs["timeout"], self.service.timeout)
+
+        # The cached completion expires and the API starts timing out
+        mock_post.side_effect = requests.Timeout("read timed out")
+        with patch.object(self.llm_cache, "get", return_value=None):  # expired
+            results = [self.service.query_perplexity("prompt") for _ in range(3)]
+
+        self.assertEqual(mock_post.call_count, 3)
+        self.assertEqual(self.breaker.state, OPEN)
+        for result in results:
+            self.assertTrue(result["stale"])
+            self.assertEqual(len(result["actionable_insights"]), 2)
+
+    @patch("requests.post")
+    def test_failing_stream_serves_stale_completion(self, mock_post):
+        mock_post.return_value = Mock(
+            status_code=200, **{"json.return_value": COMPLETION}
+        )
+        self.service.query_perplexity("prompt")
+
+        mock_post.return_value = Mock(status_code=503, text="Service Unavailable")
+        with patch.object(self.llm_cache, "get", return_value=None):  # expired
+            items = list(self.service.stream_perplexity("prompt"))
+
+        self.assertEqual(len(items), 2)
+        self.assertTrue(all(item["stale"] for item in items))
+        self.assertEqual(self.breaker.stats()["failures"], 1)
+
+    @patch("requests.post")
+    def test_open_circuit_without_cache_fails_fast(self, mock_post):
+        mock_post.return_value = Mock(status_code=503, text="Service Unavailable")
+
+        first = self.service.query_perplexity("prompt")
+        self.service.query_perplexity("prompt")
+        result = self.service.query_perplexity("prompt")
+
+        self.assertEqual(
+            first["error"], "HTTP error occurred: 503 - Service Unavailable"
+        )
+        self.assertTrue(result["circuit_open"])
+        self.assertEqual(mock_post.call_count, 2)
+
+    @patch("requests.post")
+    def test_client_errors_do_not_open_the_circuit(self, mock_post):
+        mock_post.return_value = Mock(status_code=400, text="Bad Request")
+
+        for _ in range(3):
+            self.service.query_perplexity("prompt")
+
+        self.assertEqual(self.breaker.state, CLOSED)
+
+    @patch("requests.post")
+    def test_unexpected_errors_release_the_half_open_probe(self, mock_post):
+        self.breaker.recovery_timeout = 0
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        mock_post.side_effect = ValueError("bad adapter")
+
+        with self.assertRaises(ValueError):
+            self.service.query_perplexity("prompt")
+
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+        self.assertTrue(self.breaker.allow_request())
+
+    @patch("requests.post")
+    def test_streams_count_once_their_body_is_read(self, mock_post):
+        def broken_stream(**kwargs):
+            yield 'data: {"choices": [{"delta": {"content": "Insight"}}]}'
+            raise requests.exceptions.ChunkedEncodingError("connection broken")
+
+        mock_post.return_value = Mock(
+            status_code=200, **{"iter_lines.side_effect": broken_stream}
+        )
+        list(self.service.stream_perplexity("prompt"))
+        self.assertEqual(self.breaker.stats()["consecutive_failures"], 1)
+
+        mock_post.return_value = Mock(
+            status_code=200, **{"iter_lines.return_value": ["data: [DONE]"]}
+        )
+        list(self.service.stream_perplexity("prompt"))
+        self.assertEqual(self.breaker.state, OPEN)
+
+    @patch("requests.post")
+    def test_abandoned_stream_releases_the_half_open_probe(self, mock_post):
+        self.breaker.recovery_timeout = 0
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        mock_post.return_value = Mock(
+            status_code=200,
+            **{
+                "iter_lines.return_value": [
+                    'data: {"choices": [{"delta": {"content": "A\\n\\nB"}}]}'
+                ]
+            },
+        )
+
+        stream = self.service.stream_perplexity("prompt")
+        next(stream)
+        self.assertFalse(self.breaker.allow_request())
+        stream.close()
+
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+        self.assertTrue(self.breaker.allow_request())
+
+
+if __name__ == "__main__":
+    unittest.main()
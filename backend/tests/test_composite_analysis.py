@@ -0,0 +1,102 @@
+import unittest
+from unittest.mock import Mock
+from app.services.composite_analysis import (
+    CompositeAnalysisService,
+    composite_fields,
+    split_composite_response,
+)
+from app.services.perplexity_service import PerplexityService
+
+
+class TestCompositeAnalysisService(unittest.TestCase):
+    def setUp(self):
+        self.seo_service = Mock()
+        self.seo_service.perform_local_seo_analysis.return_value = {"Title": "T"}
+        self.perplexity_service = PerplexityService()
+        self.perplexity_service.query_perplexity = Mock(
+            side_effect=lambda prompt, **kwargs: {
+                "actionable_insights": [{"insight": kwargs["prompt_type"]}]
+            }
+        )
+        self.service = CompositeAnalysisService(
+            self.seo_service, self.perplexity_service
+        )
+
+    def test_parallel_mode_fetches_once_and_calls_per_section(self):
+        result = self.service.analyze(
+            "http://example.com",
+            ["technical-seo", "local-seo", "backlink-strategy"],
+            params={"location": "Leeds"},
+        )
+
+        self.seo_service.perform_local_seo_analysis.assert_called_once()
+        fields = self.seo_service.perform_local_seo_analysis.call_args.kwargs["fields"]
+        self.assertIn("sitemap", fields)
+        self.assertIn("google_maps_embed", fields)
+        self.assertEqual(len(fields), len(set(fields)))
+        self.assertEqual(self.perplexity_service.query_perplexity.call_count, 3)
+        self.assertEqual(
+            result["analyses"]["local-seo"],
+            {"actionable_insights": [{"insight": "local_seo_enhancement"}]},
+        )
+        self.assertEqual(result["seo_data"], {"Title": "T"})
+
+    def test_combined_mode_uses_one_prompt(self):
+        self.perplexity_service.query_perplexity = Mock(
+            return_value={
+                "actionable_insights": [
+                    {"insight": "## technical-seo\nFix the sitemap."},
+                    {"insight": "Add HSTS."},
+                    {"insight": "## backlink-strategy"},
+                    {"insight": "Pitch local press."},
+                ]
+            }
+        )
+
+        result = self.service.analyze(
+            "http://example.com",
+            ["technical-seo", "backlink-strategy", "local-seo"],
+            params={"location": "Leeds"},
+            mode="combined",
+        )
+
+        self.perplexity_service.query_perplexity.assert_called_once()
+        prompt = self.perplexity_service.query_perplexity.call_args.args[0]
+        self.assertIn("## local-seo\n", prompt)
+        self.assertEqual(
+            result["analyses"]["technical-seo"]["actionable_insights"],
+            [{"insight": "Fix the sitemap."}, {"insight": "Add HSTS."}],
+        )
+        self.assertEqual(
+            result["analyses"]["backlink-strategy"]["actionable_insights"],
+            [{"insight": "Pitch local press."}],
+        )
+        self.assertIn("error", result["analyses"]["local-seo"])
+
+    def test_invalid_requests_are_rejected(self):
+        with self.assertRaisesRegex(ValueError, "Unknown analyses: nope"):
+            self.service.analyze("http://example.com", ["nope"])
+        with self.assertRaisesRegex(ValueError, "Missing parameters: keyword"):
+            self.service.analyze("http://example.com", ["content-optimization"])
+        self.seo_service.perform_local_seo_analysis.assert_not_called()
+
+    def test_helpers(self):
+        self.assertEqual(
+            composite_fields(["local-seo", "backlink-strategy"]),
+            [
+                "title",
+                "meta_description",
+                "local_business_schemas",
+                "google_maps_embed",
+                "social_media_links",
+            ],
+        )
+        error = {"error": "HTTP error occurred: 500 - boom"}
+        self.assertEqual(
+            split_composite_response(error, ["technical-seo"]),
+            {"technical-seo": error},
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+import unittest
+from bs4 import BeautifulSoup
+from app.services.html_extractor import collect_seo_signals
+
+DOCUMENTS = {
+    "empty": "",
+    "minimal": "<html><head><title>Only a title</title></head></html>",
+    "full": """
+        <!DOCTYPE html>
+        <html>
+          <head>
+            <title>Shop &amp; Blog</title>
+            <meta name="viewport" content="width=device-width">
+            <meta name="description" content="First description">
+            <meta name="description" content="Second description">
+            <script type="application/ld+json">{"@type": "LocalBusiness", "name": "A"}</script>
+            <script>var ignored = "keyword";</script>
+            <style>.keyword { color: red }</style>
+          </head>
+          <body>
+            <!-- keyword in a comment -->
+            <h1>Main <b>keyword</b> heading</h1>
+            <h2>Sub one</h2><h2>Sub <i>two</i></h2>
+            <img src="/a.png" alt="An image"><img src="/b.png">
+            <a href="https://facebook.com/shop">fb</a>
+            <a href="https://example.com/about">about</a>
+            <a href="https://twitter.com/shop">tw</a>
+            <div class="post blog">keyword keyword</div>
+            <iframe src="https://www.google.com/maps/embed?pb=1"></iframe>
+            <template><p>keyword in template</p></template>
+            <p>Closing keyword text</p>
+          </body>
+        </html>
+    """,
+    "no_content_description": """
+        <html><head><title></title><meta name="description"></head>
+        <body><section id="blog"><h1>A<h1>nested</h1></h1></section></body></html>
+    """,
+    "broken_json_ld": """
+        <html><head><script type="application/ld+json">{not json</script></head></html>
+    """,
+}
+
+
+def reference_signals(soup):
+    """
+    The per-feature find_all traversals the collector replaced.
+    """
+    meta_description_tag = soup.find("meta", attrs={"name": "description"})
+    return {
+        "has_title": soup.title is not None,
+        "title": soup.title.string if soup.title else None,
+        "meta_description": (
+            meta_description_tag["content"]
+            if meta_description_tag and meta_description_tag.get("content")
+            else None
+        ),
+        "h1": [h1.get_text() for h1 in soup.find_all("h1")],
+        "h2": [h2.get_text() for h2 in soup.find_all("h2")],
+        "images": [
+            {"alt": img.get("alt", ""), "src": img.get("src", "")}
+            for img in soup.find_all("img")
+        ],
+        "ld_json": [
+            script.string
+            for script in soup.find_all("script", type="application/ld+json")
+        ],
+        "mobile_friendly": bool(soup.find("meta", attrs={"name": "viewport"})),
+        "social_media_links": [
+            a["href"]
+            for a in soup.find_all("a", href=True)
+            if any(
+                platform in a["href"]
+                for platform in [
+                    "facebook.com",
+                    "twitter.com",
+                    "instagram.com",
+                    "linkedin.com",
+                ]
+            )
+        ],
+        "blog": bool(
+            soup.find("section", id="blog") or soup.find("div", class_="blog")
+        ),
+        "google_maps_embed": bool(
+            soup.find("iframe", src=lambda src: src and "google.com/maps" in src)
+        ),
+        # Compared without whitespace: the collector also breaks text at blocks.
+        "text": "".join(soup.get_text().split()),
+    }
+
+
+class TestSEOSignalCollector(unittest.TestCase):
+    def test_matches_per_feature_traversals(self):
+        for name, html in DOCUMENTS.items():
+            with self.subTest(document=name):
+                soup = BeautifulSoup(html, "html.parser")
+                signals = collect_seo_signals(soup)
+                expected = reference_signals(soup)
+                actual = {key: getattr(signals, key) for key in expected}
+                actual["text"] = "".join(signals.text.split())
+                self.assertEqual(actual, expected)
+
+    def test_text_is_separated_at_block_boundaries(self):
+        soup = BeautifulSoup(
+            "<title>Shop</title><h1>Fresh<b>bread</b></h1><p>Rye</p><br>Spelt",
+            "html.parser",
+        )
+        self.assertEqual(
+            collect_seo_signals(soup).text.split(),
+            ["Shop", "Freshbread", "Rye", "Spelt"],
+        )
+
+    def test_text_collection_can_be_skipped(self):
+        soup = BeautifulSoup(DOCUMENTS["full"], "html.parser")
+        signals = collect_seo_signals(soup, collect_text=False)
+        self.assertEqual(signals.text, "")
+        self.assertEqual(signals.h1, ["Main keyword heading"])
+
+
+if __name__ == "__main__":
+    unittest.main()
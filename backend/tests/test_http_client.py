@@ -0,0 +1,137 @@
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import Mock, patch
+import requests
+from app.config import Config
+from app.services.http_client import HTTPClient, get_http_client
+
+
+class _PageHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.server.peers.append(self.client_address)
+        body = b"<html></html>"
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestHTTPClient(unittest.TestCase):
+    def setUp(self):
+        self.client = HTTPClient(
+            connect_timeout=1,
+            read_timeout=5,
+            pool_connections=4,
+            pool_maxsize=2,
+            max_retries=3,
+        )
+
+    def tearDown(self):
+        self.client.close()
+
+    def test_adapters_are_pooled_and_retrying(self):
+        adapter = self.client.session.get_adapter("https://example.com")
+        self.assertIs(adapter, self.client.session.get_adapter("http://example.com"))
+        self.assertEqual(adapter._pool_maxsize, 2)
+        self.assertTrue(adapter._pool_block)
+        self.assertEqual(adapter.max_retries.total, 3)
+        self.assertIn(503, adapter.max_retries.status_forcelist)
+
+    @patch("requests.Session.get")
+    def test_get_applies_default_timeout(self, mock_get):
+        self.client.get("http://example.com")
+        mock_get.assert_called_once_with("http://example.com", timeout=(1, 5))
+
+    @patch("requests.Session.get")
+    def test_get_allows_timeout_override(self, mock_get):
+        self.client.get("http://example.com", timeout=2)
+        mock_get.assert_called_once_with("http://example.com", timeout=2)
+
+    @patch("requests.Session.get")
+    def test_get_page_truncates_at_byte_cap(self, mock_get):
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.headers = {"Content-Type": "text/html"}
+        mock_response.iter_content.return_value = iter([b"a" * 6, b"b" * 6, b"c" * 6])
+        mock_get.return_value = mock_response
+
+        response = self.client.get_page("http://example.com", max_bytes=10)
+
+        self.assertEqual(response.content, b"a" * 6 + b"b" * 4)
+        self.assertTrue(response.truncated)
+        self.assertTrue(mock_get.call_args.kwargs["stream"])
+        mock_response.close.assert_called_once()
+
+    @patch("requests.Session.get")
+    def test_get_page_reads_small_pages_completely(self, mock_get):
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.headers = {}
+        mock_response.iter_content.return_value = iter([b"<html>", b"</html>"])
+        mock_get.return_value = mock_response
+
+        response = self.client.get_page("http://example.com", max_bytes=100)
+
+        self.assertEqual(response.content, b"<html></html>")
+        self.assertFalse(response.truncated)
+
+    def test_defaults_come_from_config(self):
+        client = HTTPClient()
+        self.addCleanup(client.close)
+
+        self.assertEqual(
+            client.timeout, (Config.HTTP_CONNECT_TIMEOUT, Config.HTTP_READ_TIMEOUT)
+        )
+        self.assertEqual(client.pool_timeout, Config.HTTP_POOL_TIMEOUT)
+        self.assertEqual(client.user_agent, Config.HTTP_USER_AGENT)
+
+    def test_exhausted_pool_times_out(self):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _PageHandler)
+        server.peers = []
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        url = f"http://127.0.0.1:{server.server_port}/"
+        client = HTTPClient(pool_maxsize=1, pool_timeout=0.1)
+        self.addCleanup(client.close)
+
+        held = client.get(url, stream=True)  # keeps the only connection checked out
+        started = time.monotonic()
+        with self.assertRaises(requests.ConnectTimeout):
+            client.get(url)
+        self.assertLess(time.monotonic() - started, 2)
+
+        held.close()
+        self.assertEqual(client.get(url).status_code, 200)
+
+    def test_status_checks_reuse_the_connection(self):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _PageHandler)
+        server.peers = []
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        url = f"http://127.0.0.1:{server.server_port}/robots.txt"
+
+        statuses = [self.client.get_status(url).status_code for _ in range(3)]
+
+        self.assertEqual(statuses, [200] * 3)
+        self.assertEqual(len(set(server.peers)), 1)
+
+    def test_cookies_are_not_persisted(self):
+        policy = self.client.session.cookies.get_policy()
+        self.assertEqual(policy.allowed_domains(), ())
+
+    def test_shared_client_is_singleton(self):
+        self.assertIs(get_http_client(), get_http_client())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -8,21 +8,22 @@ def seo_service():
     return SEOAnalysisService()
 
 
-@patch("requests.get")
+@patch("app.services.http_client.HTTPClient.get")
 def test_perform_local_seo_analysis_success(mock_get, seo_service):
     mock_get.return_value.status_code = 200
-    mock_get.return_value.content = """
+    mock_get.return_value.headers = {"Content-Type": "text/html"}
+    mock_get.return_value.iter_content.return_value = [b"""
         <html>
             <head><title>Test Title</title></head>
             <body><h1>Header 1</h1></body>
         </html>
-    """
+    """]
     result = seo_service.perform_local_seo_analysis("http://example.com")
     assert "Title" in result
     assert result["Title"] == "Test Title"
 
 
-@patch("requests.get")
+@patch("app.services.http_client.HTTPClient.get")
 def test_perform_local_seo_analysis_failure(mock_get, seo_service):
     mock_get.side_effect = Exception("Failed to fetch data")
     result = seo_service.perform_local_seo_analysis("http://example.com")
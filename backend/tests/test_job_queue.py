@@ -0,0 +1,108 @@
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+from app.services.job_queue import (
+    FAILED,
+    QUEUED,
+    RUNNING,
+    SUCCEEDED,
+    JobQueue,
+    JobStore,
+    QueueFull,
+)
+
+
+class TestJobQueue(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        self.store_path = f"{self.tmp}/jobs.sqlite3"
+        self.queue = self.job_queue()
+
+    def job_queue(self):
+        return JobQueue(
+            workers=1,
+            max_pending=2,
+            result_ttl=60,
+            store=JobStore(self.store_path),
+            poll_interval=0.01,
+        )
+
+    def test_jobs_run_in_the_background(self):
+        job = self.queue.submit(lambda x: ({"double": x * 2}, True), 21, kind="test")
+
+        finished = self.queue.get(job.id, wait=5)
+
+        self.assertEqual(finished.status, SUCCEEDED)
+        self.assertEqual(finished.to_dict()["result"], {"double": 42})
+        self.assertEqual(self.queue.stats()["succeeded"], 1)
+
+    def test_failures_are_reported(self):
+        def boom():
+            raise RuntimeError("upstream down")
+
+        failed = self.queue.get(self.queue.submit(boom).id, wait=5)
+        rejected = self.queue.get(
+            self.queue.submit(lambda: ({"error": "bad"}, False)).id, wait=5
+        )
+
+        self.assertEqual(failed.status, FAILED)
+        self.assertEqual(failed.to_dict()["error"], "upstream down")
+        self.assertEqual(rejected.status, FAILED)
+        self.assertEqual(rejected.result, {"error": "bad"})
+
+    def test_queue_is_bounded(self):
+        release = threading.Event()
+        started = threading.Event()
+
+        def blocker():
+            started.set()
+            release.wait(5)
+            return None, True
+
+        self.queue.submit(blocker)
+        self.assertTrue(started.wait(5))
+        waiting = [self.queue.submit(blocker) for _ in range(2)]
+        with self.assertRaises(QueueFull):
+            self.queue.submit(blocker)
+
+        self.assertEqual(waiting[0].to_dict()["status"], QUEUED)
+        self.assertNotIn("result", waiting[0].to_dict())
+        self.assertEqual(self.queue.stats()["rejected"], 1)
+        release.set()
+
+    def test_jobs_are_visible_to_other_worker_processes(self):
+        release = threading.Event()
+        other_worker = self.job_queue()
+
+        def blocker():
+            release.wait(5)
+            return {"done": True}, True
+
+        job = self.queue.submit(blocker, kind="test")
+        pending = other_worker.get(job.id)
+        release.set()
+        finished = other_worker.get(job.id, wait=5)
+
+        self.assertIn(pending.status, (QUEUED, RUNNING))
+        self.assertNotIn("result", pending.to_dict())
+        self.assertEqual(finished.status, SUCCEEDED)
+        self.assertEqual(finished.to_dict()["result"], {"done": True})
+        self.assertEqual(finished.to_dict()["kind"], "test")
+        self.assertIsNone(other_worker.get("unknown"))
+
+    def test_finished_jobs_expire(self):
+        job = self.queue.submit(lambda: (None, True))
+        self.queue.get(job.id, wait=5)
+
+        with patch(
+            "app.services.job_queue.time.time", return_value=job.finished_at + 61
+        ):
+            self.assertIsNone(self.queue.get(job.id))
+            self.assertIsNone(self.job_queue().get(job.id))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import datetime
+import json
+import pytest
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from app.config import Config
+from app.json_provider import OrjsonProvider, json_bytes, json_provider_class
+
+PAYLOAD = {
+    "seo_data": {"Title": "Café", "H1 Tags": ["A", "B"], "SSL": True, "Score": 0.5},
+    "checked": datetime.date(2024, 1, 2),
+    "alt": None,
+}
+
+
+def provider(cls):
+    app = Flask(__name__)
+    app.json = cls(app)
+    return app
+
+
+def test_orjson_output_matches_the_default_provider():
+    fast, default = provider(OrjsonProvider), provider(DefaultJSONProvider)
+
+    assert json.loads(fast.json.dumps(PAYLOAD)) == json.loads(
+        default.json.dumps(PAYLOAD)
+    )
+    with fast.app_context():
+        response = fast.json.response(PAYLOAD)
+    assert response.mimetype == "application/json"
+    # Keys are sorted like the default provider's.
+    assert response.data.startswith(b'{"alt":null,"checked":"Tue, 02 Jan 2024')
+    assert fast.json.loads(response.data)["seo_data"]["Title"] == "Café"
+
+
+@pytest.mark.parametrize("name", ["orjson", "stdlib"])
+def test_json_bytes_matches_the_flask_response(monkeypatch, name):
+    monkeypatch.setattr(Config, "JSON_PROVIDER", name)
+    app = provider(json_provider_class())
+    with app.app_context():
+        response = app.json.response(PAYLOAD)
+
+    assert json_bytes(PAYLOAD) + b"\n" == response.data
+
+
+def test_json_provider_class_selection(monkeypatch):
+    assert json_provider_class("stdlib") is DefaultJSONProvider
+    assert json_provider_class("orjson") is OrjsonProvider
+    monkeypatch.setattr(Config, "JSON_PROVIDER", "auto")
+    assert json_provider_class() is OrjsonProvider
+    with pytest.raises(ValueError):
+        json_provider_class("ujson")
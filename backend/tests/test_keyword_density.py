@@ -0,0 +1,93 @@
+import random
+import unittest
+from bs4 import BeautifulSoup
+from app.services.keyword_density import (
+    KeywordMatcher,
+    analyze_keywords,
+    keyword_density,
+    tokenize,
+)
+from app.services.seo_analysis_service import SEOAnalysisService
+
+
+def naive_count(tokens, phrase):
+    n = len(phrase)
+    return sum(tokens[i : i + n] == phrase for i in range(len(tokens) - n + 1))
+
+
+class TestKeywordMatcher(unittest.TestCase):
+    def test_counts_whole_words_and_phrases(self):
+        tokens = tokenize("Party art: ART-deco art, smart art. Sea shells by the sea!")
+        matcher = KeywordMatcher(["art", "sea", "sea shells", "art deco", "art-deco"])
+        self.assertEqual(matcher.count(tokens), [3, 2, 1, 0, 1])
+
+    def test_overlapping_keywords_match_like_a_naive_scan(self):
+        rng = random.Random(7)
+        vocabulary = ["a", "b", "c", "d"]
+        keywords = [
+            " ".join(rng.choice(vocabulary) for _ in range(rng.randint(1, 4)))
+            for _ in range(40)
+        ]
+        tokens = [rng.choice(vocabulary) for _ in range(2000)]
+
+        matcher = KeywordMatcher(keywords)
+        expected = [naive_count(tokens, tokenize(k)) for k in matcher.keywords]
+        self.assertEqual(matcher.count(tokens), expected)
+
+    def test_keywords_without_words_never_match(self):
+        matcher = KeywordMatcher(["", "--"])
+        self.assertEqual(matcher.count(tokenize("a b c")), [0, 0])
+
+
+class TestAnalyzeKeywords(unittest.TestCase):
+    def test_reports_counts_density_and_positions(self):
+        result = analyze_keywords(
+            ["bread", "sourdough bread"],
+            "Bread shop. Fresh sourdough bread baked daily.",
+            title="Bread shop",
+            h1=["Sourdough", "bread"],
+        )
+        self.assertEqual(
+            result["bread"],
+            {
+                "count": 2,
+                "density": 28.57,
+                "positions": {"title": 1, "h1": 1, "body": 2},
+            },
+        )
+        # Phrases never span two headings
+        self.assertEqual(result["sourdough bread"]["positions"]["h1"], 0)
+        self.assertEqual(result["sourdough bread"]["density"], 28.57)
+
+    def test_single_keyword_density(self):
+        self.assertEqual(keyword_density("test keyword test keyword", "keyword"), 50.0)
+        self.assertEqual(keyword_density("", "keyword"), 0)
+
+
+class TestKeywordAnalysisField(unittest.TestCase):
+    def test_extract_seo_elements_analyzes_many_keywords(self):
+        soup = BeautifulSoup(
+            "<html><head><title>Vegan bakery</title></head>"
+            "<body><h1>Vegan bread</h1><p>Gluten free vegan cakes.</p></body></html>",
+            "html.parser",
+        )
+        result = SEOAnalysisService().extract_seo_elements(
+            soup,
+            "https://example.com",
+            "vegan",
+            fields=["keyword_density", "keyword_analysis"],
+            keywords=["gluten free", "rye"],
+        )
+
+        analysis = result["Keyword Analysis"]
+        self.assertEqual(list(analysis), ["vegan", "gluten free", "rye"])
+        self.assertEqual(
+            analysis["vegan"]["positions"], {"title": 1, "h1": 1, "body": 3}
+        )
+        self.assertEqual(analysis["gluten free"]["count"], 1)
+        self.assertEqual(analysis["rye"]["count"], 0)
+        self.assertEqual(result["Keyword Density"], analysis["vegan"]["density"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+import shutil
+import tempfile
+import unittest
+from unittest.mock import Mock, patch
+from app.services.llm_cache import LLMCache, parse_ttls
+from app.services.perplexity_service import PerplexityService
+
+COMPLETION = {"choices": [{"message": {"content": "Insight 1\n\nInsight 2"}}]}
+
+
+class TestLLMCache(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.db_path = f"{self.cache_dir}/llm.sqlite3"
+        self.cache = LLMCache(db_path=self.db_path, default_ttl=60)
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def test_key_depends_on_model_messages_and_max_tokens(self):
+        messages = [{"role": "user", "content": "prompt"}]
+        self.assertEqual(self.cache.key("m", messages), self.cache.key("m", messages))
+        self.assertNotEqual(
+            self.cache.key("m", messages), self.cache.key("other", messages)
+        )
+        self.assertNotEqual(
+            self.cache.key("m", messages, 600), self.cache.key("m", messages, 1200)
+        )
+
+    def test_entries_expire_per_prompt_type(self):
+        self.cache.ttls = {"technical_seo_audit": 10}
+        self.cache.set("audit", COMPLETION, "technical_seo_audit", now=1000)
+        self.cache.set("other", COMPLETION, "content_gap_analysis", now=1000)
+
+        self.assertEqual(self.cache.get("audit", now=1005), COMPLETION)
+        self.assertIsNone(self.cache.get("audit", now=1011))
+        self.assertEqual(self.cache.get("other", now=1059), COMPLETION)
+
+    def test_entries_survive_in_sqlite(self):
+        self.cache.set("key", COMPLETION)
+
+        reopened = LLMCache(db_path=self.db_path)
+        self.assertEqual(reopened.get("key"), COMPLETION)
+        self.assertEqual(reopened.stats()["db_hits"], 1)
+
+    def test_store_is_size_bounded(self):
+        self.cache.max_bytes = 200
+        for n in range(3):
+            self.cache.set(f"key{n}", {"choices": ["x" * 80]}, now=1000 + n)
+
+        stats = self.cache.stats()
+        self.assertLessEqual(stats["db_bytes"], 200)
+        self.assertEqual(stats["evictions"], 1)
+        self.cache._memory.clear()
+        self.assertIsNone(self.cache.get("key0", now=1010))
+        self.assertIsNotNone(self.cache.get("key2", now=1010))
+
+    def test_parse_ttls(self):
+        self.assertEqual(
+            parse_ttls("technical_seo_audit=3600, backlink_strategy=60,"),
+            {"technical_seo_audit": 3600.0, "backlink_strategy": 60.0},
+        )
+
+
+class TestPerplexityServiceCaching(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.service = PerplexityService(
+            llm_cache=LLMCache(db_path=f"{self.cache_dir}/llm.sqlite3")
+        )
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    @patch("requests.post")
+    def test_identical_prompts_are_answered_from_cache(self, mock_post):
+        mock_post.return_value = Mock(
+            status_code=200, **{"json.return_value": COMPLETION}
+        )
+
+        first = self.service.query_perplexity(
+            "prompt", prompt_type="content_gap_analysis"
+        )
+        second = self.service.query_perplexity(
+            "prompt", prompt_type="content_gap_analysis"
+        )
+
+        self.assertEqual(first, second)
+        self.assertEqual(len(first["actionable_insights"]), 2)
+        mock_post.assert_called_once()
+
+    @patch("requests.post")
+    def test_bypass_refreshes_the_cached_completion(self, mock_post):
+        mock_post.return_value = Mock(
+            status_code=200, **{"json.return_value": COMPLETION}
+        )
+
+        self.service.query_perplexity("prompt")
+        self.service.query_perplexity("prompt", bypass_cache=True)
+
+        self.assertEqual(mock_post.call_count, 2)
+        self.assertEqual(self.service.llm_cache.stats()["bypasses"], 1)
+
+    @patch("requests.post")
+    def test_errors_are_not_cached(self, mock_post):
+        mock_post.return_value = Mock(status_code=500, text="Internal Server Error")
+
+        self.service.query_perplexity("prompt")
+        self.service.query_perplexity("prompt")
+
+        self.assertEqual(mock_post.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import unittest
+from unittest.mock import Mock
+from app.services.origin_metadata_cache import OriginMetadataCache, normalize_origin
+
+
+def make_response(status_code, headers=None):
+    response = Mock()
+    response.status_code = status_code
+    response.headers = headers or {}
+    return response
+
+
+class TestNormalizeOrigin(unittest.TestCase):
+    def test_normalizes_scheme_host_and_default_port(self):
+        self.assertEqual(
+            normalize_origin("HTTPS://User:pw@Example.COM:443/blog/post?x=1#top"),
+            "https://example.com",
+        )
+        self.assertEqual(
+            normalize_origin("http://example.com:8080/a"), "http://example.com:8080"
+        )
+
+    def test_rejects_url_without_host(self):
+        with self.assertRaises(ValueError):
+            normalize_origin("not-a-url")
+
+
+class TestOriginMetadataCache(unittest.TestCase):
+    def setUp(self):
+        self.http_client = Mock()
+        self.cache = OriginMetadataCache(
+            http_client=self.http_client, ttl=3600, negative_ttl=600
+        )
+
+    def test_pages_of_one_origin_share_a_single_fetch(self):
+        self.http_client.get_status.return_value = make_response(200)
+
+        first = self.cache.lookup("https://example.com/a", "robots.txt")
+        second = self.cache.lookup("https://EXAMPLE.com/b/c?d=1", "robots.txt")
+
+        self.assertEqual(first, second)
+        self.assertEqual(first["url"], "https://example.com/robots.txt")
+        self.assertTrue(first["found"])
+        self.http_client.get_status.assert_called_once()
+
+    def test_missing_resources_are_negatively_cached(self):
+        self.http_client.get_status.return_value = make_response(404)
+
+        result = self.cache.lookup("https://example.com", "sitemap.xml")
+        self.cache.lookup("https://example.com", "sitemap.xml")
+
+        self.assertFalse(result["found"])
+        self.assertEqual(result["status_code"], 404)
+        self.http_client.get_status.assert_called_once()
+
+    def test_expired_entries_are_revalidated_conditionally(self):
+        self.cache.ttl = 0
+        self.http_client.get_status.side_effect = [
+            make_response(
+                200,
+                {"ETag": '"abc"', "Last-Modified": "Wed, 21 Oct 2015 07:28:00 GMT"},
+            ),
+            make_response(304),
+        ]
+
+        self.cache.lookup("https://example.com", "sitemap.xml")
+        result = self.cache.lookup("https://example.com", "sitemap.xml")
+
+        self.assertTrue(result["found"])
+        headers = self.http_client.get_status.call_args.kwargs["headers"]
+        self.assertEqual(headers["If-None-Match"], '"abc"')
+        self.assertEqual(headers["If-Modified-Since"], "Wed, 21 Oct 2015 07:28:00 GMT")
+
+    def test_transport_errors_are_not_cached(self):
+        self.http_client.get_status.side_effect = [
+            Exception("timed out"),
+            make_response(200),
+        ]
+
+        failed = self.cache.lookup("https://example.com", "robots.txt")
+        recovered = self.cache.lookup("https://example.com", "robots.txt")
+
+        self.assertEqual(failed["error"], "timed out")
+        self.assertTrue(recovered["found"])
+
+    def test_evicts_least_recently_used_origin(self):
+        self.cache.max_entries = 1
+        self.http_client.get_status.return_value = make_response(200)
+
+        self.cache.lookup("https://a.example", "robots.txt")
+        self.cache.lookup("https://b.example", "robots.txt")
+        self.cache.lookup("https://a.example", "robots.txt")
+
+        self.assertEqual(self.http_client.get_status.call_count, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
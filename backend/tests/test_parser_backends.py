@@ -0,0 +1,128 @@
+import json
+import unittest
+from unittest.mock import Mock, patch
+from app.services.local_seo_analyis_service import LocalSEOAnalysisService
+from app.services.parser_backends import PARSER_BACKENDS, parse_html
+from app.services.seo_analysis_service import SEOAnalysisService
+
+LOCAL_BUSINESS = {
+    "@context": "https://schema.org",
+    "@type": "LocalBusiness",
+    "name": "Corner Bakery",
+    "address": {"streetAddress": "1 Main St", "addressLocality": "Springfield"},
+}
+
+# Conforming documents. Backends only disagree on how they recover from broken
+# markup (e.g. nested <h1> elements) and on markup inside <title>, which the
+# standard library parser reads as tags rather than text, so this corpus
+# deliberately avoids both.
+CORPUS = {
+    "minimal": b"<!DOCTYPE html><html><head><title>Home</title></head><body></body></html>",
+    "no_head": b"<p>Just a fragment with a keyword</p>",
+    "local_business": f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+  <meta charset="utf-8">
+  <meta name="viewport" content="width=device-width, initial-scale=1">
+  <title>Corner Bakery &amp; Café – Springfield</title>
+  <meta name="description" content="Fresh bread baked daily in Springfield.">
+  <script type="application/ld+json">{json.dumps(LOCAL_BUSINESS)}</script>
+  <script type="application/ld+json">[{json.dumps(LOCAL_BUSINESS)}]</script>
+  <script>window.dataLayer = ["bread bread bread"];</script>
+  <style>.bread {{ color: brown }}</style>
+</head>
+<body class="home page">
+  <!-- bread in a comment is not page text -->
+  <header><h1>Corner <em>Bakery</em></h1></header>
+  <main>
+    <h2>Our bread</h2>
+    <p>We bake bread every morning.</p>
+    <img src="/img/loaf.jpg" alt="A sourdough loaf">
+    <img src="/img/shop.jpg">
+    <img src="/img/spacer.gif" alt>
+    <h2>Visit us</h2>
+    <iframe src="https://www.google.com/maps/embed?pb=bakery" width="600"></iframe>
+    <section id="blog"><h2>From the blog</h2><p>Bread tips.</p></section>
+  </main>
+  <footer>
+    <a href="https://www.facebook.com/cornerbakery">Facebook</a>
+    <a href="https://instagram.com/cornerbakery">Instagram</a>
+    <a href="/contact">Contact</a>
+    <a href>Empty link</a>
+  </footer>
+</body>
+</html>
+""".encode(
+        "utf-8"
+    ),
+    "legacy_encoding": (
+        "<html><head><meta http-equiv='Content-Type' "
+        "content='text/html; charset=iso-8859-1'>"
+        "<TITLE>Café résumé</TITLE>"
+        "<META NAME='description' CONTENT='Crème brûlée'></head>"
+        "<BODY><H1>Menü</H1><DIV CLASS='post blog'>café café</DIV>"
+        "<A HREF='https://twitter.com/cafe'>Twitter</A></BODY></html>"
+    ).encode("iso-8859-1"),
+    "no_metadata": b"""<html><head><title></title>
+<meta name="description"></head>
+<body><div class="blogroll">keyword text</div><h1></h1>
+<iframe src="https://example.com/embed"></iframe></body></html>""",
+}
+
+
+class TestParserBackendParity(unittest.TestCase):
+    def setUp(self):
+        self.seo_service = SEOAnalysisService()
+        self.local_service = LocalSEOAnalysisService()
+        origin_checks = {"sitemap": "sitemap", "robots_txt": "robots"}
+        self.origin_checks = {
+            key: Mock(**{"result.return_value": value})
+            for key, value in origin_checks.items()
+        }
+
+    def extract(self, backend, html, keyword):
+        document = parse_html(html, backend)
+        seo = self.seo_service.extract_seo_elements(
+            document,
+            "https://example.com",
+            keyword,
+            origin_checks=self.origin_checks,
+        )
+        local = self.local_service.extract_local_seo_elements(
+            document, "https://example.com", "Springfield", keyword
+        )
+        return seo, local
+
+    def test_backends_extract_identical_elements(self):
+        for name, html in CORPUS.items():
+            for keyword in (None, "bread", "café"):
+                expected = self.extract("html.parser", html, keyword)
+                for backend in PARSER_BACKENDS[1:]:
+                    with self.subTest(document=name, keyword=keyword, backend=backend):
+                        self.assertEqual(self.extract(backend, html, keyword), expected)
+
+    def test_corpus_exercises_every_signal(self):
+        seo, local = self.extract("html.parser", CORPUS["local_business"], "bread")
+        self.assertEqual(seo["Title"], "Corner Bakery & Café – Springfield")
+        self.assertEqual(seo["H1 Tags"], ["Corner Bakery"])
+        self.assertEqual(len(seo["H2 Tags"]), 3)
+        self.assertEqual(len(seo["Local Business Schemas"]), 2)
+        self.assertEqual(len(seo["Social Media Links"]), 2)
+        self.assertTrue(seo["Blog"] and seo["Google Maps Embed"])
+        self.assertTrue(seo["Mobile Friendly"])
+        self.assertGreater(seo["Keyword Density"], 0)
+        self.assertEqual(local["Local Business Schemas"], [LOCAL_BUSINESS])
+
+    def test_unknown_backend_is_rejected(self):
+        with self.assertRaises(ValueError):
+            parse_html(b"<html></html>", "regex")
+
+    def test_service_uses_configured_backend(self):
+        service = SEOAnalysisService(parser_backend="selectolax")
+        self.assertEqual(service.parser_backend, "selectolax")
+        with patch("app.config.Config.HTML_PARSER_BACKEND", "lxml"):
+            self.assertEqual(LocalSEOAnalysisService().parser_backend, "lxml")
+
+
+if __name__ == "__main__":
+    unittest.main()
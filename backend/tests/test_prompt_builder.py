@@ -0,0 +1,53 @@
+import unittest
+from app.services.prompt_builder import PromptBuilder, estimate_tokens
+
+SEO_DATA = {
+    "Title": "Corner   Bakery",
+    "Meta Description": "Fresh bread baked daily.",
+    "H2 Tags": [f"Section {n}" for n in range(40)],
+    "Alt Texts and Image Info": [
+        {"src": f"/img/{n}.jpg", "alt": f"Loaf {n}"} for n in range(40)
+    ],
+    "Mobile Friendly": True,
+    "Keyword Density": "N/A",
+    "Page Truncated": False,
+}
+
+
+class TestPromptBuilder(unittest.TestCase):
+    def test_signals_are_compact_and_deterministic(self):
+        builder = PromptBuilder(token_budget=1000)
+
+        signals = builder.serialize(SEO_DATA)
+
+        self.assertEqual(signals, builder.serialize(dict(SEO_DATA)))
+        lines = signals.splitlines()
+        self.assertEqual(lines[0], "Title: Corner Bakery")
+        self.assertTrue(lines[2].endswith("Section 9 (+30 more)"))
+        self.assertIn('{"alt":"Loaf 0","src":"/img/0.jpg"}', lines[3])
+        self.assertEqual(lines[4], "Mobile Friendly: yes")
+        self.assertNotIn("Keyword Density", signals)
+        self.assertNotIn("Page Truncated", signals)
+
+    def test_lists_shrink_to_fit_the_budget(self):
+        for budget in (120, 60, 20):
+            signals = PromptBuilder(token_budget=budget).serialize(SEO_DATA)
+            self.assertLessEqual(estimate_tokens(signals), budget)
+            self.assertTrue(signals.startswith("Title: Corner Bakery"))
+        self.assertIn(
+            "Section 0 (+39 more)", PromptBuilder(token_budget=60).serialize(SEO_DATA)
+        )
+
+    def test_prompt_bounds_the_completion(self):
+        builder = PromptBuilder(token_budget=200, max_insights=3)
+
+        prompt = builder.build("Audit the page.", {"Title": "T"})
+
+        self.assertTrue(prompt.startswith("Audit the page.\n\n"))
+        self.assertIn("Title: T", prompt)
+        self.assertIn("at most 3 recommendations", prompt)
+        self.assertEqual(builder.build("Audit the page.", None), "Audit the page.")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,201 @@
+import asyncio
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest.mock import Mock, patch
+from app.services.llm_cache import LLMCache
+from app.services.perplexity_service import PerplexityService
+from app.services.rate_limiter import (
+    AdaptiveConcurrencyLimit,
+    RateLimitExceeded,
+    TokenBucket,
+    UpstreamLimiter,
+    retry_delay,
+)
+
+COMPLETION = {"choices": [{"message": {"content": "Insight"}}]}
+
+
+def api_response(status_code, retry_after=None):
+    response = Mock(status_code=status_code, text="busy")
+    response.headers = {"Retry-After": retry_after} if retry_after else {}
+    response.json.return_value = COMPLETION
+    return response
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_burst_then_refill_rate(self):
+        bucket = TokenBucket(rate=10, capacity=2)
+
+        self.assertEqual(bucket.try_acquire(), 0.0)
+        self.assertEqual(bucket.try_acquire(), 0.0)
+        self.assertAlmostEqual(bucket.try_acquire(), 0.1, places=2)
+        self.assertFalse(bucket.acquire(timeout=0))
+
+    def test_tokens_are_shared_between_threads(self):
+        bucket = TokenBucket(rate=0.001, capacity=5)
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(bucket.acquire(timeout=0)))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results.count(True), 5)
+
+
+class TestAdaptiveConcurrencyLimit(unittest.TestCase):
+    def test_additive_increase_multiplicative_decrease(self):
+        limit = AdaptiveConcurrencyLimit(initial_limit=4, max_limit=8, latency_target=1)
+
+        for _ in range(4):
+            limit.acquire()
+            limit.release(latency=0.1)
+        self.assertAlmostEqual(limit.limit, 4.9, places=1)
+
+        limit.acquire()
+        limit.release(latency=0.1, overloaded=True)
+        self.assertAlmostEqual(limit.limit, 2.45, places=1)
+
+        limit.acquire()
+        limit.release(latency=5)
+        self.assertAlmostEqual(limit.limit, 1.2, places=1)
+
+    def test_limit_bounds_in_flight_requests(self):
+        limit = AdaptiveConcurrencyLimit(initial_limit=1)
+
+        self.assertTrue(limit.acquire(timeout=0))
+        self.assertFalse(limit.acquire(timeout=0.01))
+        limit.release(latency=0)
+        self.assertTrue(limit.acquire(timeout=0))
+
+
+class TestUpstreamLimiter(unittest.TestCase):
+    def test_stats_report_limit_and_queue_depth(self):
+        limiter = UpstreamLimiter(
+            requests_per_minute=600, burst=5, initial_concurrency=2, queue_timeout=1
+        )
+
+        with limiter.slot() as slot:
+            slot.report(429)
+            stats = limiter.stats()
+            self.assertEqual(stats["in_flight"], 1)
+            self.assertEqual(stats["queue_depth"], 0)
+
+        stats = limiter.stats()
+        self.assertEqual(stats["concurrency_limit"], 1)
+        self.assertEqual(stats["throttled"], 1)
+        self.assertEqual(stats["requests"], 1)
+
+    def test_waiting_past_the_queue_timeout_is_rejected(self):
+        limiter = UpstreamLimiter(
+            requests_per_minute=600, burst=5, initial_concurrency=1, queue_timeout=0.01
+        )
+
+        with limiter.slot():
+            with self.assertRaises(RateLimitExceeded):
+                with limiter.slot():
+                    pass
+        self.assertEqual(limiter.stats()["rejected"], 1)
+
+    def test_rate_limited_rejections_leave_the_limit_alone(self):
+        limiter = UpstreamLimiter(
+            requests_per_minute=60, burst=1, initial_concurrency=2, queue_timeout=0.01
+        )
+
+        async def take_slot():
+            async with limiter.async_slot():
+                pass
+
+        with limiter.slot() as slot:
+            slot.report(200)
+        limit = limiter.stats()["concurrency_limit"]
+        for _ in range(3):
+            with self.assertRaises(RateLimitExceeded):
+                with limiter.slot():
+                    pass
+            with self.assertRaises(RateLimitExceeded):
+                asyncio.run(take_slot())
+
+        stats = limiter.stats()
+        self.assertEqual(stats["concurrency_limit"], limit)
+        self.assertEqual((stats["rejected"], stats["in_flight"]), (6, 0))
+
+    def test_async_slots_share_the_limits(self):
+        limiter = UpstreamLimiter(
+            requests_per_minute=600, burst=5, initial_concurrency=1, queue_timeout=0.05
+        )
+
+        async def take_slot():
+            async with limiter.async_slot() as slot:
+                slot.report(200)
+
+        with limiter.slot():
+            with self.assertRaises(RateLimitExceeded):
+                asyncio.run(take_slot())
+        asyncio.run(take_slot())
+
+        stats = limiter.stats()
+        self.assertEqual((stats["requests"], stats["rejected"]), (2, 1))
+        self.assertEqual((stats["in_flight"], stats["queue_depth"]), (0, 0))
+
+    def test_retry_after_wins_over_backoff(self):
+        self.assertEqual(retry_delay(0, 0.5, "7"), 7.0)
+        self.assertLessEqual(retry_delay(3, 0.5), 4.0)
+        self.assertLessEqual(retry_delay(0, 0.5, "soon"), 0.5)
+
+
+class TestPerplexityRetries(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.limiter = UpstreamLimiter(requests_per_minute=6000, burst=100)
+        self.service = PerplexityService(
+            llm_cache=LLMCache(db_path=f"{self.cache_dir}/llm.sqlite3"),
+            limiter=self.limiter,
+        )
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    @patch("app.services.perplexity_service.time.sleep")
+    @patch("requests.post")
+    def test_throttled_requests_are_retried(self, mock_post, mock_sleep):
+        mock_post.side_effect = [
+            api_response(429, retry_after="2"),
+            api_response(503),
+            api_response(200),
+        ]
+
+        result = self.service.query_perplexity("prompt")
+
+        self.assertEqual(result, {"actionable_insights": [{"insight": "Insight"}]})
+        self.assertEqual(mock_post.call_count, 3)
+        self.assertEqual(mock_sleep.call_args_list[0].args, (2.0,))
+        self.assertEqual(self.limiter.stats()["retries"], 2)
+
+    @patch("app.services.perplexity_service.time.sleep")
+    @patch("requests.post")
+    def test_retries_are_bounded(self, mock_post, mock_sleep):
+        mock_post.return_value = api_response(429)
+        self.service.max_retries = 2
+
+        result = self.service.query_perplexity("prompt")
+
+        self.assertIn("429", result["error"])
+        self.assertEqual(mock_post.call_count, 3)
+
+    @patch("requests.post")
+    def test_client_errors_are_not_retried(self, mock_post):
+        mock_post.return_value = api_response(400)
+
+        self.service.query_perplexity("prompt")
+
+        mock_post.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
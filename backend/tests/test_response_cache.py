@@ -0,0 +1,153 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from email.utils import formatdate
+from unittest.mock import Mock, patch
+from requests.structures import CaseInsensitiveDict
+from app.services.response_cache import ResponseCache, freshness_lifetime
+
+
+def make_response(status_code=200, headers=None, content=b"<html></html>"):
+    response = Mock()
+    response.status_code = status_code
+    response.headers = CaseInsensitiveDict(headers or {})
+    response.content = content
+    response.truncated = False
+    return response
+
+
+class TestFreshnessLifetime(unittest.TestCase):
+    def test_max_age_wins_and_subtracts_age(self):
+        headers = {"Cache-Control": "public, max-age=600", "Age": "100"}
+        self.assertEqual(freshness_lifetime(headers), 500)
+
+    def test_no_store_is_not_storable(self):
+        self.assertIsNone(freshness_lifetime({"Cache-Control": "no-store"}))
+
+    def test_no_cache_requires_revalidation(self):
+        self.assertEqual(freshness_lifetime({"Cache-Control": "no-cache"}), 0)
+
+    def test_expires_relative_to_date(self):
+        now = time.time()
+        headers = {
+            "Date": formatdate(now, usegmt=True),
+            "Expires": formatdate(now + 120, usegmt=True),
+        }
+        self.assertAlmostEqual(freshness_lifetime(headers, now), 120, delta=1)
+
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.cache = ResponseCache(cache_dir=self.cache_dir, memory_entries=2)
+        self.http_client = Mock()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def test_fresh_response_is_served_from_cache(self):
+        self.http_client.get_page.return_value = make_response(
+            headers={"Cache-Control": "max-age=300"}, content=b"<html>hi</html>"
+        )
+
+        self.cache.fetch("https://example.com", self.http_client)
+        cached = self.cache.fetch("https://example.com", self.http_client)
+
+        self.assertEqual(cached.content, b"<html>hi</html>")
+        self.assertTrue(cached.from_cache)
+        self.http_client.get_page.assert_called_once()
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+
+    def test_equivalent_urls_share_an_entry(self):
+        self.http_client.get_page.return_value = make_response(
+            headers={"Cache-Control": "max-age=300"}, content=b"<html>hi</html>"
+        )
+
+        self.cache.fetch("HTTPS://Example.com:443", self.http_client)
+        cached = self.cache.fetch("https://example.com/#top", self.http_client)
+
+        self.assertTrue(cached.from_cache)
+        self.http_client.get_page.assert_called_once()
+
+    def test_stale_response_is_revalidated_with_validators(self):
+        self.http_client.get_page.side_effect = [
+            make_response(
+                headers={"Cache-Control": "no-cache", "ETag": '"v1"'},
+                content=b"<html>v1</html>",
+            ),
+            make_response(status_code=304),
+        ]
+
+        self.cache.fetch("https://example.com", self.http_client)
+        revalidated = self.cache.fetch("https://example.com", self.http_client)
+
+        self.assertEqual(revalidated.content, b"<html>v1</html>")
+        self.assertEqual(
+            self.http_client.get_page.call_args.kwargs["headers"],
+            {"If-None-Match": '"v1"'},
+        )
+        self.assertEqual(self.cache.stats()["revalidations"], 1)
+
+    def test_uncacheable_responses_are_not_stored(self):
+        self.http_client.get_page.return_value = make_response(
+            headers={"Cache-Control": "no-store", "ETag": '"v1"'}
+        )
+
+        self.cache.fetch("https://example.com", self.http_client)
+        self.cache.fetch("https://example.com", self.http_client)
+
+        self.assertEqual(self.http_client.get_page.call_count, 2)
+        self.assertEqual(self.cache.stats()["stores"], 0)
+
+    def test_entries_survive_in_the_disk_store(self):
+        self.http_client.get_page.return_value = make_response(
+            headers={"Cache-Control": "max-age=300"}, content=b"<html>disk</html>"
+        )
+        self.cache.fetch("https://example.com", self.http_client)
+
+        reopened = ResponseCache(cache_dir=self.cache_dir)
+        cached = reopened.fetch("https://example.com", self.http_client)
+
+        self.assertEqual(cached.content, b"<html>disk</html>")
+        self.assertEqual(reopened.stats()["disk_hits"], 1)
+        self.http_client.get_page.assert_called_once()
+
+    def test_disk_store_is_size_bounded(self):
+        self.cache.max_disk_bytes = 1500
+        self.http_client.get_page.return_value = make_response(
+            headers={"Cache-Control": "max-age=300"}, content=b"x" * 1000
+        )
+
+        self.cache.fetch("https://example.com/a", self.http_client)
+        self.cache.fetch("https://example.com/b", self.http_client)
+
+        stats = self.cache.stats()
+        self.assertEqual(stats["evictions"], 1)
+        self.assertLessEqual(stats["disk_bytes"], 1500)
+        self.assertIsNone(self.cache.lookup("https://example.com/a"))
+
+    @patch("app.services.response_cache.DISK_RESCAN_INTERVAL", 0)
+    def test_disk_bound_covers_entries_from_other_workers(self):
+        other = ResponseCache(cache_dir=self.cache_dir, max_disk_bytes=2500)
+        self.cache.max_disk_bytes = 2500
+        self.http_client.get_page.return_value = make_response(
+            headers={"Cache-Control": "max-age=300"}, content=b"x" * 1000
+        )
+        past = time.time() - 60
+
+        self.cache.fetch("https://example.com/a", self.http_client)
+        path = self.cache._path(self.cache._key("https://example.com/a"))
+        os.utime(path, (past, past))
+        other.fetch("https://example.com/b", self.http_client)
+        self.cache.fetch("https://example.com/c", self.http_client)
+
+        self.assertFalse(os.path.exists(path))
+        self.assertEqual(self.cache.stats()["evictions"], 1)
+        self.assertLessEqual(self.cache.stats()["disk_bytes"], 2500)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import gzip
+import pytest
+from flask import Flask, Response, jsonify
+from app.middleware.response_encoding_middleware import (
+    ResponseEncoder,
+    ResponseEncodingMiddleware,
+    negotiate_encoding,
+)
+
+LARGE = {"seo_data": {"H2 Tags": ["Section heading"] * 200}}
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.wsgi_app = ResponseEncodingMiddleware(
+        app.wsgi_app, ResponseEncoder(enabled=True, min_size=1024, etags=True)
+    )
+
+    @app.route("/large", methods=["GET", "POST"])
+    def large():
+        return jsonify(LARGE)
+
+    @app.route("/small")
+    def small():
+        return jsonify({"ok": True})
+
+    @app.route("/stream")
+    def stream():
+        return Response(iter([b'{"a": 1}\n'] * 200), mimetype="application/x-ndjson")
+
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def test_large_json_is_gzipped_when_accepted(client):
+    plain = client.get("/large")
+    compressed = client.get("/large", headers={"Accept-Encoding": "gzip, br;q=0.5"})
+
+    assert plain.headers.get("Content-Encoding") is None
+    assert plain.headers["Vary"] == "Accept-Encoding"
+    assert compressed.headers["Content-Encoding"] == "gzip"
+    assert int(compressed.headers["Content-Length"]) < len(plain.data) / 10
+    assert gzip.decompress(compressed.data) == plain.data
+
+
+def test_small_and_streamed_responses_are_sent_as_is(client):
+    small = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    stream = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+
+    assert small.headers.get("Content-Encoding") is None
+    assert small.get_json() == {"ok": True}
+    assert stream.headers.get("Content-Encoding") is None
+    assert "ETag" not in stream.headers
+    assert len(stream.data.splitlines()) == 200
+
+
+def test_matching_etag_returns_304(client):
+    first = client.get("/large", headers={"Accept-Encoding": "gzip"})
+    repeat = client.get(
+        "/large",
+        headers={"Accept-Encoding": "gzip", "If-None-Match": first.headers["ETag"]},
+    )
+    assert repeat.status_code == 304
+    assert repeat.data == b""
+    assert repeat.headers["ETag"] == first.headers["ETag"]
+
+    # Unsafe methods get no validator, so If-None-Match never turns into a 304.
+    posted = client.post("/large", headers={"If-None-Match": first.headers["ETag"]})
+    assert posted.status_code == 200
+    assert "ETag" not in posted.headers
+
+    # Each coding is a distinct representation with its own validator.
+    gzipped = client.get("/large", headers={"Accept-Encoding": "gzip"})
+    plain = client.get("/large", headers={"If-None-Match": gzipped.headers["ETag"]})
+    assert plain.status_code == 200
+    assert plain.headers["ETag"] != gzipped.headers["ETag"]
+
+
+def test_apps_that_start_the_response_lazily_are_passed_through():
+    def lazy_app(environ, start_response):
+        write = start_response("200 OK", [("Content-Type", "text/plain")])
+        write(b"written ")
+        yield b"yielded"
+
+    status_headers = []
+    middleware = ResponseEncodingMiddleware(lazy_app, ResponseEncoder(enabled=True))
+    body = middleware(
+        {"REQUEST_METHOD": "GET"},
+        lambda status, headers, exc_info=None: status_headers.append(status),
+    )
+
+    assert b"".join(body) == b"written yielded"
+    assert status_headers == ["200 OK"]
+
+def test_negotiate_encoding_honours_q_values():
+    assert negotiate_encoding("gzip") == "gzip"
+    assert negotiate_encoding("*") in ("br", "gzip")
+    assert negotiate_encoding("gzip;q=0") is None
+    assert negotiate_encoding("identity") is None
+    assert negotiate_encoding(None) is None
@@ -3,6 +3,7 @@ from flask import Flask
 from flask_restx import Api
 from unittest.mock import patch
 from app.routes.seo_routes import seo_ns
+from app.services.seo_fields import ROUTE_FIELDS
 
 
 @pytest.fixture
@@ -59,3 +60,242 @@ def test_analyze_perplexity_failure(mock_perplexity, mock_seo_analysis, client):
     )
     assert response.status_code == 500
     assert "error" in response.get_json()
+
+
+def test_metrics_reports_response_cache_counters(client):
+    response = client.get("/seo/metrics")
+    assert response.status_code == 200
+    stats = response.get_json()["response_cache"]
+    assert {"hits", "misses", "revalidations", "evictions"} <= set(stats)
+    metrics = response.get_json()
+    assert {"concurrency_limit", "queue_depth"} <= set(metrics["perplexity_limiter"])
+    assert "perplexity_usage" in metrics
+
+
+@patch(
+    "app.services.seo_analysis_service.SEOAnalysisService.perform_local_seo_analysis"
+)
+@patch("app.services.perplexity_service.PerplexityService.query_perplexity")
+def test_analysis_routes_compute_only_the_fields_they_need(
+    mock_perplexity, mock_seo_analysis, client
+):
+    mock_seo_analysis.return_value = {"Title": "T"}
+    mock_perplexity.return_value = {"actionable_insights": []}
+
+    client.post("/seo/analyze/backlink-strategy", json={"url": "http://example.com"})
+    assert (
+        mock_seo_analysis.call_args.kwargs["fields"]
+        == ROUTE_FIELDS["backlink-strategy"]
+    )
+    assert "sitemap" not in mock_seo_analysis.call_args.kwargs["fields"]
+
+    client.post(
+        "/seo/analyze/local-seo",
+        json={"url": "http://example.org", "location": "Here", "fields": ["title"]},
+    )
+    assert mock_seo_analysis.call_args.kwargs["fields"] == ["title"]
+
+
+@patch(
+    "app.services.seo_analysis_service.SEOAnalysisService.perform_local_seo_analysis"
+)
+@patch("app.services.perplexity_service.PerplexityService.query_perplexity")
+def test_no_cache_header_bypasses_llm_cache(mock_perplexity, mock_seo_analysis, client):
+    mock_seo_analysis.return_value = {"Title": "T"}
+    mock_perplexity.return_value = {"actionable_insights": []}
+
+    client.post(
+        "/seo/analyze/technical-seo",
+        json={"url": "http://example.com"},
+        headers={"Cache-Control": "no-cache"},
+    )
+
+    assert mock_perplexity.call_args.kwargs == {
+        "prompt_type": "technical_seo_audit",
+        "bypass_cache": True,
+        "route": "/seo/analyze/technical-seo",
+    }
+    assert "llm_cache" in client.get("/seo/metrics").get_json()
+
+
+@patch(
+    "app.services.seo_analysis_service.SEOAnalysisService.perform_local_seo_analysis"
+)
+@patch("app.services.perplexity_service.PerplexityService.stream_perplexity")
+def test_analysis_routes_stream_server_sent_events(
+    mock_stream, mock_seo_analysis, client
+):
+    mock_seo_analysis.return_value = {"Title": "T"}
+    mock_stream.return_value = iter([{"insight": "One"}, {"insight": "Two"}])
+
+    response = client.post(
+        "/seo/analyze/content-gap",
+        json={"url": "http://example.com", "related_keywords": ["a"]},
+        headers={"Accept": "text/event-stream"},
+    )
+
+    assert response.status_code == 200
+    assert response.mimetype == "text/event-stream"
+    assert response.get_data(as_text=True) == (
+        'event: seo_data\ndata: {"Title": "T"}\n\n'
+        'event: insight\ndata: {"insight": "One"}\n\n'
+        'event: insight\ndata: {"insight": "Two"}\n\n'
+        "event: done\ndata: {}\n\n"
+    )
+    assert mock_stream.call_args.kwargs["prompt_type"] == "content_gap_analysis"
+    assert mock_stream.call_args.kwargs["route"] == "/seo/analyze/content-gap"
+
+
+@patch(
+    "app.services.seo_analysis_service.SEOAnalysisService.perform_local_seo_analysis"
+)
+@patch("app.services.perplexity_service.PerplexityService.query_perplexity")
+def test_composite_analysis(mock_perplexity, mock_seo_analysis, client):
+    mock_seo_analysis.return_value = {"Title": "T"}
+    mock_perplexity.return_value = {"actionable_insights": [{"insight": "Do X"}]}
+
+    response = client.post(
+        "/seo/analyze/composite",
+        json={
+            "url": "http://example.com",
+            "analyses": ["technical-seo", "content-optimization"],
+            "keyword": "bread",
+        },
+    )
+
+    assert response.status_code == 200
+    assert set(response.get_json()["analyses"]) == {
+        "technical-seo",
+        "content-optimization",
+    }
+    mock_seo_analysis.assert_called_once()
+    assert mock_perplexity.call_count == 2
+
+    response = client.post(
+        "/seo/analyze/composite",
+        json={"url": "http://example.com", "analyses": ["local-seo"]},
+    )
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "Missing parameters: location"}
+
+
+@patch(
+    "app.services.seo_analysis_service.SEOAnalysisService.perform_local_seo_analysis"
+)
+@patch("app.services.perplexity_service.PerplexityService.query_perplexity")
+def test_open_circuit_answers_with_local_data(
+    mock_perplexity, mock_seo_analysis, client
+):
+    mock_seo_analysis.return_value = {"Title": "T"}
+    mock_perplexity.return_value = {"error": "unavailable", "circuit_open": True}
+
+    response = client.post("/seo/analyze/technical-seo", json={"url": "http://a.com"})
+
+    assert response.get_json()["seo_data"] == {"Title": "T"}
+
+
+@patch(
+    "app.services.seo_analysis_service.SEOAnalysisService.perform_local_seo_analysis"
+)
+@patch("app.services.perplexity_service.PerplexityService.query_perplexity")
+def test_analysis_runs_as_job(mock_perplexity, mock_seo_analysis, client):
+    mock_seo_analysis.return_value = {"Title": "T"}
+    mock_perplexity.return_value = {"actionable_insights": [{"insight": "Do X"}]}
+
+    response = client.post(
+        "/seo/analyze/technical-seo",
+        json={"url": "http://example.com"},
+        headers={"Prefer": "respond-async"},
+    )
+    assert response.status_code == 202
+    job = response.get_json()
+    assert response.headers["Location"] == job["status_url"]
+
+    status = client.get(f"{job['status_url']}?wait=5").get_json()
+    assert status["status"] == "succeeded"
+    assert status["result"] == {
+        "status_code": 200,
+        "body": {"actionable_insights": [{"insight": "Do X"}]},
+    }
+    assert client.get("/seo/jobs/unknown").status_code == 404
+
+
+@patch(
+    "app.services.seo_analysis_service.SEOAnalysisService.perform_local_seo_analysis"
+)
+@patch("app.services.perplexity_service.PerplexityService.query_perplexity")
+def test_jobs_call_the_analysis_services(mock_perplexity, mock_seo_analysis, client):
+    mock_seo_analysis.return_value = {"Title": "T"}
+    mock_perplexity.return_value = {"actionable_insights": [{"insight": "Do X"}]}
+
+    response = client.post(
+        "/seo/analyze/content-gap?async=true",
+        json={"url": "http://example.com", "related_keywords": ["rye", "spelt"]},
+        headers={"Cache-Control": "no-cache"},
+    )
+    status = client.get(f"{response.get_json()['status_url']}?wait=5").get_json()
+
+    assert status["result"]["status_code"] == 200
+    assert mock_seo_analysis.call_args.kwargs["keywords"] == ["rye", "spelt"]
+    prompt = mock_perplexity.call_args.args[0]
+    assert "rye, spelt" in prompt
+    assert mock_perplexity.call_args.kwargs["bypass_cache"] is True
+    assert mock_perplexity.call_args.kwargs["route"] == "/seo/analyze/content-gap"
+
+
+@patch("app.services.seo_analysis_service.SEOAnalysisService.analyze_many")
+def test_batch_analysis_streams_ndjson(mock_analyze_many, client):
+    async def analyze_many(urls, keyword=None, fields=None, keywords=None):
+        for url in urls:
+            yield url, {"Title": url}
+
+    mock_analyze_many.side_effect = analyze_many
+
+    response = client.post(
+        "/seo/analyze/batch",
+        json={"urls": ["http://a.com", "http://b.com"], "analyses": ["local-seo"]},
+    )
+
+    assert response.mimetype == "application/x-ndjson"
+    lines = response.get_data(as_text=True).splitlines()
+    assert len(lines) == 3
+    assert mock_analyze_many.call_args.kwargs["fields"] == list(
+        ROUTE_FIELDS["local-seo"]
+    )
+    assert client.post("/seo/analyze/batch", json={"urls": []}).status_code == 400
+
+
+@patch(
+    "app.services.seo_analysis_service.SEOAnalysisService.perform_local_seo_analysis"
+)
+@patch("app.services.perplexity_service.PerplexityService.query_perplexity")
+def test_routes_share_extracted_seo_data(mock_perplexity, mock_seo_analysis, client):
+    mock_seo_analysis.return_value = {
+        "Title": "T",
+        "Meta Description": "D",
+        "H1 Tags": [],
+        "H2 Tags": [],
+        "Alt Texts and Image Info": [],
+        "Sitemap": "Found",
+        "Robots.txt": "Found",
+        "Mobile Friendly": True,
+        "SSL": False,
+        "Social Media Links": [],
+        "Blog": False,
+        "Google Maps Embed": False,
+        "Local Business Schemas": [],
+        "Keyword Density": "N/A",
+        "Keyword Analysis": "N/A",
+    }
+    mock_perplexity.return_value = {"actionable_insights": []}
+
+    first = client.post("/seo/analyze/perplexity", json={"url": "http://a.com"})
+    second = client.post(
+        "/seo/analyze/backlink-strategy", json={"url": "http://A.com/"}
+    )
+
+    assert mock_seo_analysis.call_count == 1
+    assert first.headers["X-SEO-Data-Cache"] == "MISS"
+    assert second.headers["X-SEO-Data-Cache"] == "HIT"
+    assert int(second.headers["Age"]) >= 0
+    assert client.get("/seo/metrics").get_json()["seo_data_cache"]["hits"] == 1
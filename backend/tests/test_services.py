@@ -1,7 +1,11 @@
+import json
+import threading
 import unittest
 from unittest.mock import patch, Mock
+import requests
 from app.services.perplexity_service import PerplexityService
 from app.services.seo_analysis_service import SEOAnalysisService
+from app.services.usage_metrics import UsageMetrics
 from bs4 import BeautifulSoup
 
 
@@ -55,6 +59,76 @@ class TestPerplexityService(unittest.TestCase):
             result["error"], "HTTP error occurred: 500 - Internal Server Error"
         )
 
+    @patch("requests.post")
+    def test_stream_perplexity_yields_insights_as_paragraphs_complete(self, mock_post):
+        received = []
+
+        def stream_lines(**kwargs):
+            for delta in ["Insight", " 1\n", "\nInsight 2", "\n\n", "Insight 3"]:
+                chunk = {"choices": [{"delta": {"content": delta}}]}
+                yield f"data: {json.dumps(chunk)}"
+                yield ""
+                received.append(delta)
+            yield "data: [DONE]"
+
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.iter_lines.side_effect = stream_lines
+        mock_post.return_value = mock_response
+
+        insights = []
+        for item in self.perplexity_service.stream_perplexity("Test prompt"):
+            # Each insight arrives before the rest of the completion is read
+            insights.append((item["insight"], len(received)))
+
+        self.assertEqual(
+            insights, [("Insight 1", 2), ("Insight 2", 3), ("Insight 3", 5)]
+        )
+        self.assertTrue(json.loads(mock_post.call_args.kwargs["data"])["stream"])
+        mock_response.close.assert_called_once()
+
+        # The streamed completion is cached for regular queries
+        result = self.perplexity_service.query_perplexity("Test prompt")
+        self.assertEqual(len(result["actionable_insights"]), 3)
+        mock_post.assert_called_once()
+
+    @patch("requests.post")
+    def test_stream_perplexity_error(self, mock_post):
+        mock_response = Mock()
+        mock_response.status_code = 429
+        mock_response.text = "Too Many Requests"
+        mock_post.return_value = mock_response
+        self.perplexity_service.max_retries = 0
+
+        items = list(self.perplexity_service.stream_perplexity("Test prompt"))
+
+        self.assertEqual(
+            items, [{"error": "HTTP error occurred: 429 - Too Many Requests"}]
+        )
+
+    @patch("requests.post")
+    def test_stream_perplexity_interrupted_mid_body(self, mock_post):
+        def stream_lines(**kwargs):
+            chunk = {"choices": [{"delta": {"content": "Insight 1\n\nInsi"}}]}
+            yield f"data: {json.dumps(chunk)}"
+            raise requests.exceptions.ChunkedEncodingError("connection broken")
+
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.iter_lines.side_effect = stream_lines
+        mock_post.return_value = mock_response
+        self.perplexity_service.usage_metrics = UsageMetrics()
+
+        items = list(
+            self.perplexity_service.stream_perplexity("Test prompt", route="/stream")
+        )
+
+        self.assertEqual(items[0], {"insight": "Insight 1"})
+        self.assertIn("connection broken", items[1]["error"])
+        usage = self.perplexity_service.usage_metrics.stats()["/stream"]
+        self.assertEqual((usage["calls"], usage["errors"]), (1, 1))
+        mock_response.close.assert_called_once()
+
     def test_create_content_optimization_prompt(self):
         url = "http://example.com"
         seo_data = {"Title": "Example Title"}
@@ -68,6 +142,8 @@ class TestPerplexityService(unittest.TestCase):
             f"Analyze the content on the URL '{url}' for the keyword '{keyword}'. "
             f"Identify areas where the content could be better optimized for this keyword, including "
             f"improvements in keyword density, content structure, and relevance."
+            f"\n\nSignals extracted from the page:\nTitle: Example Title\n\n"
+            + self.perplexity_service.prompt_builder.output_instructions()
         )
         self.assertEqual(prompt, expected_prompt)
 
@@ -76,18 +152,19 @@ class TestSEOAnalysisService(unittest.TestCase):
     def setUp(self):
         self.seo_service = SEOAnalysisService()
 
-    @patch("requests.get")
+    @patch("app.services.http_client.HTTPClient.get")
     def test_perform_local_seo_analysis_valid_url(self, mock_get):
         # Mock a successful request
         mock_response = Mock()
         mock_response.status_code = 200
-        mock_response.content = """
+        mock_response.headers = {"Content-Type": "text/html; charset=utf-8"}
+        mock_response.iter_content.return_value = [b"""
         <html>
             <head><title>Test Title</title></head>
             <body><h1>Test H1</h1><meta name="description" content="Test description">
             </body>
         </html>
-        """
+        """]
         mock_get.return_value = mock_response
 
         result = self.seo_service.perform_local_seo_analysis(
@@ -97,14 +174,109 @@ class TestSEOAnalysisService(unittest.TestCase):
         self.assertEqual(result["Title"], "Test Title")
         self.assertEqual(result["Meta Description"], "Test description")
         self.assertEqual(result["H1 Tags"], ["Test H1"])
+        self.assertFalse(result["Page Truncated"])
+
+    @patch("app.services.http_client.HTTPClient.get")
+    def test_perform_local_seo_analysis_rejects_non_html(self, mock_get):
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.headers = {"Content-Type": "application/pdf"}
+        origin_response = Mock(status_code=404)
+        origin_response.iter_content.return_value = []
+        mock_get.side_effect = lambda url, **kwargs: (
+            origin_response
+            if url.endswith(("/sitemap.xml", "/robots.txt"))
+            else mock_response
+        )
+
+        result = self.seo_service.perform_local_seo_analysis("http://example.com")
+
+        self.assertEqual(result["error"], "Unsupported content type: application/pdf")
+        mock_response.iter_content.assert_not_called()
+
+    @patch("app.services.http_client.HTTPClient.get")
+    def test_perform_local_seo_analysis_fetches_origin_files_concurrently(
+        self, mock_get
+    ):
+        # The page request only completes once both origin checks are in flight
+        origin_requests = threading.Semaphore(0)
+
+        def fake_get(url, **kwargs):
+            response = Mock()
+            response.status_code = 200
+            response.headers = {}
+            if url.endswith(("/sitemap.xml", "/robots.txt")):
+                origin_requests.release()
+                response.iter_content.return_value = []
+            else:
+                for _ in range(2):
+                    self.assertTrue(origin_requests.acquire(timeout=5))
+                response.iter_content.return_value = [
+                    b"<html><head><title>T</title></head></html>"
+                ]
+            return response
+
+        mock_get.side_effect = fake_get
+
+        result = self.seo_service.perform_local_seo_analysis("http://example.com")
+
+        self.assertEqual(result["Title"], "T")
+        self.assertEqual(result["Sitemap"], "http://example.com/sitemap.xml")
+        self.assertEqual(result["Robots.txt"], "http://example.com/robots.txt")
+        self.assertEqual(mock_get.call_count, 3)
 
-    @patch("requests.get")
+    @patch("app.services.http_client.HTTPClient.get")
+    def test_perform_local_seo_analysis_computes_only_requested_fields(self, mock_get):
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.headers = {"Content-Type": "text/html"}
+        mock_response.iter_content.return_value = [
+            b"<html><head><title>T</title></head><body><h1>H</h1></body></html>"
+        ]
+        mock_get.return_value = mock_response
+
+        result = self.seo_service.perform_local_seo_analysis(
+            "http://example.com", fields=["h1_tags", "title"]
+        )
+
+        # Reported in registry order, without the origin checks
+        self.assertEqual(
+            result, {"Title": "T", "H1 Tags": ["H"], "Page Truncated": False}
+        )
+        mock_get.assert_called_once()
+
+    @patch("app.services.http_client.HTTPClient.get")
+    def test_perform_local_seo_analysis_skips_page_for_origin_fields(self, mock_get):
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.iter_content.return_value = []
+        mock_get.return_value = mock_response
+
+        result = self.seo_service.perform_local_seo_analysis(
+            "https://example.com", fields="ssl,robots_txt"
+        )
+
+        self.assertEqual(
+            result, {"Robots.txt": "https://example.com/robots.txt", "SSL": True}
+        )
+        self.assertEqual(
+            [call.args[0] for call in mock_get.call_args_list],
+            ["https://example.com/robots.txt"],
+        )
+
+    def test_perform_local_seo_analysis_rejects_unknown_fields(self):
+        result = self.seo_service.perform_local_seo_analysis(
+            "http://example.com", fields=["title", "pagerank"]
+        )
+        self.assertTrue(result["error"].startswith("Unknown fields: pagerank"))
+
+    @patch("app.services.http_client.HTTPClient.get")
     def test_perform_local_seo_analysis_invalid_url(self, mock_get):
         # Test URL validation failure
         result = self.seo_service.perform_local_seo_analysis("invalid-url")
         self.assertEqual(result["error"], "Invalid URL format")
 
-    @patch("requests.get")
+    @patch("app.services.http_client.HTTPClient.get")
     def test_perform_local_seo_analysis_request_error(self, mock_get):
         # Mock a request error
         mock_get.side_effect = Exception("Request failed")
@@ -134,41 +306,56 @@ class TestSEOAnalysisService(unittest.TestCase):
         self.assertEqual(result["H1 Tags"], ["Test H1"])
         self.assertEqual(result["H2 Tags"], ["Test H2"])
 
-    @patch("requests.get")
+    @patch("app.services.http_client.HTTPClient.get")
     def test_check_sitemap_exists(self, mock_get):
         # Mock sitemap found
         mock_response = Mock()
         mock_response.status_code = 200
+        mock_response.iter_content.return_value = []
         mock_get.return_value = mock_response
 
         result = self.seo_service._check_sitemap("http://example.com")
         self.assertEqual(result, "http://example.com/sitemap.xml")
 
-    @patch("requests.get")
+    @patch("app.services.http_client.HTTPClient.get")
     def test_check_sitemap_not_found(self, mock_get):
         # Mock sitemap not found
         mock_response = Mock()
         mock_response.status_code = 404
+        mock_response.iter_content.return_value = []
         mock_get.return_value = mock_response
 
         result = self.seo_service._check_sitemap("http://example.com")
         self.assertTrue(result.startswith("No sitemap found"))
 
-    @patch("requests.get")
+    @patch("app.services.http_client.HTTPClient.get")
+    def test_check_sitemap_uses_origin_of_page_url(self, mock_get):
+        # Sitemaps live at the origin root, not under the analyzed page
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.iter_content.return_value = []
+        mock_get.return_value = mock_response
+
+        result = self.seo_service._check_sitemap("http://Example.com/blog/post")
+        self.assertEqual(result, "http://example.com/sitemap.xml")
+
+    @patch("app.services.http_client.HTTPClient.get")
     def test_check_robots_txt_exists(self, mock_get):
         # Mock robots.txt found
         mock_response = Mock()
         mock_response.status_code = 200
+        mock_response.iter_content.return_value = []
         mock_get.return_value = mock_response
 
         result = self.seo_service._check_robots_txt("http://example.com")
         self.assertEqual(result, "http://example.com/robots.txt")
 
-    @patch("requests.get")
+    @patch("app.services.http_client.HTTPClient.get")
     def test_check_robots_txt_not_found(self, mock_get):
         # Mock robots.txt not found
         mock_response = Mock()
         mock_response.status_code = 404
+        mock_response.iter_content.return_value = []
         mock_get.return_value = mock_response
 
         result = self.seo_service._check_robots_txt("http://example.com")
@@ -177,24 +364,31 @@ class TestSEOAnalysisService(unittest.TestCase):
     def test_check_mobile_friendly(self):
         html_content_with_viewport = '<html><head><meta name="viewport" content="width=device-width"></head></html>'
         soup = BeautifulSoup(html_content_with_viewport, "html.parser")
-        self.assertTrue(self.seo_service._check_mobile_friendly(soup))
+        result = self.seo_service.extract_seo_elements(
+            soup, "http://example.com", fields=["mobile_friendly"]
+        )
+        self.assertTrue(result["Mobile Friendly"])
 
         html_content_without_viewport = "<html><head></head></html>"
         soup = BeautifulSoup(html_content_without_viewport, "html.parser")
-        self.assertFalse(self.seo_service._check_mobile_friendly(soup))
+        result = self.seo_service.extract_seo_elements(
+            soup, "http://example.com", fields=["mobile_friendly"]
+        )
+        self.assertFalse(result["Mobile Friendly"])
 
     def test_calculate_keyword_density(self):
         html_content = "<html><body>test keyword test keyword</body></html>"
         soup = BeautifulSoup(html_content, "html.parser")
 
-        keyword_density = self.seo_service._calculate_keyword_density(soup, "keyword")
-        self.assertEqual(keyword_density, 50.0)
-
-        keyword_density_no_occurrences = self.seo_service._calculate_keyword_density(
-            soup, "missing"
+        result = self.seo_service.extract_seo_elements(
+            soup, "http://example.com", "keyword", fields=["keyword_density"]
         )
-        self.assertEqual(keyword_density_no_occurrences, 0.0)
+        self.assertEqual(result["Keyword Density"], 50.0)
 
+        result = self.seo_service.extract_seo_elements(
+            soup, "http://example.com", "missing", fields=["keyword_density"]
+        )
+        self.assertEqual(result["Keyword Density"], 0.0)
 
 if __name__ == "__main__":
     unittest.main()
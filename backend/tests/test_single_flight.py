@@ -0,0 +1,167 @@
+import asyncio
+import shutil
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock, patch
+from requests.structures import CaseInsensitiveDict
+from app.services.llm_cache import LLMCache
+from app.services.perplexity_service import PerplexityService
+from app.services.response_cache import ResponseCache
+from app.services.single_flight import AsyncSingleFlight, SingleFlight
+
+
+def run_concurrently(fn, callers, release):
+    """
+    Start ``callers`` threads running ``fn``, wait until they are all blocked on
+    the in-flight call, then let the upstream call finish.
+    """
+    with ThreadPoolExecutor(max_workers=callers) as executor:
+        futures = [executor.submit(fn) for _ in range(callers)]
+        release()
+        return [future.result(timeout=5) for future in futures]
+
+
+class TestSingleFlight(unittest.TestCase):
+    def setUp(self):
+        self.flights = SingleFlight()
+        self.started = threading.Event()
+        self.finish = threading.Event()
+
+    def slow(self, value):
+        self.started.set()
+        self.assertTrue(self.finish.wait(timeout=5))
+        if isinstance(value, Exception):
+            raise value
+        return value
+
+    def release_when_joined(self, callers):
+        def release():
+            self.assertTrue(self.started.wait(timeout=5))
+            while self.flights.stats()["coalesced"] < callers - 1:
+                threading.Event().wait(0.001)
+            self.finish.set()
+
+        return release
+
+    def test_concurrent_callers_share_one_execution(self):
+        results = run_concurrently(
+            lambda: self.flights.do("key", self.slow, "result"),
+            8,
+            self.release_when_joined(8),
+        )
+
+        self.assertEqual(results, ["result"] * 8)
+        self.assertEqual(
+            self.flights.stats(), {"executions": 1, "coalesced": 7, "in_flight": 0}
+        )
+
+    def test_errors_reach_every_caller(self):
+        def call():
+            try:
+                self.flights.do("key", self.slow, ValueError("upstream down"))
+            except ValueError as e:
+                return str(e)
+
+        results = run_concurrently(call, 4, self.release_when_joined(4))
+        self.assertEqual(results, ["upstream down"] * 4)
+
+    def test_completed_calls_are_not_remembered(self):
+        self.assertEqual(self.flights.do("key", lambda: 1), 1)
+        self.assertEqual(self.flights.do("key", lambda: 2), 2)
+        self.assertEqual(self.flights.stats()["executions"], 2)
+
+
+class TestAsyncSingleFlight(unittest.TestCase):
+    def test_calls_are_coalesced_per_event_loop(self):
+        flights = AsyncSingleFlight()
+        barrier = threading.Barrier(2)
+
+        async def work():
+            await asyncio.to_thread(barrier.wait, 5)
+            return "done"
+
+        async def callers():
+            return await asyncio.gather(
+                flights.do("key", work), flights.do("key", work)
+            )
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            futures = [executor.submit(asyncio.run, callers()) for _ in range(2)]
+            results = [future.result(timeout=5) for future in futures]
+
+        self.assertEqual(results, [["done", "done"]] * 2)
+        self.assertEqual(
+            flights.stats(), {"executions": 2, "coalesced": 2, "in_flight": 0}
+        )
+
+
+class TestCoalescedUpstreamCalls(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.finish = threading.Event()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def release(self, flights, callers):
+        def release():
+            while flights.stats()["coalesced"] < callers - 1:
+                threading.Event().wait(0.001)
+            self.finish.set()
+
+        return release
+
+    def test_identical_page_fetches_share_one_request(self):
+        cache = ResponseCache(cache_dir=self.cache_dir, enabled=False)
+        http_client = Mock()
+
+        def get_page(url, **kwargs):
+            self.assertTrue(self.finish.wait(timeout=5))
+            response = Mock(status_code=200, content=b"<html></html>")
+            response.headers = CaseInsensitiveDict()
+            return response
+
+        http_client.get_page.side_effect = get_page
+        urls = iter(["http://Example.com", "http://example.com:80/#top"] * 3)
+        lock = threading.Lock()
+
+        def fetch():
+            with lock:
+                url = next(urls)
+            return cache.fetch(url, http_client)
+
+        responses = run_concurrently(fetch, 6, self.release(cache.flights, 6))
+
+        http_client.get_page.assert_called_once()
+        self.assertEqual(len({id(response) for response in responses}), 1)
+        self.assertEqual(cache.stats()["coalesced"], 5)
+
+    @patch("requests.post")
+    def test_identical_prompts_share_one_api_call(self, mock_post):
+        llm_cache = LLMCache(db_path=f"{self.cache_dir}/llm.sqlite3")
+        service = PerplexityService(llm_cache=llm_cache)
+
+        def post(*args, **kwargs):
+            self.assertTrue(self.finish.wait(timeout=5))
+            return Mock(
+                status_code=200,
+                **{"json.return_value": {"choices": [{"message": {"content": "A"}}]}},
+            )
+
+        mock_post.side_effect = post
+
+        results = run_concurrently(
+            lambda: service.query_perplexity("prompt"),
+            5,
+            self.release(llm_cache.flights, 5),
+        )
+
+        mock_post.assert_called_once()
+        self.assertEqual(results, [{"actionable_insights": [{"insight": "A"}]}] * 5)
+        self.assertEqual(llm_cache.stats()["coalesced"], 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
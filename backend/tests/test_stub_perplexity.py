@@ -0,0 +1,101 @@
+import csv
+import shutil
+import tempfile
+import unittest
+from unittest.mock import Mock
+from benchmarks.stub_perplexity import (
+    LatencyModel,
+    StubPerplexity,
+    load_replay,
+    make_server,
+    start_in_thread,
+)
+from app.services.batch_runner import BatchPromptRunner
+from app.services.llm_cache import LLMCache
+from app.services.perplexity_service import PerplexityService
+
+RECORDED = {
+    "id": "1",
+    "model": "mistral-7b-instruct",
+    "usage": {"prompt_tokens": 5, "completion_tokens": 7},
+    "choices": [
+        {"message": {"role": "assistant", "content": "Fix titles\n\nAdd alts"}}
+    ],
+}
+
+
+class TestStubPerplexity(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        replay_path = f"{self.tmp}/responses.csv"
+        with open(replay_path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["prompt", "response"])
+            writer.writerow(["Recorded prompt", repr(RECORDED)])
+        self.replay = load_replay(replay_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def serve(self, **kwargs):
+        server = make_server(StubPerplexity(replay=self.replay, seed=1, **kwargs))
+        start_in_thread(server)
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        service = PerplexityService(
+            llm_cache=LLMCache(db_path=f"{self.tmp}/llm.sqlite3", enabled=False)
+        )
+        service.api_url = f"http://127.0.0.1:{server.server_port}/chat/completions"
+        return service
+
+    def test_replays_recorded_completions(self):
+        service = self.serve()
+
+        result = service.query_perplexity("Recorded prompt")
+
+        self.assertEqual(
+            result,
+            {
+                "actionable_insights": [
+                    {"insight": "Fix titles"},
+                    {"insight": "Add alts"},
+                ]
+            },
+        )
+        # Unknown prompts get a recording too, chosen deterministically
+        self.assertEqual(service.query_perplexity("Other prompt"), result)
+
+    def test_replays_batch_runner_results(self):
+        for name in ("results.jsonl", "results.csv"):
+            path = f"{self.tmp}/{name}"
+            service = Mock(**{"query_completion.return_value": RECORDED})
+            BatchPromptRunner(path, service=service).run(
+                ["Recorded prompt"], progress=lambda line: None
+            )
+
+            self.assertEqual(load_replay(path), {"Recorded prompt": RECORDED}, name)
+
+    def test_streams_completions(self):
+        service = self.serve()
+
+        items = list(service.stream_perplexity("Recorded prompt"))
+
+        self.assertEqual(items, [{"insight": "Fix titles"}, {"insight": "Add alts"}])
+
+    def test_injected_failures(self):
+        service = self.serve(error_rate=1.0)
+        service.max_retries = 0
+
+        self.assertIn("503", service.query_perplexity("Recorded prompt")["error"])
+
+    def test_latency_models(self):
+        self.assertEqual(LatencyModel("fixed:0.25").sample(), 0.25)
+        samples = [LatencyModel("uniform:1,2", seed=3).sample() for _ in range(5)]
+        self.assertTrue(all(1 <= sample <= 2 for sample in samples))
+        self.assertEqual(len(set(samples)), 1)
+        with self.assertRaises(ValueError):
+            LatencyModel("pareto:1")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+import json
+import shutil
+import tempfile
+import unittest
+from unittest.mock import Mock, patch
+from app.services.llm_cache import LLMCache
+from app.services.perplexity_service import PerplexityService
+from app.services.usage_metrics import UsageMetrics
+
+COMPLETION = {
+    "model": "mistral-7b-instruct",
+    "usage": {"prompt_tokens": 40, "completion_tokens": 600, "total_tokens": 640},
+    "choices": [{"message": {"content": "Insight 1\n\nInsight 2"}}],
+}
+
+
+class TestUsageMetrics(unittest.TestCase):
+    def test_series_are_aggregated_per_route_and_in_total(self):
+        metrics = UsageMetrics()
+
+        for route in ("/seo/analyze/perplexity", "/seo/analyze/content-optimization"):
+            metrics.record("content_optimization", "m", 1, route=route)
+        metrics.record("content_optimization", "m", error=True, route=route)
+
+        stats = metrics.stats()
+        self.assertNotIn("content_optimization", stats)
+        self.assertEqual(stats["/seo/analyze/perplexity"]["calls"], 1)
+        optimization = stats["/seo/analyze/content-optimization"]
+        self.assertEqual((optimization["calls"], optimization["errors"]), (2, 1))
+        # The call that was never sent has no latency to average.
+        self.assertEqual(optimization["latency_mean"], 1)
+        self.assertEqual(optimization["latency_histogram"]["+Inf"], 1)
+        self.assertEqual(stats["total"]["calls"], 3)
+
+    def test_series_are_aggregated_per_prompt_type_and_in_total(self):
+        metrics = UsageMetrics(prompt_token_cost=1, completion_token_cost=2)
+
+        metrics.record("technical_seo_audit", "m", 0.4, usage=COMPLETION["usage"])
+        metrics.record("technical_seo_audit", "m", 12, error=True)
+        metrics.record("backlink_strategy", "m", cached=True)
+
+        audit = metrics.stats()["technical_seo_audit"]
+        self.assertEqual((audit["calls"], audit["errors"]), (2, 1))
+        self.assertEqual(
+            (audit["prompt_tokens"], audit["completion_tokens"]), (40, 600)
+        )
+        self.assertAlmostEqual(audit["cost_usd"], 0.00124)
+        self.assertEqual(audit["latency_mean"], 6.2)
+        self.assertEqual(audit["latency_histogram"]["0.5"], 1)
+        self.assertEqual(audit["latency_histogram"]["10"], 1)
+        self.assertEqual(audit["latency_histogram"]["20"], 2)
+        self.assertEqual(audit["models"], {"m": 2})
+
+        total = metrics.stats()["total"]
+        self.assertEqual((total["calls"], total["cache_hits"]), (3, 1))
+        self.assertEqual(total["latency_histogram"]["+Inf"], 2)
+
+
+class TestPerplexityUsageRecording(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.metrics = UsageMetrics()
+        self.service = PerplexityService(
+            llm_cache=LLMCache(db_path=f"{self.cache_dir}/llm.sqlite3"),
+            usage_metrics=self.metrics,
+        )
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    @patch("requests.post")
+    def test_completion_usage_is_recorded(self, mock_post):
+        mock_post.return_value = Mock(
+            status_code=200, **{"json.return_value": COMPLETION}
+        )
+
+        self.service.query_perplexity("prompt", prompt_type="content_gap_analysis")
+        self.service.query_perplexity("prompt", prompt_type="content_gap_analysis")
+
+        stats = self.metrics.stats()["content_gap_analysis"]
+        self.assertEqual((stats["calls"], stats["cache_hits"]), (2, 1))
+        self.assertEqual(stats["completion_tokens"], 600)
+        self.assertEqual(stats["models"], {"mistral-7b-instruct": 2})
+
+    @patch("requests.post")
+    def test_latency_excludes_retry_backoff(self, mock_post):
+        mock_post.side_effect = [
+            Mock(status_code=429, headers={"Retry-After": "0.2"}),
+            Mock(status_code=200, **{"json.return_value": COMPLETION}),
+        ]
+
+        self.service.query_perplexity(
+            "prompt", prompt_type="technical_seo_audit", route="/seo/analyze/x"
+        )
+
+        self.assertEqual(mock_post.call_count, 2)
+        self.assertLess(self.metrics.stats()["/seo/analyze/x"]["latency_mean"], 0.1)
+
+    @patch("requests.post")
+    def test_streamed_usage_is_recorded(self, mock_post):
+        chunks = [
+            {"choices": [{"delta": {"content": "Insight"}}], "usage": {}},
+            {
+                "choices": [{"delta": {"content": " 1"}}],
+                "usage": {"prompt_tokens": 10, "completion_tokens": 2},
+            },
+        ]
+        mock_response = Mock(status_code=200)
+        mock_response.iter_lines.return_value = [
+            f"data: {json.dumps(chunk)}" for chunk in chunks
+        ]
+        mock_post.return_value = mock_response
+
+        list(self.service.stream_perplexity("prompt", prompt_type="backlink_strategy"))
+
+        stats = self.metrics.stats()["backlink_strategy"]
+        self.assertEqual((stats["prompt_tokens"], stats["completion_tokens"]), (10, 2))
+        self.assertEqual(stats["errors"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()